@@ -1,10 +1,11 @@
 import argparse
+import asyncio
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from client import VPNClientCore
+from client import VPNClient, VPNClientCore
 
 
 class ClientCLI:
@@ -12,8 +13,18 @@ class ClientCLI:
         self.parser = argparse.ArgumentParser(description='VPN Client')
         self.parser.add_argument('--host', required=True, help='Server host')
         self.parser.add_argument('--port', type=int, default=8443, help='Server port')
+        self.parser.add_argument('--engine', choices=['select', 'asyncio'], default='select', help='Client data plane')
+        self.parser.add_argument('--stats-interval', type=float, default=0.0, help='Print throughput every N seconds (asyncio engine)')
     
     def run(self, args):
+        if args.engine == 'asyncio':
+            client = VPNClient(server_host=args.host, server_port=args.port, stats_interval=args.stats_interval)
+            try:
+                asyncio.run(client.run())
+            except KeyboardInterrupt:
+                print('\nDisconnecting...')
+            return
+        
         client = VPNClientCore(server_host=args.host, server_port=args.port)
         client.start()
     
@@ -5,7 +5,7 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from server import VPNServerCore
+from server import NATManager, VPNServer, VPNServerCore
 
 
 class ServerCLI:
@@ -14,11 +14,43 @@ class ServerCLI:
         self.parser.add_argument('--host', default='0.0.0.0', help='Server host')
         self.parser.add_argument('--port', type=int, default=8443, help='Server port')
         self.parser.add_argument('--nat-interface', default='eth0', help='NAT interface')
+        self.parser.add_argument('--engine', choices=['select', 'asyncio'], default='select', help='Server data plane')
+        self.parser.add_argument('--workers', type=int, default=1, help='Worker processes (select engine, SO_REUSEPORT + multi-queue TUN)')
+        self.parser.add_argument('--nat-backend', choices=['iptables', 'nft'], default='iptables', help='Firewall used for NAT and forwarding rules')
+        self.parser.add_argument('--print-nat-rules', action='store_true', help='Print the NAT ruleset and exit without applying it')
     
     def run(self, args):
-        server = VPNServerCore(host=args.host, port=args.port, nat_interface=args.nat_interface)
+        if args.print_nat_rules:
+            NATManager(args.nat_interface, backend=args.nat_backend, dry_run=True).apply()
+            return
+        
+        if args.engine == 'asyncio':
+            self.run_asyncio(args)
+            return
+        
+        server = VPNServerCore(
+            host=args.host,
+            port=args.port,
+            nat_interface=args.nat_interface,
+            workers=args.workers,
+            nat_backend=args.nat_backend
+        )
         server.start()
     
+    def run_asyncio(self, args):
+        try:
+            import uvloop
+            uvloop.install()
+            print('Using uvloop event loop')
+        except ImportError:
+            pass
+        
+        server = VPNServer(host=args.host, port=args.port, nat_interface=args.nat_interface, nat_backend=args.nat_backend)
+        try:
+            asyncio.run(server.serve_forever())
+        except KeyboardInterrupt:
+            print('\nShutting down...')
+    
     def main(self):
         args = self.parser.parse_args()
         self.run(args)
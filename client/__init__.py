@@ -2,14 +2,15 @@ from .core import VPNClient
 from .connection import ConnectionManager
 from .interface import NetworkInterface
 from .vpn_encryption import create_ssl_context, wrap_socket
-from .vpn_tun import create_tun, read_packet, write_packet, close_tun
-from .vpn_routing import add_route_default, remove_route_default
+from .vpn_tun import create_tun, read_packet, write_packet, close_tun, PacketBatch, read_packets, write_packets
+from .vpn_routing import add_route_default, remove_route_default, configure_interface, flush_interface, remove_vpn_route, RouteSocket
 from .vpn_client_core import VPNClientCore
 
 __all__ = [
     'VPNClient', 'ConnectionManager', 'NetworkInterface',
     'create_ssl_context', 'wrap_socket',
     'create_tun', 'read_packet', 'write_packet', 'close_tun',
-    'add_route_default', 'remove_route_default',
+    'PacketBatch', 'read_packets', 'write_packets',
+    'add_route_default', 'remove_route_default', 'configure_interface', 'flush_interface', 'remove_vpn_route', 'RouteSocket',
     'VPNClientCore'
 ]
\ No newline at end of file
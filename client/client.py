@@ -19,7 +19,20 @@ def main():
         print('Error: server_host not configured in config.json')
         sys.exit(1)
     
-    client = VPNClientCore(server_host=server_host, server_port=server_port)
+    client = VPNClientCore(
+        server_host=server_host,
+        server_port=server_port,
+        send_queue_limit=config.get('send_queue_limit', 1024 * 1024),
+        keepalive_interval=config.get('keepalive_interval', 10.0),
+        idle_timeout=config.get('idle_timeout', 60.0),
+        reconnect_delay=config.get('reconnect_delay', 1.0),
+        max_reconnect_delay=config.get('max_reconnect_delay', 30.0),
+        max_reconnect_attempts=config.get('max_reconnect_attempts', 0),
+        udp=config.get('udp', False),
+        udp_probe_interval=config.get('udp_probe_interval', 2.0),
+        udp_timeout=config.get('udp_timeout', 6.0),
+        qos=config.get('qos')
+    )
     client.start()
 
 
@@ -1,18 +1,178 @@
 import asyncio
-from typing import Optional
+import json
+import random
+import time
+from typing import List, Optional
+from common.protocol import Protocol, MessageType, FrameReader
+from .vpn_encryption import create_ssl_context
 
 
 class ConnectionManager:
-    def __init__(self):
+    def __init__(self, write_buffer_limit: int = 256 * 1024, keepalive_interval: float = 10.0, idle_timeout: float = 60.0):
         self.connected = False
         self.reconnect_attempts = 0
         self.max_reconnect_attempts = 5
+        self.write_buffer_limit = write_buffer_limit
+        self.host: Optional[str] = None
+        self.port: Optional[int] = None
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.frames = FrameReader()
+        self.assigned_ip: Optional[str] = None
+        self.vpn_network = '10.0.0.0/24'
+        self.routes: List[str] = []
+        self.keepalive_interval = keepalive_interval
+        self.idle_timeout = idle_timeout
+        self.last_rx = self.last_tx = 0.0
+        self.stats = {
+            'packets_up': 0,
+            'packets_down': 0,
+            'bytes_up': 0,
+            'bytes_down': 0,
+            'keepalives_sent': 0,
+        }
     
     async def establish_connection(self, host: str, port: int) -> bool:
+        self.host = host
+        self.port = port
+        
+        try:
+            self.reader, self.writer = await asyncio.open_connection(
+                host, port, ssl=create_ssl_context(), server_hostname=host
+            )
+            self.frames = FrameReader()
+            assignment = await self._receive_ip_assignment()
+            self.assigned_ip = assignment['ip']
+            self.vpn_network = assignment.get('network', self.vpn_network)
+            self.routes = assignment.get('routes', [])
+        except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+            print(f'Error connecting to server: {e}')
+            await self.close()
+            return False
+        
+        self.connected = True
+        self.reconnect_attempts = 0
+        self.last_rx = self.last_tx = time.monotonic()
+        return True
+    
+    async def _receive_ip_assignment(self) -> dict:
+        while True:
+            data = await self.reader.read(65536)
+            if not data:
+                raise ConnectionError('Connection closed before IP assignment')
+            
+            self.frames.feed(data)
+            for msg_type, payload in self.frames.read_frames():
+                if msg_type == MessageType.HANDSHAKE:
+                    return json.loads(bytes(payload))
+    
+    async def send_packet(self, packet: bytes):
+        self.writer.write(Protocol.pack_message(MessageType.DATA, packet))
+        self.last_tx = time.monotonic()
+        self.stats['packets_up'] += 1
+        self.stats['bytes_up'] += len(packet)
+        
+        if self.writer.transport.get_write_buffer_size() > self.write_buffer_limit:
+            await self.writer.drain()
+    
+    def _drain_frames(self) -> List[memoryview]:
+        packets = []
+        for msg_type, payload in self.frames.read_frames():
+            if msg_type == MessageType.DATA:
+                packets.append(payload)
+            elif msg_type == MessageType.DISCONNECT:
+                raise ConnectionError('Server closed connection')
+        return packets
+    
+    async def receive_packets(self) -> List[memoryview]:
+        packets = self._drain_frames()
+        while not packets:
+            data = await self.reader.read(65536)
+            if not data:
+                raise ConnectionError('Server closed connection')
+            
+            self.last_rx = time.monotonic()
+            self.frames.feed(data)
+            packets = self._drain_frames()
+        
+        self.stats['packets_down'] += len(packets)
+        self.stats['bytes_down'] += sum(len(p) for p in packets)
+        return packets
+    
+    async def maintain_connection(self, interface):
+        tasks = [
+            asyncio.ensure_future(self._upstream_pump(interface)),
+            asyncio.ensure_future(self._downstream_pump(interface)),
+            asyncio.ensure_future(self._keepalive_pump()),
+        ]
+        
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if not task.cancelled() and task.exception() is not None:
+                    print(f'Connection error: {task.exception()}')
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.connected = False
+    
+    async def _upstream_pump(self, interface):
+        while True:
+            packet = await interface.read_packet()
+            while packet is not None:
+                self.writer.write(Protocol.pack_message(MessageType.DATA, packet))
+                self.stats['packets_up'] += 1
+                self.stats['bytes_up'] += len(packet)
+                packet = interface.read_packet_nowait()
+            
+            self.last_tx = time.monotonic()
+            await self.writer.drain()
+    
+    async def _downstream_pump(self, interface):
+        while True:
+            for packet in await self.receive_packets():
+                await interface.write_packet(packet)
+    
+    async def _keepalive_pump(self):
+        while True:
+            now = time.monotonic()
+            if now - self.last_rx >= self.idle_timeout:
+                raise ConnectionError(f'Server silent for {now - self.last_rx:.0f}s')
+            
+            if now - self.last_tx >= self.keepalive_interval:
+                self.writer.write(Protocol.pack_message(MessageType.KEEPALIVE, b''))
+                self.stats['keepalives_sent'] += 1
+                self.last_tx = now
+            
+            wake = min(self.last_tx + self.keepalive_interval, self.last_rx + self.idle_timeout)
+            await asyncio.sleep(max(0.0, wake - now))
+    
+    async def handle_reconnect(self) -> bool:
+        await self.close()
+        
+        while self.reconnect_attempts < self.max_reconnect_attempts:
+            delay = random.uniform(0, min(2 ** self.reconnect_attempts, 30))
+            self.reconnect_attempts += 1
+            print(f'Reconnecting in {delay:.1f}s (attempt {self.reconnect_attempts}/{self.max_reconnect_attempts})')
+            await asyncio.sleep(delay)
+            
+            if await self.establish_connection(self.host, self.port):
+                return True
+        
         return False
     
-    async def maintain_connection(self):
-        pass
+    async def close(self):
+        self.connected = False
+        if self.writer is None:
+            return
+        
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except Exception:
+            pass
+        self.reader = self.writer = None
     
-    async def handle_reconnect(self):
-        pass
\ No newline at end of file
+    def get_stats(self) -> dict:
+        return dict(self.stats)
\ No newline at end of file
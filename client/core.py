@@ -1,24 +1,125 @@
 import asyncio
 import ssl
-from typing import Optional
+import time
+from collections import deque
+from typing import Optional, Set
+from .connection import ConnectionManager
+from .interface import NetworkInterface
+from .vpn_routing import RouteSocket, remove_vpn_route
 
 
 class VPNClient:
-    def __init__(self, server_host: str, server_port: int = 8443):
+    def __init__(
+        self,
+        server_host: str,
+        server_port: int = 8443,
+        stats_interval: float = 0.0,
+        keepalive_interval: float = 10.0,
+        idle_timeout: float = 60.0
+    ):
         self.server_host = server_host
         self.server_port = server_port
+        self.stats_interval = stats_interval
         self.reader: Optional[asyncio.StreamReader] = None
         self.writer: Optional[asyncio.StreamWriter] = None
         self.ssl_context: Optional[ssl.SSLContext] = None
+        self.connection = ConnectionManager(keepalive_interval=keepalive_interval, idle_timeout=idle_timeout)
+        self.interface = NetworkInterface()
+        self.netlink: Optional[RouteSocket] = None
+        self.pushed_routes: Set[str] = set()
+        self.pending = deque()
     
     async def connect(self):
-        pass
+        await self.interface.create_interface()
+        
+        if not await self.connection.establish_connection(self.server_host, self.server_port):
+            await self.interface.destroy_interface()
+            raise ConnectionError(f'Failed to connect to {self.server_host}:{self.server_port}')
+        
+        self.reader = self.connection.reader
+        self.writer = self.connection.writer
+        print(f'Assigned IP: {self.connection.assigned_ip}')
+        
+        self._configure_interface()
+        print(f'Connected to VPN server at {self.server_host}:{self.server_port}')
+        print(f'TUN interface: {self.interface.interface_name}')
+    
+    def _configure_interface(self, previous_ip: Optional[str] = None):
+        if self.netlink is None:
+            self.netlink = RouteSocket()
+        self.netlink.configure_interface(self.interface.interface_name, self.connection.assigned_ip, self.connection.vpn_network, previous_ip)
+        if previous_ip:
+            self.pushed_routes = set()
+        self._sync_routes()
+    
+    def _sync_routes(self):
+        self.pushed_routes = self.netlink.sync_routes(self.interface.interface_name, self.pushed_routes, self.connection.routes)
+    
+    async def run(self):
+        await self.connect()
+        
+        reporter = None
+        if self.stats_interval > 0:
+            reporter = asyncio.ensure_future(self._report_stats())
+        
+        try:
+            while True:
+                await self.connection.maintain_connection(self.interface)
+                previous_ip = self.connection.assigned_ip
+                if not await self.connection.handle_reconnect():
+                    print('Giving up on reconnecting')
+                    break
+                self.reader = self.connection.reader
+                self.writer = self.connection.writer
+                if self.connection.assigned_ip != previous_ip:
+                    print(f'Server assigned a new IP {self.connection.assigned_ip} (was {previous_ip})')
+                    self._configure_interface(previous_ip)
+                else:
+                    self._sync_routes()
+        finally:
+            if reporter is not None:
+                reporter.cancel()
+            await self.disconnect()
+    
+    async def _report_stats(self):
+        previous = self.connection.get_stats()
+        previous_time = time.monotonic()
+        
+        while True:
+            await asyncio.sleep(self.stats_interval)
+            
+            stats = self.connection.get_stats()
+            now = time.monotonic()
+            elapsed = now - previous_time
+            
+            up = (stats['bytes_up'] - previous['bytes_up']) * 8 / elapsed / 1e6
+            down = (stats['bytes_down'] - previous['bytes_down']) * 8 / elapsed / 1e6
+            up_pps = (stats['packets_up'] - previous['packets_up']) / elapsed
+            down_pps = (stats['packets_down'] - previous['packets_down']) / elapsed
+            print(f'Throughput: up {up:.1f} Mbit/s ({up_pps:.0f} pkt/s), down {down:.1f} Mbit/s ({down_pps:.0f} pkt/s)')
+            
+            previous, previous_time = stats, now
     
     async def disconnect(self):
-        pass
+        await self.connection.close()
+        self.reader = self.writer = None
+        
+        if self.interface.fd is not None:
+            try:
+                remove_vpn_route(self.interface.interface_name, self.connection.vpn_network)
+            except:
+                pass
+            await self.interface.destroy_interface()
+        
+        if self.netlink is not None:
+            self.netlink.close()
+            self.netlink = None
+        print('VPN Client stopped')
     
     async def send_data(self, data: bytes):
-        pass
+        await self.connection.send_packet(data)
     
     async def receive_data(self) -> bytes:
-        return b''
\ No newline at end of file
+        if not self.pending:
+            self.pending.extend(bytes(p) for p in await self.connection.receive_packets())
+        return self.pending.popleft()
\ No newline at end of file
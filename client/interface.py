@@ -1,20 +1,88 @@
 import asyncio
+import os
 from typing import Optional
+from .vpn_tun import create_tun, close_tun
 
 
 class NetworkInterface:
-    def __init__(self, interface_name: str = 'tun0'):
+    def __init__(self, interface_name: str = 'tun0', queue_size: int = 256, read_batch: int = 64):
         self.interface_name = interface_name
         self.fd: Optional[int] = None
+        self.queue_size = queue_size
+        self.read_batch = read_batch
+        self.packets: Optional[asyncio.Queue] = None
+        self.reading = False
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
     
     async def create_interface(self):
-        pass
+        self.fd, self.interface_name = create_tun(self.interface_name)
+        self.attach(self.fd)
+    
+    def attach(self, fd: int):
+        self.fd = fd
+        os.set_blocking(self.fd, False)
+        self.loop = asyncio.get_running_loop()
+        self.packets = asyncio.Queue(self.queue_size)
+        self._resume_reading()
     
     async def destroy_interface(self):
-        pass
+        if self.fd is None:
+            return
+        
+        self._pause_reading()
+        close_tun(self.fd)
+        self.fd = None
+    
+    def _pause_reading(self):
+        if self.reading:
+            self.loop.remove_reader(self.fd)
+            self.reading = False
+    
+    def _resume_reading(self):
+        if not self.reading and self.fd is not None:
+            self.loop.add_reader(self.fd, self._on_readable)
+            self.reading = True
+    
+    def _on_readable(self):
+        for _ in range(self.read_batch):
+            if self.packets.full():
+                self._pause_reading()
+                return
+            
+            try:
+                packet = os.read(self.fd, 2048)
+            except BlockingIOError:
+                return
+            
+            if packet:
+                self.packets.put_nowait(packet)
     
     async def read_packet(self) -> bytes:
-        return b''
+        packet = await self.packets.get()
+        self._resume_reading()
+        return packet
+    
+    def read_packet_nowait(self) -> Optional[bytes]:
+        try:
+            packet = self.packets.get_nowait()
+        except asyncio.QueueEmpty:
+            return None
+        
+        self._resume_reading()
+        return packet
     
     async def write_packet(self, data: bytes):
-        pass
\ No newline at end of file
+        while True:
+            try:
+                os.write(self.fd, data)
+                return
+            except BlockingIOError:
+                await self._wait_writable()
+    
+    async def _wait_writable(self):
+        waiter = self.loop.create_future()
+        self.loop.add_writer(self.fd, waiter.set_result, None)
+        try:
+            await waiter
+        finally:
+            self.loop.remove_writer(self.fd)
\ No newline at end of file
@@ -1,124 +1,302 @@
+import json
+import os
+import random
 import socket
 import ssl
 import select
-import struct
-import subprocess
-from typing import Optional
+import time
+from typing import List, Optional, Set
+from common.crypto import DatagramChannel
+from common.protocol import MessageType, FrameReader
+from common.qos import QoSPolicy
 from .vpn_encryption import create_ssl_context
-from .vpn_tun import create_tun, read_packet, write_packet, close_tun
-from .vpn_routing import add_route_default, remove_route_default
+from .vpn_tun import create_tun, close_tun, PacketBatch, read_packets, write_packets
+from .vpn_routing import RouteSocket, remove_vpn_route
 
 
 class VPNClientCore:
-    def __init__(self, server_host: str, server_port: int = 8443):
+    def __init__(
+        self,
+        server_host: str,
+        server_port: int = 8443,
+        send_queue_limit: int = 1024 * 1024,
+        keepalive_interval: float = 10.0,
+        idle_timeout: float = 60.0,
+        connect_timeout: float = 10.0,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+        max_reconnect_attempts: int = 0,
+        udp: bool = False,
+        udp_probe_interval: float = 2.0,
+        udp_timeout: float = 6.0,
+        qos: Optional[dict] = None
+    ):
         self.server_host = server_host
         self.server_port = server_port
         self.tun_fd = None
         self.tun_name = None
+        self.tun_batch = PacketBatch()
+        self.tun_write_drops = 0
         self.client_socket = None
         self.ssl_context = None
+        self.tls_session = None
         self.assigned_ip = None
+        self.vpn_network = '10.0.0.0/24'
+        self.netlink = None
+        self.wanted_routes: List[str] = []
+        self.pushed_routes: Set[str] = set()
+        self.reader = FrameReader()
+        self.qos = QoSPolicy(qos)
+        self.writer = self.qos.writer(send_queue_limit)
+        self.keepalive_interval = keepalive_interval
+        self.idle_timeout = idle_timeout
+        self.last_rx = self.last_tx = 0.0
+        self.connect_timeout = connect_timeout
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.max_reconnect_attempts = max_reconnect_attempts
+        self.outage_started = None
+        self.reconnects = 0
+        self.reconnect_ttfp_last = 0.0
+        self.reconnect_ttfp_max = 0.0
+        self.udp_enabled = udp
+        self.udp_probe_interval = udp_probe_interval
+        self.udp_timeout = udp_timeout
+        self.udp_socket = None
+        self.udp = None
+        self.udp_buffer = bytearray(65535)
+        self.udp_view = memoryview(self.udp_buffer)
+        self.udp_up = False
+        self.udp_last_probe = 0.0
+        self.udp_tx = 0
+        self.udp_rx = 0
+        self.udp_rejected = 0
         self.running = False
+        self.stopping = False
     
     def _setup_tun(self):
         self.tun_fd, self.tun_name = create_tun('tun0')
+        os.set_blocking(self.tun_fd, False)
     
-    def _configure_tun_interface(self):
-        import subprocess
-
+    def _configure_tun_interface(self, previous_ip: Optional[str] = None):
         if not self.assigned_ip:
             raise RuntimeError('No IP assigned')
-
-        # Add IP address
-        try:
-            subprocess.run(
-                ['ip', 'addr', 'add', f'{self.assigned_ip}/24', 'dev', self.tun_name],
-                check=True
-            )
-        except subprocess.CalledProcessError as e:
-            if "File exists" in str(e):
-                print(f"[Warning] IP {self.assigned_ip} already assigned to {self.tun_name}")
-            else:
-                print(f"[Error] Failed to assign IP: {e}")
-                raise
-
-        # Bring interface up
-        try:
-            subprocess.run(
-                ['ip', 'link', 'set', 'dev', self.tun_name, 'up'],
-                check=True
-            )
-        except subprocess.CalledProcessError as e:
-            print(f"[Error] Failed to bring interface up: {e}")
-            raise
-
-        # Add VPN route
-        try:
-            # Delete old route first (safe)
-            subprocess.run(
-                ['ip', 'route', 'del', '10.0.0.0/24', 'dev', self.tun_name],
-                check=False
-            )
-            subprocess.run(
-                ['ip', 'route', 'add', '10.0.0.0/24', 'dev', self.tun_name],
-                check=True
-            )
-        except subprocess.CalledProcessError as e:
-            if "File exists" in str(e):
-                print(f"[Warning] Route 10.0.0.0/24 already exists")
-            else:
-                print(f"[Error] Failed to add VPN route: {e}")
-                raise
-
+        
+        if self.netlink is None:
+            self.netlink = RouteSocket()
+        self.netlink.configure_interface(self.tun_name, self.assigned_ip, self.vpn_network, previous_ip)
+        if previous_ip:
+            self.pushed_routes = set()
+        self._sync_routes()
+    
+    def _sync_routes(self):
+        self.pushed_routes = self.netlink.sync_routes(self.tun_name, self.pushed_routes, self.wanted_routes)
     
     def _connect_to_server(self):
-        self.ssl_context = create_ssl_context()
+        if self.ssl_context is None:
+            self.ssl_context = create_ssl_context()
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(self.connect_timeout)
         self.client_socket = self.ssl_context.wrap_socket(
             sock, 
             server_side=False,
-            server_hostname=self.server_host
+            server_hostname=self.server_host,
+            session=self.tls_session
         )
         self.client_socket.connect((self.server_host, self.server_port))
         self.client_socket.setblocking(False)
+        
+        if self.client_socket.session_reused:
+            print('Resumed TLS session')
     
     def _receive_ip_assignment(self):
-        self.client_socket.setblocking(True)
-        
-        header = self.client_socket.recv(4)
-        if len(header) != 4:
-            raise RuntimeError('Failed to receive IP assignment header')
+        self.client_socket.settimeout(self.connect_timeout)
+        self.assigned_ip = None
         
-        ip_len = struct.unpack('!I', header)[0]
-        ip_data = self.client_socket.recv(ip_len)
-        if len(ip_data) != ip_len:
-            raise RuntimeError('Failed to receive IP assignment data')
+        while self.assigned_ip is None:
+            if not self.reader.recv_into(self.client_socket):
+                raise RuntimeError('Connection closed before IP assignment')
+            
+            for msg_type, payload in self.reader.read_frames():
+                if msg_type == MessageType.HANDSHAKE:
+                    assignment = json.loads(bytes(payload))
+                    self.assigned_ip = assignment['ip']
+                    self.vpn_network = assignment.get('network', self.vpn_network)
+                    self.wanted_routes = assignment.get('routes', [])
+                    self._setup_udp(assignment.get('udp'))
+                    break
         
-        self.assigned_ip = ip_data.decode('utf-8')
         self.client_socket.setblocking(False)
         
+        session = self.client_socket.session
+        if session is not None and session.has_ticket:
+            self.tls_session = session
+        
         print(f'Assigned IP: {self.assigned_ip}')
     
+    def _setup_udp(self, offer: Optional[dict]):
+        self._close_udp()
+        if not self.udp_enabled or not offer:
+            return
+        
+        self.udp = DatagramChannel.from_offer(offer)
+        self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.udp_socket.connect((self.server_host, offer['port']))
+        self.udp_socket.setblocking(False)
+        self.udp_last_probe = 0.0
+    
+    def _close_udp(self):
+        if self.udp_socket is not None:
+            self.udp_socket.close()
+        self.udp_socket = None
+        self.udp = None
+        self.udp_up = False
+    
+    def _udp_active(self, now: float) -> bool:
+        return self.udp is not None and now - self.udp.last_rx < self.udp_timeout
+    
+    def _send_udp(self, packet) -> bool:
+        try:
+            self.udp_socket.send(self.udp.seal(packet))
+        except OSError:
+            return False
+        self.udp_tx += 1
+        return True
+    
+    def _handle_udp_data(self):
+        packets = []
+        for _ in range(64):
+            try:
+                size = self.udp_socket.recv_into(self.udp_buffer)
+            except (BlockingIOError, ConnectionRefusedError):
+                break
+            
+            payload = self.udp.open(self.udp_view[:size])
+            if payload is None:
+                self.udp_rejected += 1
+                continue
+            
+            self.udp_rx += 1
+            self.udp.last_rx = self.last_rx = time.monotonic()
+            if payload:
+                packets.append(payload)
+        
+        if not self.udp_up and self.udp.last_rx:
+            self.udp_up = True
+            print('UDP data channel up')
+        
+        if packets:
+            written = write_packets(self.tun_fd, packets)
+            self.tun_write_drops += len(packets) - written
+            
+            if self.outage_started is not None:
+                self._record_first_packet()
+    
+    def _check_udp(self, now: float):
+        if self.udp is None:
+            return
+        
+        if self.udp_up and not self._udp_active(now):
+            self.udp_up = False
+            print('UDP data channel silent, falling back to TLS')
+        
+        if now - self.udp_last_probe >= self.udp_probe_interval:
+            self._send_udp(b'')
+            self.udp_last_probe = now
+    
+    def _process_frames(self):
+        packets = []
+        for msg_type, payload in self.reader.read_frames():
+            if msg_type == MessageType.DATA:
+                packets.append(payload)
+            elif msg_type == MessageType.DISCONNECT:
+                print('Server closed connection')
+                self.running = False
+                break
+        
+        if packets:
+            written = write_packets(self.tun_fd, packets)
+            self.tun_write_drops += len(packets) - written
+            
+            if self.outage_started is not None:
+                self._record_first_packet()
+    
+    def _record_first_packet(self):
+        ttfp = time.monotonic() - self.outage_started
+        self.outage_started = None
+        self.reconnect_ttfp_last = ttfp
+        self.reconnect_ttfp_max = max(self.reconnect_ttfp_max, ttfp)
+        print(f'Tunnel restored: first packet {ttfp:.2f}s after disconnect')
+    
+    def _flush_writer(self):
+        records = self.writer.records
+        try:
+            self.writer.flush(self.client_socket)
+        except Exception as e:
+            print(f'Error sending to server: {e}')
+            raise
+        if self.writer.records != records:
+            self.last_tx = time.monotonic()
+    
+    def _check_keepalive(self) -> bool:
+        now = time.monotonic()
+        self._check_udp(now)
+        if now - self.last_rx >= self.idle_timeout:
+            print(f'Server silent for {now - self.last_rx:.0f}s, disconnecting')
+            return False
+        
+        if now - self.last_tx >= self.keepalive_interval:
+            self.writer.push(MessageType.KEEPALIVE, b'', force=True)
+            self._flush_writer()
+            self.last_tx = now
+        return True
+    
     def _handle_tun_data(self):
         try:
-            packet = read_packet(self.tun_fd)
-            if packet:
-                self.client_socket.sendall(packet)
-        except ssl.SSLWantWriteError:
-            pass
+            packets = read_packets(self.tun_fd, self.tun_batch)
         except Exception as e:
             print(f'Error handling tun data: {e}')
             raise
+        
+        if packets and self._udp_active(time.monotonic()):
+            packets = [packet for packet in packets if not self._send_udp(packet)]
+        
+        for packet in packets:
+            self.writer.push(MessageType.DATA, packet)
+        if packets:
+            self._flush_writer()
+    
+    def get_stats(self) -> dict:
+        return {
+            'send_queue_bytes': len(self.writer),
+            'send_queue_drops': self.writer.dropped_packets,
+            'send_queue_drop_bytes': self.writer.dropped_bytes,
+            'tun_write_drops': self.tun_write_drops,
+            'tx_records': self.writer.records,
+            'tx_frames': self.writer.frames_sent,
+            'frames_per_record': self.writer.frames_sent / self.writer.records if self.writer.records else 0.0,
+            'reconnects': self.reconnects,
+            'reconnect_ttfp_last': self.reconnect_ttfp_last,
+            'reconnect_ttfp_max': self.reconnect_ttfp_max,
+            'udp_up': self.udp_up,
+            'udp_tx': self.udp_tx,
+            'udp_rx': self.udp_rx,
+            'udp_rejected': self.udp_rejected,
+        }
     
     def _handle_server_data(self):
         try:
-            data = self.client_socket.recv(2048)
-            if not data:
-                print('Server closed connection')
-                self.running = False
-                return
-            
-            write_packet(self.tun_fd, data)
+            while self.running:
+                if not self.reader.recv_into(self.client_socket):
+                    print('Server closed connection')
+                    self.running = False
+                    return
+                self.last_rx = time.monotonic()
+                
+                self._process_frames()
+                
+                if not self.client_socket.pending():
+                    break
         except ssl.SSLWantReadError:
             pass
         except Exception as e:
@@ -132,15 +310,37 @@ class VPNClientCore:
             self._receive_ip_assignment()
             self._configure_tun_interface()
             
-            self.running = True
             print(f'Connected to VPN server at {self.server_host}:{self.server_port}')
             print(f'TUN interface: {self.tun_name}')
             
+            while True:
+                self._run_tunnel()
+                if self.stopping or not self._reconnect():
+                    break
+        
+        except KeyboardInterrupt:
+            print('\nDisconnecting...')
+        except Exception as e:
+            print(f'Error: {e}')
+        finally:
+            self.stop()
+    
+    def _run_tunnel(self):
+        self.running = True
+        self.last_rx = self.last_tx = time.monotonic()
+        
+        try:
+            self._process_frames()
+            self._flush_writer()
+            
             while self.running:
                 read_list = [self.tun_fd, self.client_socket]
+                if self.udp_socket is not None:
+                    read_list.append(self.udp_socket)
+                write_list = [self.client_socket] if self.writer.pending() else []
                 
                 try:
-                    readable, _, exceptional = select.select(read_list, [], read_list, 1.0)
+                    readable, writable, exceptional = select.select(read_list, write_list, read_list, 1.0)
                 except Exception as e:
                     continue
                 
@@ -149,32 +349,97 @@ class VPNClientCore:
                         self._handle_tun_data()
                     elif s == self.client_socket:
                         self._handle_server_data()
+                    elif s == self.udp_socket:
+                        self._handle_udp_data()
+                
+                if writable:
+                    self._flush_writer()
                 
                 if exceptional:
                     print('Socket error detected')
                     break
-        
-        except KeyboardInterrupt:
-            print('\nDisconnecting...')
-        except Exception as e:
-            print(f'Error: {e}')
+                
+                if not self._check_keepalive():
+                    break
+        except (OSError, ValueError) as e:
+            print(f'Connection lost: {e}')
         finally:
-            self.stop()
+            self.running = False
     
-    def stop(self):
-        self.running = False
-        
+    def _close_socket(self):
+        self._close_udp()
         if self.client_socket:
             try:
                 self.client_socket.close()
             except:
                 pass
+            self.client_socket = None
+    
+    def _buffer_outage(self, duration: float):
+        deadline = time.monotonic() + duration
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            
+            readable, _, _ = select.select([self.tun_fd], [], [], remaining)
+            if readable:
+                for packet in read_packets(self.tun_fd, self.tun_batch):
+                    self.writer.push(MessageType.DATA, packet)
+    
+    def _reconnect(self) -> bool:
+        self._close_socket()
+        self.writer.abort_inflight()
+        if self.outage_started is None:
+            self.outage_started = time.monotonic()
+        
+        previous_ip = self.assigned_ip
+        delay = self.reconnect_delay
+        attempt = 0
+        
+        while not self.max_reconnect_attempts or attempt < self.max_reconnect_attempts:
+            attempt += 1
+            wait = random.uniform(0, delay)
+            print(f'Reconnecting in {wait:.1f}s (attempt {attempt})')
+            self._buffer_outage(wait)
+            delay = min(delay * 2, self.max_reconnect_delay)
+            
+            self.reader = FrameReader()
+            try:
+                self._connect_to_server()
+                self._receive_ip_assignment()
+            except (OSError, ValueError, RuntimeError) as e:
+                print(f'Reconnect failed: {e}')
+                self._close_socket()
+                continue
+            
+            if self.assigned_ip != previous_ip:
+                print(f'Server assigned a new IP {self.assigned_ip} (was {previous_ip}), dropping buffered packets')
+                self.writer.clear()
+                self._configure_tun_interface(previous_ip)
+            else:
+                self._sync_routes()
+            
+            self.reconnects += 1
+            print(f'Reconnected to VPN server at {self.server_host}:{self.server_port}, {len(self.writer)} bytes buffered')
+            return True
+        
+        print('Giving up on reconnecting')
+        return False
+    
+    def stop(self):
+        self.running = False
+        self.stopping = True
+        self._close_socket()
         
         if self.tun_fd is not None:
             try:
-                subprocess.run(['ip', 'route', 'del', '10.0.0.0/24', 'dev', self.tun_name], check=False)
+                remove_vpn_route(self.tun_name, self.vpn_network)
             except:
                 pass
             close_tun(self.tun_fd)
         
+        if self.netlink is not None:
+            self.netlink.close()
+        
         print('VPN Client stopped')
@@ -1,4 +1,9 @@
+import errno
+import ipaddress
+import socket
+import struct
 import subprocess
+from typing import Iterable, List, Set, Tuple
 
 
 def add_route_default(tun_name: str = 'tun0'):
@@ -10,4 +15,199 @@ def add_route_default(tun_name: str = 'tun0'):
 def remove_route_default(tun_name: str = 'tun0'):
     subprocess.run([
         'ip', 'route', 'del', '0.0.0.0/0', 'dev', tun_name
-    ], check=False)
\ No newline at end of file
+    ], check=False)
+
+
+def configure_interface(tun_name: str, address: str, vpn_subnet: str = '10.0.0.0/24'):
+    prefix_len = vpn_subnet.split('/')[1]
+
+    # Add IP address
+    try:
+        subprocess.run(
+            ['ip', 'addr', 'add', f'{address}/{prefix_len}', 'dev', tun_name],
+            check=True
+        )
+    except subprocess.CalledProcessError as e:
+        if "File exists" in str(e):
+            print(f"[Warning] IP {address} already assigned to {tun_name}")
+        else:
+            print(f"[Error] Failed to assign IP: {e}")
+            raise
+
+    # Bring interface up
+    try:
+        subprocess.run(
+            ['ip', 'link', 'set', 'dev', tun_name, 'up'],
+            check=True
+        )
+    except subprocess.CalledProcessError as e:
+        print(f"[Error] Failed to bring interface up: {e}")
+        raise
+
+    # Add VPN route
+    try:
+        # Delete old route first (safe)
+        subprocess.run(
+            ['ip', 'route', 'del', vpn_subnet, 'dev', tun_name],
+            check=False
+        )
+        subprocess.run(
+            ['ip', 'route', 'add', vpn_subnet, 'dev', tun_name],
+            check=True
+        )
+    except subprocess.CalledProcessError as e:
+        if "File exists" in str(e):
+            print(f"[Warning] Route {vpn_subnet} already exists")
+        else:
+            print(f"[Error] Failed to add VPN route: {e}")
+            raise
+
+
+def flush_interface(tun_name: str):
+    subprocess.run(['ip', 'addr', 'flush', 'dev', tun_name], check=False)
+
+
+def remove_vpn_route(tun_name: str, vpn_subnet: str = '10.0.0.0/24'):
+    subprocess.run(['ip', 'route', 'del', vpn_subnet, 'dev', tun_name], check=False)
+
+
+NETLINK_ROUTE = 0
+NLMSG_ERROR = 2
+RTM_NEWLINK = 16
+RTM_NEWADDR = 20
+RTM_DELADDR = 21
+RTM_NEWROUTE = 24
+RTM_DELROUTE = 25
+NLM_F_REQUEST = 0x1
+NLM_F_ACK = 0x4
+NLM_F_REPLACE = 0x100
+NLM_F_CREATE = 0x400
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+RTA_DST = 1
+RTA_OIF = 4
+IFF_UP = 0x1
+RT_TABLE_MAIN = 254
+RTPROT_STATIC = 4
+RT_SCOPE_UNIVERSE = 0
+RT_SCOPE_LINK = 253
+RTN_UNICAST = 1
+
+NLMSGHDR = struct.Struct('=IHHII')
+NLMSGERR = struct.Struct('=i')
+RTATTR = struct.Struct('=HH')
+RTMSG = struct.Struct('=BBBBBBBBI')
+IFADDRMSG = struct.Struct('=BBBBi')
+IFINFOMSG = struct.Struct('=BxHiII')
+
+
+def _rtattr(kind: int, data: bytes) -> bytes:
+    length = RTATTR.size + len(data)
+    return RTATTR.pack(length, kind) + data + bytes(-length % 4)
+
+
+class RouteSocket:
+    MAX_BATCH = 64 * 1024
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW | socket.SOCK_CLOEXEC, NETLINK_ROUTE)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1024 * 1024)
+        self.sock.bind((0, 0))
+        self.seq = 0
+
+    def close(self):
+        self.sock.close()
+
+    def _message(self, msg_type: int, flags: int, body: bytes) -> Tuple[int, bytes]:
+        self.seq += 1
+        header = NLMSGHDR.pack(NLMSGHDR.size + len(body), msg_type, NLM_F_REQUEST | NLM_F_ACK | flags, self.seq, 0)
+        return self.seq, header + body
+
+    def execute(self, messages: List[Tuple[int, bytes]], ignore: Tuple[int, ...] = ()) -> List[Tuple[int, int]]:
+        failures = []
+        start = 0
+        while start < len(messages):
+            end = start
+            size = 0
+            while end < len(messages) and (end == start or size + len(messages[end][1]) <= self.MAX_BATCH):
+                size += len(messages[end][1])
+                end += 1
+
+            batch = messages[start:end]
+            self.sock.sendmsg([data for _, data in batch])
+            failures.extend(self._collect_acks({seq: index for index, (seq, _) in enumerate(batch, start)}, ignore))
+            start = end
+        return failures
+
+    def _collect_acks(self, pending: dict, ignore: Tuple[int, ...]) -> List[Tuple[int, int]]:
+        failures = []
+        while pending:
+            data = self.sock.recv(1024 * 1024)
+            offset = 0
+            while offset + NLMSGHDR.size <= len(data):
+                length, msg_type, _, seq, _ = NLMSGHDR.unpack_from(data, offset)
+                if msg_type == NLMSG_ERROR and seq in pending:
+                    index = pending.pop(seq)
+                    error = -NLMSGERR.unpack_from(data, offset + NLMSGHDR.size)[0]
+                    if error and error not in ignore:
+                        failures.append((index, error))
+                offset += (length + 3) & ~3
+        return failures
+
+    def route_message(self, msg_type: int, network: str, ifindex: int) -> Tuple[int, bytes]:
+        net = ipaddress.IPv4Network(network, strict=False)
+        body = RTMSG.pack(
+            socket.AF_INET, net.prefixlen, 0, 0, RT_TABLE_MAIN, RTPROT_STATIC,
+            RT_SCOPE_LINK, RTN_UNICAST, 0
+        )
+        body += _rtattr(RTA_DST, net.network_address.packed) + _rtattr(RTA_OIF, struct.pack('=I', ifindex))
+        flags = NLM_F_CREATE | NLM_F_REPLACE if msg_type == RTM_NEWROUTE else 0
+        return self._message(msg_type, flags, body)
+
+    def address_message(self, msg_type: int, address: str, prefixlen: int, ifindex: int) -> Tuple[int, bytes]:
+        packed = ipaddress.IPv4Address(address).packed
+        body = IFADDRMSG.pack(socket.AF_INET, prefixlen, 0, RT_SCOPE_UNIVERSE, ifindex)
+        body += _rtattr(IFA_LOCAL, packed) + _rtattr(IFA_ADDRESS, packed)
+        flags = NLM_F_CREATE | NLM_F_REPLACE if msg_type == RTM_NEWADDR else 0
+        return self._message(msg_type, flags, body)
+
+    def link_up_message(self, ifindex: int) -> Tuple[int, bytes]:
+        return self._message(RTM_NEWLINK, 0, IFINFOMSG.pack(socket.AF_UNSPEC, 0, ifindex, IFF_UP, IFF_UP))
+
+    def configure_interface(self, tun_name: str, address: str, vpn_subnet: str, previous_address: str = None):
+        ifindex = socket.if_nametoindex(tun_name)
+        prefixlen = ipaddress.IPv4Network(vpn_subnet, strict=False).prefixlen
+        messages = []
+        if previous_address and previous_address != address:
+            messages.append(self.address_message(RTM_DELADDR, previous_address, prefixlen, ifindex))
+        messages.append(self.address_message(RTM_NEWADDR, address, prefixlen, ifindex))
+        messages.append(self.link_up_message(ifindex))
+        messages.append(self.route_message(RTM_NEWROUTE, vpn_subnet, ifindex))
+
+        failures = self.execute(messages, ignore=(errno.EADDRNOTAVAIL,))
+        if failures:
+            index, error = failures[0]
+            raise OSError(error, f'Failed to configure {tun_name}: {errno.errorcode.get(error, error)}')
+
+    def sync_routes(self, tun_name: str, installed: Set[str], wanted: Iterable[str]) -> Set[str]:
+        ifindex = socket.if_nametoindex(tun_name)
+        wanted = {str(ipaddress.IPv4Network(network, strict=False)) for network in wanted}
+        removed = sorted(installed - wanted)
+        added = sorted(wanted - installed)
+
+        messages = [self.route_message(RTM_DELROUTE, network, ifindex) for network in removed]
+        messages += [self.route_message(RTM_NEWROUTE, network, ifindex) for network in added]
+        failures = self.execute(messages, ignore=(errno.ESRCH,))
+
+        result = (installed - set(removed)) | set(added)
+        for index, error in failures:
+            network = removed[index] if index < len(removed) else added[index - len(removed)]
+            print(f"[Warning] Route {network} on {tun_name}: {errno.errorcode.get(error, error)}")
+            if index < len(removed):
+                result.add(network)
+            else:
+                result.discard(network)
+
+        if removed or added:
+            print(f"Routes on {tun_name}: {len(added)} added, {len(removed)} removed, {len(result)} installed")
+        return result
\ No newline at end of file
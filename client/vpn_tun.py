@@ -1,7 +1,7 @@
 import os
 import fcntl
 import struct
-from typing import Tuple
+from typing import List, Sequence, Tuple
 
 
 TUNSETIFF = 0x400454ca
@@ -26,5 +26,35 @@ def write_packet(tun_fd: int, packet: bytes) -> int:
     return os.write(tun_fd, packet)
 
 
+class PacketBatch:
+    def __init__(self, max_batch: int = 64, packet_size: int = 2048):
+        self.buffer = bytearray(max_batch * packet_size)
+        view = memoryview(self.buffer)
+        self.slots = [view[i * packet_size:(i + 1) * packet_size] for i in range(max_batch)]
+
+
+def read_packets(tun_fd: int, batch: PacketBatch) -> List[memoryview]:
+    packets = []
+    for slot in batch.slots:
+        try:
+            size = os.readv(tun_fd, [slot])
+        except BlockingIOError:
+            break
+        if size:
+            packets.append(slot[:size])
+    return packets
+
+
+def write_packets(tun_fd: int, packets: Sequence[bytes]) -> int:
+    written = 0
+    for packet in packets:
+        try:
+            os.write(tun_fd, packet)
+        except BlockingIOError:
+            break
+        written += 1
+    return written
+
+
 def close_tun(tun_fd: int):
     os.close(tun_fd)
\ No newline at end of file
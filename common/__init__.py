@@ -1,7 +1,8 @@
 from .protocol import Protocol
 from .crypto import CryptoHandler
-from .packet import PacketHandler
+from .packet import PacketHandler, PacketClassifier
 from .config import Config
+from .qos import QoSPolicy
 from .cert_generation import generate_certificates
 
-__all__ = ['Protocol', 'CryptoHandler', 'PacketHandler', 'Config', 'generate_certificates']
\ No newline at end of file
+__all__ = ['Protocol', 'CryptoHandler', 'PacketHandler', 'PacketClassifier', 'Config', 'QoSPolicy', 'generate_certificates']
\ No newline at end of file
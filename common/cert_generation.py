@@ -1,24 +1,45 @@
 from cryptography import x509
 from cryptography.x509.oid import NameOID, ExtensionOID
 from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
 from cryptography.hazmat.backends import default_backend
+from concurrent.futures import ProcessPoolExecutor
 import datetime
 import ipaddress
+import json
+import os
+import re
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
 
-def generate_private_key(key_size: int = 4096) -> rsa.RSAPrivateKey:
-    return rsa.generate_private_key(
-        public_exponent=65537,
-        key_size=key_size,
-        backend=default_backend()
-    )
+PrivateKey = Union[rsa.RSAPrivateKey, ec.EllipticCurvePrivateKey, ed25519.Ed25519PrivateKey]
+
+KEY_TYPES = ("rsa2048", "rsa4096", "ecdsa-p256", "ed25519")
+
+
+def generate_private_key(key_type: str = "rsa4096") -> PrivateKey:
+    if key_type == "rsa2048" or key_type == "rsa4096":
+        return rsa.generate_private_key(
+            public_exponent=65537,
+            key_size=int(key_type[3:]),
+            backend=default_backend()
+        )
+    if key_type == "ecdsa-p256":
+        return ec.generate_private_key(ec.SECP256R1(), default_backend())
+    if key_type == "ed25519":
+        return ed25519.Ed25519PrivateKey.generate()
+    raise ValueError(f"Unsupported key type {key_type}, expected one of {', '.join(KEY_TYPES)}")
+
+
+def signature_hash(signing_key: PrivateKey) -> Optional[hashes.HashAlgorithm]:
+    if isinstance(signing_key, ed25519.Ed25519PrivateKey):
+        return None
+    return hashes.SHA256()
 
 
 def generate_ca_certificate(
-    private_key: rsa.RSAPrivateKey,
+    private_key: PrivateKey,
     common_name: str = "VPN CA",
     validity_days: int = 3650
 ) -> x509.Certificate:
@@ -61,15 +82,15 @@ def generate_ca_certificate(
     ).add_extension(
         x509.SubjectKeyIdentifier.from_public_key(private_key.public_key()),
         critical=False,
-    ).sign(private_key, hashes.SHA256(), default_backend())
+    ).sign(private_key, signature_hash(private_key), default_backend())
     
     return cert
 
 
 def generate_server_certificate(
-    private_key: rsa.RSAPrivateKey,
+    private_key: PrivateKey,
     ca_cert: x509.Certificate,
-    ca_key: rsa.RSAPrivateKey,
+    ca_key: PrivateKey,
     common_name: str = "VPN Server",
     dns_names: list = None,
     validity_days: int = 825
@@ -117,7 +138,7 @@ def generate_server_certificate(
     ).add_extension(
         x509.KeyUsage(
             digital_signature=True,
-            key_encipherment=True,
+            key_encipherment=isinstance(private_key, rsa.RSAPrivateKey),
             key_cert_sign=False,
             crl_sign=False,
             content_commitment=False,
@@ -138,15 +159,15 @@ def generate_server_certificate(
     ).add_extension(
         x509.AuthorityKeyIdentifier.from_issuer_public_key(ca_key.public_key()),
         critical=False,
-    ).sign(ca_key, hashes.SHA256(), default_backend())
+    ).sign(ca_key, signature_hash(ca_key), default_backend())
     
     return cert
 
 
 def generate_client_certificate(
-    private_key: rsa.RSAPrivateKey,
+    private_key: PrivateKey,
     ca_cert: x509.Certificate,
-    ca_key: rsa.RSAPrivateKey,
+    ca_key: PrivateKey,
     common_name: str = "VPN Client",
     validity_days: int = 825
 ) -> x509.Certificate:
@@ -176,7 +197,7 @@ def generate_client_certificate(
     ).add_extension(
         x509.KeyUsage(
             digital_signature=True,
-            key_encipherment=True,
+            key_encipherment=isinstance(private_key, rsa.RSAPrivateKey),
             key_cert_sign=False,
             crl_sign=False,
             content_commitment=False,
@@ -197,16 +218,21 @@ def generate_client_certificate(
     ).add_extension(
         x509.AuthorityKeyIdentifier.from_issuer_public_key(ca_key.public_key()),
         critical=False,
-    ).sign(ca_key, hashes.SHA256(), default_backend())
+    ).sign(ca_key, signature_hash(ca_key), default_backend())
     
     return cert
 
 
-def save_private_key(key: rsa.RSAPrivateKey, path: Path):
+def save_private_key(key: PrivateKey, path: Path):
+    if isinstance(key, ed25519.Ed25519PrivateKey):
+        key_format = serialization.PrivateFormat.PKCS8
+    else:
+        key_format = serialization.PrivateFormat.TraditionalOpenSSL
+    
     with open(path, 'wb') as f:
         f.write(key.private_bytes(
             encoding=serialization.Encoding.PEM,
-            format=serialization.PrivateFormat.TraditionalOpenSSL,
+            format=key_format,
             encryption_algorithm=serialization.NoEncryption()
         ))
     path.chmod(0o600)
@@ -217,12 +243,110 @@ def save_certificate(cert: x509.Certificate, path: Path):
         f.write(cert.public_bytes(serialization.Encoding.PEM))
 
 
+def load_private_key(path: Path) -> PrivateKey:
+    with open(path, 'rb') as f:
+        return serialization.load_pem_private_key(f.read(), password=None, backend=default_backend())
+
+
+def load_certificate(path: Path) -> x509.Certificate:
+    with open(path, 'rb') as f:
+        return x509.load_pem_x509_certificate(f.read(), default_backend())
+
+
+_issuer = None
+
+
+def _file_stem(common_name: str) -> str:
+    return re.sub(r'[^A-Za-z0-9._-]', '_', common_name)
+
+
+def _init_issuer(ca_cert_path: str, ca_key_path: str, output_dir: str, key_type: str, validity_days: int):
+    global _issuer
+    _issuer = (
+        load_certificate(Path(ca_cert_path)),
+        load_private_key(Path(ca_key_path)),
+        Path(output_dir),
+        key_type,
+        validity_days,
+    )
+
+
+def _issue_client(common_name: str) -> Dict[str, str]:
+    ca_cert, ca_key, output_dir, key_type, validity_days = _issuer
+    
+    key = generate_private_key(key_type)
+    cert = generate_client_certificate(key, ca_cert, ca_key, common_name, validity_days)
+    
+    stem = _file_stem(common_name)
+    cert_path = output_dir / f'{stem}.crt'
+    key_path = output_dir / f'{stem}.key'
+    save_private_key(key, key_path)
+    save_certificate(cert, cert_path)
+    
+    not_after = getattr(cert, 'not_valid_after_utc', None) or cert.not_valid_after
+    return {
+        'common_name': common_name,
+        'serial': format(cert.serial_number, 'x'),
+        'not_after': not_after.isoformat(),
+        'cert': str(cert_path),
+        'key': str(key_path),
+    }
+
+
+def issue_client_certificates(
+    common_names: Iterable[str],
+    output_dir: str = None,
+    ca_dir: str = None,
+    key_type: str = "rsa4096",
+    validity_days: int = 825,
+    workers: Optional[int] = None
+) -> List[Dict[str, str]]:
+    certs_dir = Path(__file__).parent.parent / 'certificates'
+    ca_dir = Path(ca_dir) if ca_dir else certs_dir
+    output_dir = Path(output_dir) if output_dir else certs_dir / 'clients'
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    common_names = list(common_names)
+    stems = {}
+    for common_name in common_names:
+        stem = _file_stem(common_name)
+        if stem in stems:
+            raise ValueError(f"Common names {stems[stem]!r} and {common_name!r} both map to {stem}.crt")
+        stems[stem] = common_name
+    
+    workers = workers or os.cpu_count() or 1
+    initargs = (str(ca_dir / 'ca.crt'), str(ca_dir / 'ca.key'), str(output_dir), key_type, validity_days)
+    
+    if workers == 1:
+        _init_issuer(*initargs)
+        manifest = [_issue_client(common_name) for common_name in common_names]
+    else:
+        chunksize = max(1, len(common_names) // (workers * 8))
+        with ProcessPoolExecutor(workers, initializer=_init_issuer, initargs=initargs) as pool:
+            manifest = list(pool.map(_issue_client, common_names, chunksize=chunksize))
+    
+    manifest_path = output_dir / 'manifest.json'
+    existing = []
+    if manifest_path.exists():
+        with open(manifest_path, 'r') as f:
+            existing = json.load(f)
+    issued = {entry['common_name'] for entry in manifest}
+    entries = [entry for entry in existing if entry['common_name'] not in issued] + manifest
+    
+    with open(manifest_path, 'w') as f:
+        json.dump(entries, f, indent=2)
+    
+    return manifest
+
+
 def generate_certificates(
     output_dir: str = None,
     ca_common_name: str = "VPN CA",
     server_common_name: str = "VPN Server",
     client_common_name: str = "VPN Client",
-    server_dns_names: list = None
+    server_dns_names: list = None,
+    key_type: str = "rsa4096",
+    reuse_ca: bool = False
 ) -> Dict[str, str]:
     if output_dir is None:
         output_dir = Path(__file__).parent.parent / 'certificates'
@@ -231,15 +355,21 @@ def generate_certificates(
     
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    ca_key = generate_private_key()
-    ca_cert = generate_ca_certificate(ca_key, ca_common_name)
+    ca_key_path = output_dir / 'ca.key'
+    ca_cert_path = output_dir / 'ca.crt'
+    if reuse_ca and ca_key_path.exists() and ca_cert_path.exists():
+        ca_key = load_private_key(ca_key_path)
+        ca_cert = load_certificate(ca_cert_path)
+    else:
+        ca_key = generate_private_key(key_type)
+        ca_cert = generate_ca_certificate(ca_key, ca_common_name)
     
-    server_key = generate_private_key()
+    server_key = generate_private_key(key_type)
     server_cert = generate_server_certificate(
         server_key, ca_cert, ca_key, server_common_name, server_dns_names
     )
     
-    client_key = generate_private_key()
+    client_key = generate_private_key(key_type)
     client_cert = generate_client_certificate(
         client_key, ca_cert, ca_key, client_common_name
     )
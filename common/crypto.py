@@ -1,15 +1,39 @@
+from cryptography.exceptions import InvalidTag
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from typing import Tuple
+from typing import Iterable, List, Optional, Tuple
 import os
+import struct
 
 
 class CryptoHandler:
-    def __init__(self, key: bytes = None):
+    AEADS = {
+        'aes-256-gcm': AESGCM,
+        'chacha20-poly1305': ChaCha20Poly1305,
+    }
+    COUNTER = struct.Struct('!Q')
+    NONCE = struct.Struct('!4sQ')
+    TAG_SIZE = 16
+    OVERHEAD = 8 + TAG_SIZE
+    MAX_COUNTER = (1 << 64) - 1
+    
+    def __init__(self, key: bytes = None, aead: str = 'aes-256-gcm', nonce_prefix: bytes = bytes(4)):
         self.key = key or os.urandom(32)
         self.backend = default_backend()
+        if aead not in self.AEADS:
+            raise ValueError(f'Unsupported AEAD {aead}, expected one of {", ".join(self.AEADS)}')
+        if len(nonce_prefix) != 4:
+            raise ValueError('Nonce prefix must be 4 bytes')
+        self.aead_name = aead
+        self.aead = self.AEADS[aead](self.key)
+        self.nonce_prefix = bytes(nonce_prefix)
+        self.counter = 0
+        self.auth_failures = 0
+        self._encrypt_into = getattr(self.aead, 'encrypt_into', None)
+        self._decrypt_into = getattr(self.aead, 'decrypt_into', None)
     
     def encrypt(self, data: bytes) -> bytes:
         iv = os.urandom(16)
@@ -26,10 +50,158 @@ class CryptoHandler:
         decryptor = cipher.decryptor()
         return decryptor.update(ciphertext) + decryptor.finalize()
     
+    def _next_nonce(self) -> Tuple[int, bytes]:
+        counter = self.counter
+        if counter >= self.MAX_COUNTER:
+            raise OverflowError('Nonce counter exhausted, rekey required')
+        self.counter = counter + 1
+        return counter, self.NONCE.pack(self.nonce_prefix, counter)
+    
+    @staticmethod
+    def packet_counter(data) -> int:
+        return CryptoHandler.COUNTER.unpack_from(data)[0]
+    
+    def seal(self, packet, associated_data: Optional[bytes] = None) -> bytes:
+        counter, nonce = self._next_nonce()
+        return self.COUNTER.pack(counter) + self.aead.encrypt(nonce, packet, associated_data)
+    
+    def seal_into(self, packet, out, associated_data: Optional[bytes] = None) -> int:
+        counter, nonce = self._next_nonce()
+        size = 8 + len(packet) + self.TAG_SIZE
+        self.COUNTER.pack_into(out, 0, counter)
+        if self._encrypt_into is not None:
+            self._encrypt_into(nonce, packet, associated_data, memoryview(out)[8:size])
+        else:
+            out[8:size] = self.aead.encrypt(nonce, packet, associated_data)
+        return size
+    
+    def open(self, data, associated_data: Optional[bytes] = None) -> bytes:
+        nonce = self.NONCE.pack(self.nonce_prefix, self.COUNTER.unpack_from(data)[0])
+        return self.aead.decrypt(nonce, memoryview(data)[8:], associated_data)
+    
+    def open_into(self, data, out, associated_data: Optional[bytes] = None) -> int:
+        nonce = self.NONCE.pack(self.nonce_prefix, self.COUNTER.unpack_from(data)[0])
+        size = len(data) - self.OVERHEAD
+        if self._decrypt_into is not None:
+            self._decrypt_into(nonce, memoryview(data)[8:], associated_data, memoryview(out)[:size])
+        else:
+            out[:size] = self.aead.decrypt(nonce, memoryview(data)[8:], associated_data)
+        return size
+    
+    def seal_batch(self, packets: Iterable, associated_data: Optional[bytes] = None) -> List[bytes]:
+        encrypt = self.aead.encrypt
+        pack_counter = self.COUNTER.pack
+        pack_nonce = self.NONCE.pack
+        prefix = self.nonce_prefix
+        
+        sealed = []
+        for packet in packets:
+            counter = self.counter
+            if counter >= self.MAX_COUNTER:
+                raise OverflowError('Nonce counter exhausted, rekey required')
+            self.counter = counter + 1
+            sealed.append(pack_counter(counter) + encrypt(pack_nonce(prefix, counter), packet, associated_data))
+        return sealed
+    
+    def open_batch(self, datagrams: Iterable, associated_data: Optional[bytes] = None) -> List[bytes]:
+        decrypt = self.aead.decrypt
+        unpack_counter = self.COUNTER.unpack_from
+        pack_nonce = self.NONCE.pack
+        prefix = self.nonce_prefix
+        
+        opened = []
+        for data in datagrams:
+            try:
+                nonce = pack_nonce(prefix, unpack_counter(data)[0])
+                opened.append(decrypt(nonce, memoryview(data)[8:], associated_data))
+            except (InvalidTag, struct.error):
+                self.auth_failures += 1
+        return opened
+    
     @staticmethod
     def derive_key(password: str, salt: bytes = None) -> Tuple[bytes, bytes]:
         if salt is None:
             salt = os.urandom(16)
         kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=100000, backend=default_backend())
         key = kdf.derive(password.encode())
-        return key, salt
\ No newline at end of file
+        return key, salt
+
+
+class ReplayWindow:
+    def __init__(self, size: int = 1024):
+        self.size = size
+        self.mask = (1 << size) - 1
+        self.highest = -1
+        self.bitmap = 0
+    
+    def check(self, counter: int) -> bool:
+        if counter > self.highest:
+            return True
+        offset = self.highest - counter
+        return offset < self.size and not (self.bitmap >> offset) & 1
+    
+    def update(self, counter: int):
+        if counter > self.highest:
+            shift = counter - self.highest
+            self.bitmap = ((self.bitmap << shift) | 1) & self.mask if shift < self.size else 1
+            self.highest = counter
+        else:
+            self.bitmap |= 1 << (self.highest - counter)
+
+
+class DatagramChannel:
+    SESSION_ID_SIZE = 8
+    OVERHEAD = SESSION_ID_SIZE + CryptoHandler.OVERHEAD
+    
+    def __init__(self, session_id: bytes, send_key: bytes, recv_key: bytes, aead: str = 'aes-256-gcm', replay_window: int = 1024):
+        self.session_id = session_id
+        self.sender = CryptoHandler(send_key, aead)
+        self.receiver = CryptoHandler(recv_key, aead)
+        self.replay = ReplayWindow(replay_window)
+        self.peer = None
+        self.last_rx = 0.0
+        self.replays = 0
+    
+    @classmethod
+    def create(cls, aead: str = 'aes-256-gcm') -> Tuple['DatagramChannel', dict]:
+        session_id = os.urandom(cls.SESSION_ID_SIZE)
+        send_key, recv_key = os.urandom(32), os.urandom(32)
+        offer = {
+            'session_id': session_id.hex(),
+            'aead': aead,
+            'client_key': recv_key.hex(),
+            'server_key': send_key.hex(),
+        }
+        return cls(session_id, send_key, recv_key, aead), offer
+    
+    @classmethod
+    def from_offer(cls, offer: dict) -> 'DatagramChannel':
+        return cls(
+            bytes.fromhex(offer['session_id']),
+            bytes.fromhex(offer['client_key']),
+            bytes.fromhex(offer['server_key']),
+            offer.get('aead', 'aes-256-gcm')
+        )
+    
+    def seal(self, packet) -> bytes:
+        return self.session_id + self.sender.seal(packet)
+    
+    def open(self, datagram) -> Optional[bytes]:
+        data = memoryview(datagram)[self.SESSION_ID_SIZE:]
+        if len(data) < CryptoHandler.OVERHEAD:
+            self.receiver.auth_failures += 1
+            return None
+        
+        counter = CryptoHandler.packet_counter(data)
+        if not self.replay.check(counter):
+            self.replays += 1
+            return None
+        
+        try:
+            payload = self.receiver.open(data)
+        except InvalidTag:
+            self.receiver.auth_failures += 1
+            return None
+        
+        self.replay.update(counter)
+        return payload
\ No newline at end of file
@@ -1,8 +1,21 @@
+import socket
 import struct
-from typing import Optional
+from typing import Optional, Sequence
 
 
 class PacketHandler:
+    @staticmethod
+    def ip_to_int(ip: str) -> int:
+        return int.from_bytes(socket.inet_aton(ip), 'big')
+    
+    @staticmethod
+    def int_to_ip(value: int) -> str:
+        return socket.inet_ntoa(value.to_bytes(4, 'big'))
+    
+    @staticmethod
+    def dst_addr(data) -> int:
+        return int.from_bytes(data[16:20], 'big')
+    
     @staticmethod
     def parse_ip_header(data: bytes) -> dict:
         if len(data) < 20:
@@ -28,4 +41,61 @@ class PacketHandler:
         if len(data) < 20:
             return False
         header = PacketHandler.parse_ip_header(data)
-        return header.get('version') == 4
\ No newline at end of file
+        return header.get('version') == 4
+
+
+class PacketClassifier:
+    INTERACTIVE = 0
+    DEFAULT = 1
+    BULK = 2
+    CLASSES = ('interactive', 'default', 'bulk')
+    UNMARKED = 255
+    
+    INTERACTIVE_DSCP = (34, 36, 38, 40, 46, 48, 56)
+    BULK_DSCP = (8, 10, 12, 14)
+    INTERACTIVE_PORTS = (22, 53, 123, 3478, 3479, 5060, 5061)
+    INTERACTIVE_PROTOCOLS = (1,)
+    
+    def __init__(
+        self,
+        interactive_ports: Sequence[int] = INTERACTIVE_PORTS,
+        bulk_ports: Sequence[int] = (),
+        interactive_protocols: Sequence[int] = INTERACTIVE_PROTOCOLS
+    ):
+        self.dscp = bytearray([self.UNMARKED]) * 64
+        for code in self.INTERACTIVE_DSCP:
+            self.dscp[code] = self.INTERACTIVE
+        for code in self.BULK_DSCP:
+            self.dscp[code] = self.BULK
+        
+        self.protocols = bytearray([self.DEFAULT]) * 256
+        for protocol in interactive_protocols:
+            self.protocols[protocol] = self.INTERACTIVE
+        
+        self.ports = bytearray([self.DEFAULT]) * 65536
+        for port in bulk_ports:
+            self.ports[port] = self.BULK
+        for port in interactive_ports:
+            self.ports[port] = self.INTERACTIVE
+    
+    def classify(self, packet) -> int:
+        if len(packet) < 20 or packet[0] >> 4 != 4:
+            return self.DEFAULT
+        
+        marked = self.dscp[packet[1] >> 2]
+        if marked != self.UNMARKED:
+            return marked
+        
+        protocol = packet[9]
+        if protocol != 6 and protocol != 17:
+            return self.protocols[protocol]
+        
+        offset = (packet[0] & 0x0F) << 2
+        if len(packet) < offset + 4 or packet[6] & 0x1F or packet[7]:
+            return self.DEFAULT
+        ports = self.ports
+        source = ports[packet[offset] << 8 | packet[offset + 1]]
+        destination = ports[packet[offset + 2] << 8 | packet[offset + 3]]
+        if source == self.INTERACTIVE or destination == self.INTERACTIVE:
+            return self.INTERACTIVE
+        return destination if source == self.DEFAULT else source
\ No newline at end of file
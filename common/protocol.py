@@ -1,6 +1,8 @@
+import ssl
 import struct
+from collections import deque
 from enum import IntEnum
-from typing import Tuple
+from typing import Callable, Iterator, Optional, Sequence, Tuple
 
 
 class MessageType(IntEnum):
@@ -14,16 +16,293 @@ class MessageType(IntEnum):
 class Protocol:
     HEADER_SIZE = 8
     VERSION = 1
+    MAX_PAYLOAD = 65535
+    HEADER = struct.Struct('!HHI')
     
     @staticmethod
     def pack_message(msg_type: MessageType, data: bytes) -> bytes:
-        header = struct.pack('!HHI', Protocol.VERSION, msg_type, len(data))
+        header = Protocol.HEADER.pack(Protocol.VERSION, msg_type, len(data))
         return header + data
     
     @staticmethod
     def unpack_message(data: bytes) -> Tuple[int, MessageType, bytes]:
         if len(data) < Protocol.HEADER_SIZE:
             raise ValueError('Incomplete message')
-        version, msg_type, length = struct.unpack('!HHI', data[:Protocol.HEADER_SIZE])
+        version, msg_type, length = Protocol.HEADER.unpack_from(data)
         payload = data[Protocol.HEADER_SIZE:Protocol.HEADER_SIZE + length]
-        return version, MessageType(msg_type), payload
\ No newline at end of file
+        return version, MessageType(msg_type), payload
+
+
+class FrameReader:
+    def __init__(
+        self,
+        capacity: int = 4 * (Protocol.HEADER_SIZE + Protocol.MAX_PAYLOAD),
+        min_recv: int = Protocol.HEADER_SIZE + Protocol.MAX_PAYLOAD
+    ):
+        self.buffer = bytearray(capacity)
+        self.view = memoryview(self.buffer)
+        self.min_recv = min_recv
+        self.start = 0
+        self.end = 0
+    
+    def __len__(self) -> int:
+        return self.end - self.start
+    
+    def _compact(self):
+        pending = self.end - self.start
+        if pending:
+            self.buffer[:pending] = self.view[self.start:self.end]
+        self.start = 0
+        self.end = pending
+    
+    def feed(self, data: bytes):
+        size = len(data)
+        if self.end + size > len(self.buffer):
+            self._compact()
+            if self.end + size > len(self.buffer):
+                raise ValueError('Frame buffer overflow')
+        self.view[self.end:self.end + size] = data
+        self.end += size
+    
+    def recv_into(self, sock) -> int:
+        if len(self.buffer) - self.end < self.min_recv:
+            self._compact()
+        
+        size = sock.recv_into(self.view[self.end:])
+        self.end += size
+        return size
+    
+    def read_frames(self) -> Iterator[Tuple[MessageType, memoryview]]:
+        header_size = Protocol.HEADER_SIZE
+        unpack_from = Protocol.HEADER.unpack_from
+        
+        while self.end - self.start >= header_size:
+            version, msg_type, length = unpack_from(self.buffer, self.start)
+            if version != Protocol.VERSION:
+                raise ValueError(f'Unsupported protocol version {version}')
+            if length > Protocol.MAX_PAYLOAD:
+                raise ValueError(f'Frame too large: {length} bytes')
+            
+            frame_end = self.start + header_size + length
+            if frame_end > self.end:
+                break
+            
+            payload = self.view[self.start + header_size:frame_end]
+            self.start = frame_end
+            yield MessageType(msg_type), payload
+        
+        if self.start == self.end:
+            self.start = self.end = 0
+
+
+class FrameWriter:
+    MAX_RECORD = 16384
+    
+    def __init__(self, high_water: int = 1024 * 1024, max_record: int = MAX_RECORD):
+        self.high_water = high_water
+        self.max_record = max_record
+        self.frames = deque()
+        self.queued_bytes = 0
+        self.inflight = None
+        self.inflight_frames = 0
+        self.dropped_packets = 0
+        self.dropped_bytes = 0
+        self.records = 0
+        self.frames_sent = 0
+        self.bytes_sent = 0
+    
+    def __len__(self) -> int:
+        return self.queued_bytes
+    
+    def pending(self) -> bool:
+        return self.inflight is not None or self._has_frames()
+    
+    def _has_frames(self) -> bool:
+        return bool(self.frames)
+    
+    def push(self, msg_type: MessageType, payload: bytes, force: bool = False) -> bool:
+        size = Protocol.HEADER_SIZE + len(payload)
+        if not force and self.queued_bytes + size > self.high_water:
+            self.dropped_packets += 1
+            self.dropped_bytes += len(payload)
+            return False
+        
+        self.frames.append(Protocol.pack_message(msg_type, payload))
+        self.queued_bytes += size
+        return True
+    
+    def _next_record(self):
+        frames = self.frames
+        if len(frames) == 1 or len(frames[0]) >= self.max_record:
+            self.inflight = frames.popleft()
+            self.inflight_frames = 1
+            return
+        
+        chunk = []
+        size = 0
+        while frames and size + len(frames[0]) <= self.max_record:
+            frame = frames.popleft()
+            chunk.append(frame)
+            size += len(frame)
+        
+        self.inflight = b''.join(chunk)
+        self.inflight_frames = len(chunk)
+    
+    def flush(self, sock, budget: Optional[int] = None) -> bool:
+        while True:
+            if self.inflight is None:
+                if not self._has_frames():
+                    return True
+                if budget is not None and budget <= 0:
+                    return False
+                self._next_record()
+            
+            try:
+                sent = sock.send(self.inflight)
+            except (ssl.SSLWantWriteError, ssl.SSLWantReadError, BlockingIOError):
+                return False
+            
+            self.queued_bytes -= sent
+            self.bytes_sent += sent
+            if budget is not None:
+                budget -= sent
+            if sent < len(self.inflight):
+                self.inflight = memoryview(self.inflight)[sent:]
+                return False
+            
+            self.inflight = None
+            self.records += 1
+            self.frames_sent += self.inflight_frames
+    
+    def abort_inflight(self):
+        if self.inflight is None:
+            return
+        
+        self.queued_bytes -= len(self.inflight)
+        self.dropped_packets += self.inflight_frames
+        self.dropped_bytes += len(self.inflight)
+        self.inflight = None
+    
+    def clear(self):
+        self.frames.clear()
+        self.queued_bytes = 0
+        self.inflight = None
+
+
+class PriorityFrameWriter(FrameWriter):
+    QUANTUM = 1500
+    
+    def __init__(
+        self,
+        classify: Callable[[bytes], int],
+        weights: Sequence[int],
+        high_water: int = 1024 * 1024,
+        max_record: int = FrameWriter.MAX_RECORD,
+        strict: bool = False
+    ):
+        super().__init__(high_water, max_record)
+        self.classify = classify
+        self.strict = strict
+        self.queues = [deque() for _ in weights]
+        self.quanta = [weight * self.QUANTUM for weight in weights]
+        self.deficits = [0] * len(weights)
+        self.deficits[0] = self.quanta[0]
+        self.turn = 0
+        self.queued_frames = 0
+        self.class_bytes = [0] * len(weights)
+        self.class_frames = [0] * len(weights)
+        self.pushed_out = 0
+    
+    def _has_frames(self) -> bool:
+        return self.queued_frames > 0
+    
+    def push(self, msg_type: MessageType, payload: bytes, force: bool = False) -> bool:
+        priority = self.classify(payload) if msg_type == MessageType.DATA else 0
+        size = Protocol.HEADER_SIZE + len(payload)
+        if not force and self.queued_bytes + size > self.high_water and not self._push_out(priority, size):
+            self.dropped_packets += 1
+            self.dropped_bytes += len(payload)
+            return False
+        
+        self.queues[priority].append(Protocol.pack_message(msg_type, payload))
+        self.queued_bytes += size
+        self.queued_frames += 1
+        self.class_bytes[priority] += size
+        return True
+    
+    def _push_out(self, priority: int, size: int) -> bool:
+        limit = self.high_water - size
+        if self.queued_bytes - sum(self.class_bytes[priority + 1:]) > limit:
+            return False
+        
+        for lower in range(len(self.queues) - 1, priority, -1):
+            queue = self.queues[lower]
+            while queue and self.queued_bytes > limit:
+                frame = queue.pop()
+                self.queued_bytes -= len(frame)
+                self.queued_frames -= 1
+                self.class_bytes[lower] -= len(frame)
+                self.pushed_out += 1
+                self.dropped_packets += 1
+                self.dropped_bytes += len(frame) - Protocol.HEADER_SIZE
+        return True
+    
+    def _next_record(self):
+        chunk = []
+        if self.strict:
+            self._fill_strict(chunk)
+        else:
+            self._fill_weighted(chunk)
+        
+        self.queued_frames -= len(chunk)
+        self.inflight = chunk[0] if len(chunk) == 1 else b''.join(chunk)
+        self.inflight_frames = len(chunk)
+    
+    def _fill_strict(self, chunk: list):
+        size = 0
+        limit = self.max_record
+        for priority, queue in enumerate(self.queues):
+            sent, start = len(chunk), size
+            while queue and (not chunk or size + len(queue[0]) <= limit):
+                frame = queue.popleft()
+                chunk.append(frame)
+                size += len(frame)
+            self.class_frames[priority] += len(chunk) - sent
+            self.class_bytes[priority] -= size - start
+            if queue:
+                return
+    
+    def _fill_weighted(self, chunk: list):
+        queues, deficits = self.queues, self.deficits
+        size = 0
+        limit = self.max_record
+        turn = self.turn
+        idle = 0
+        while idle < len(queues):
+            queue = queues[turn]
+            while queue and len(queue[0]) <= deficits[turn]:
+                if chunk and size + len(queue[0]) > limit:
+                    self.turn = turn
+                    return
+                frame = queue.popleft()
+                chunk.append(frame)
+                size += len(frame)
+                deficits[turn] -= len(frame)
+                self.class_bytes[turn] -= len(frame)
+                self.class_frames[turn] += 1
+            
+            if queue:
+                idle = 0
+            else:
+                deficits[turn] = 0
+                idle += 1
+            turn = (turn + 1) % len(queues)
+            deficits[turn] += self.quanta[turn]
+        self.turn = turn
+    
+    def clear(self):
+        super().clear()
+        for queue in self.queues:
+            queue.clear()
+        self.queued_frames = 0
+        self.class_bytes = [0] * len(self.queues)
\ No newline at end of file
@@ -0,0 +1,29 @@
+from typing import Optional
+from .packet import PacketClassifier
+from .protocol import FrameWriter, PriorityFrameWriter
+
+
+class QoSPolicy:
+    SCHEDULERS = ('fifo', 'strict', 'weighted')
+    WEIGHTS = {'interactive': 8, 'default': 4, 'bulk': 1}
+    
+    def __init__(self, config: Optional[dict] = None):
+        config = config or {}
+        self.scheduler = config.get('scheduler', 'weighted')
+        if self.scheduler not in self.SCHEDULERS:
+            raise ValueError(f'Unknown QoS scheduler {self.scheduler}')
+        
+        weights = {**self.WEIGHTS, **config.get('weights', {})}
+        self.weights = tuple(max(1, int(weights[name])) for name in PacketClassifier.CLASSES)
+        self.classifier = PacketClassifier(
+            config.get('interactive_ports', PacketClassifier.INTERACTIVE_PORTS),
+            config.get('bulk_ports', ())
+        )
+    
+    def __bool__(self) -> bool:
+        return self.scheduler != 'fifo'
+    
+    def writer(self, high_water: int) -> FrameWriter:
+        if not self:
+            return FrameWriter(high_water)
+        return PriorityFrameWriter(self.classifier.classify, self.weights, high_water, strict=self.scheduler == 'strict')
\ No newline at end of file
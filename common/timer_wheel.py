@@ -0,0 +1,75 @@
+from typing import Any, Dict, List, Tuple
+
+
+class TimerWheel:
+    def __init__(self, now: float, resolution: float = 0.1, slot_bits: int = 6, levels: int = 4):
+        self.resolution = resolution
+        self.origin = now
+        self.slot_bits = slot_bits
+        self.slot_mask = (1 << slot_bits) - 1
+        self.levels = levels
+        self.max_ticks = (1 << (slot_bits * levels)) - 1
+        self.tick = 0
+        self.wheels: List[List[Dict[Any, int]]] = [[{} for _ in range(1 << slot_bits)] for _ in range(levels)]
+        self.timers: Dict[Any, Tuple[int, int]] = {}
+    
+    def __len__(self) -> int:
+        return len(self.timers)
+    
+    def __contains__(self, key) -> bool:
+        return key in self.timers
+    
+    def _insert(self, key, expires: int):
+        delta = expires - self.tick
+        level = 0
+        while level < self.levels - 1 and delta >> (self.slot_bits * (level + 1)):
+            level += 1
+        
+        slot = (expires >> (self.slot_bits * level)) & self.slot_mask
+        self.wheels[level][slot][key] = expires
+        self.timers[key] = (level, slot)
+    
+    def schedule(self, key, when: float):
+        self.cancel(key)
+        expires = int((when - self.origin) / self.resolution) + 1
+        expires = min(max(expires, self.tick + 1), self.tick + self.max_ticks)
+        self._insert(key, expires)
+    
+    def cancel(self, key) -> bool:
+        position = self.timers.pop(key, None)
+        if position is None:
+            return False
+        level, slot = position
+        del self.wheels[level][slot][key]
+        return True
+    
+    def _cascade(self, level: int):
+        slot = (self.tick >> (self.slot_bits * level)) & self.slot_mask
+        bucket = self.wheels[level][slot]
+        self.wheels[level][slot] = {}
+        for key, expires in bucket.items():
+            self._insert(key, expires)
+    
+    def advance(self, now: float) -> List[Any]:
+        target = int((now - self.origin) / self.resolution)
+        if not self.timers:
+            self.tick = max(self.tick, target)
+            return []
+        
+        expired = []
+        while self.tick < target:
+            self.tick += 1
+            
+            level = 1
+            while level < self.levels and not self.tick & ((1 << (self.slot_bits * level)) - 1):
+                self._cascade(level)
+                level += 1
+            
+            slot = self.tick & self.slot_mask
+            bucket = self.wheels[0][slot]
+            if bucket:
+                self.wheels[0][slot] = {}
+                for key in bucket:
+                    del self.timers[key]
+                expired.extend(bucket)
+        return expired
\ No newline at end of file
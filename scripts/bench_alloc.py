@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import socket
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common.protocol import Protocol, MessageType, FrameReader
+from server.vpn_connection import ClientConnection
+from server.vpn_server_core import VPNServerCore
+
+
+def build_server():
+    tun_side, kernel_side = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+    tun_side.setblocking(False)
+    kernel_side.setblocking(False)
+    kernel_side.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    
+    server_side, peer_side = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+    server_side.setblocking(False)
+    
+    server = VPNServerCore()
+    server.tun_fd = tun_side.fileno()
+    client = ClientConnection(server_side, ('peer', 0), '10.0.0.10')
+    server.clients[server_side] = client
+    server.routes.add(client.address, 32, client)
+    
+    return server, server_side, peer_side, kernel_side, tun_side
+
+
+def drain_tun(kernel_side: socket.socket, buffer: memoryview) -> int:
+    count = 0
+    while True:
+        try:
+            kernel_side.recv_into(buffer)
+        except BlockingIOError:
+            return count
+        count += 1
+
+
+def legacy_receive(reader: FrameReader, sock: socket.socket, tun_fd: int):
+    try:
+        while True:
+            data = sock.recv(65536)
+            if not data:
+                return
+            reader.feed(data)
+            for msg_type, payload in reader.read_frames():
+                if msg_type == MessageType.DATA:
+                    os.write(tun_fd, payload)
+    except BlockingIOError:
+        pass
+
+
+def measure(args, receive) -> tuple:
+    server, server_side, peer_side, kernel_side, tun_side = build_server()
+    packet = bytes([0x45]) + bytes(args.packet_size - 1)
+    burst = Protocol.pack_message(MessageType.DATA, packet) * args.burst
+    drain_buffer = memoryview(bytearray(65536))
+    
+    def iteration() -> int:
+        peer_side.sendall(burst)
+        receive(server, server_side)
+        return drain_tun(kernel_side, drain_buffer)
+    
+    for _ in range(args.warmup):
+        iteration()
+    
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    
+    packets = 0
+    for _ in range(args.iterations):
+        packets += iteration()
+    
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    for sock in (server_side, peer_side, kernel_side, tun_side):
+        sock.close()
+    
+    return packets, (current - baseline) / max(packets, 1), peak - baseline
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Steady-state allocation of the client-to-TUN data path: recv_into vs the old recv() path')
+    parser.add_argument('--packet-size', type=int, default=1400, help='IP packet size in bytes')
+    parser.add_argument('--burst', type=int, default=32, help='Frames written per iteration')
+    parser.add_argument('--iterations', type=int, default=2000, help='Measured iterations')
+    parser.add_argument('--warmup', type=int, default=200, help='Unmeasured iterations')
+    args = parser.parse_args()
+    
+    packets, per_packet, peak = measure(args, lambda server, sock: server._handle_client_data(sock))
+    print(f'recv_into path: {packets} packets, {per_packet:.3f} bytes retained/packet, peak +{peak} bytes')
+    
+    legacy_reader = FrameReader()
+    _, legacy_per_packet, legacy_peak = measure(
+        args, lambda server, sock: legacy_receive(legacy_reader, sock, server.tun_fd)
+    )
+    print(f'recv() path:    {legacy_per_packet:.3f} bytes retained/packet, peak +{legacy_peak} bytes')
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
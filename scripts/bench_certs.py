@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from client.vpn_encryption import create_ssl_context as create_client_context
+from common.cert_generation import generate_certificates, generate_private_key, KEY_TYPES
+from server.vpn_encryption import create_ssl_context as create_server_context
+from scripts.bench_handshake import Timer, handshake
+
+
+def bench_keygen(key_type: str, count: int) -> float:
+    started = time.perf_counter()
+    for _ in range(count):
+        generate_private_key(key_type)
+    return (time.perf_counter() - started) / count
+
+
+def bench_handshakes(paths: dict, duration: float) -> float:
+    server_context = create_server_context(paths['server_cert'], paths['server_key'], paths['ca_cert'])
+    client_context = create_client_context(paths['client_cert'], paths['client_key'], paths['ca_cert'])
+    server_timer = Timer()
+    
+    count = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        handshake(server_context, client_context, None, server_timer, Timer())
+        count += 1
+    return count / server_timer.elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Key generation time and full TLS handshake rate per key type')
+    parser.add_argument('--key-types', nargs='+', choices=KEY_TYPES, default=list(KEY_TYPES), help='Key types to compare')
+    parser.add_argument('--keys', type=int, default=3, help='Keys generated per type for the keygen timing')
+    parser.add_argument('--duration', type=float, default=3.0, help='Seconds of handshakes per key type')
+    args = parser.parse_args()
+    
+    print(f'{"key type":<12} {"keygen ms":>10} {"generate_certificates s":>24} {"handshakes/s":>13}')
+    for key_type in args.key_types:
+        keygen = bench_keygen(key_type, args.keys)
+        
+        with tempfile.TemporaryDirectory() as output_dir:
+            started = time.perf_counter()
+            paths = generate_certificates(output_dir, key_type=key_type)
+            generate = time.perf_counter() - started
+            rate = bench_handshakes(paths, args.duration)
+        
+        print(f'{key_type:<12} {keygen * 1000:>10.1f} {generate:>24.2f} {rate:>13.0f}')
+    print('handshakes/s is server CPU only, full handshake with mutual certificate auth')
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+import argparse
+import ipaddress
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from client.vpn_routing import RouteSocket, configure_interface
+from client.vpn_tun import create_tun, close_tun
+
+
+def make_routes(count: int, offset: int = 0) -> list:
+    base = int(ipaddress.IPv4Address('172.16.0.0'))
+    return [str(ipaddress.IPv4Network((base + ((index + offset) << 8), 24))) for index in range(count)]
+
+
+def run_subprocess(args, routes: list) -> float:
+    tun_fd, tun_name = create_tun(args.tun_name)
+    try:
+        started = time.perf_counter()
+        configure_interface(tun_name, args.address, args.vpn_network)
+        for network in routes:
+            subprocess.run(['ip', 'route', 'add', network, 'dev', tun_name], check=True)
+        return time.perf_counter() - started
+    finally:
+        close_tun(tun_fd)
+
+
+def run_netlink(args, routes: list, changed: list) -> tuple:
+    tun_fd, tun_name = create_tun(args.tun_name)
+    netlink = RouteSocket()
+    try:
+        started = time.perf_counter()
+        netlink.configure_interface(tun_name, args.address, args.vpn_network)
+        installed = netlink.sync_routes(tun_name, set(), routes)
+        connect = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        netlink.sync_routes(tun_name, installed, changed)
+        return connect, time.perf_counter() - started
+    finally:
+        netlink.close()
+        close_tun(tun_fd)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Connect-to-ready time for pushed split-tunnel routes: ip subprocesses vs one rtnetlink socket (needs root)')
+    parser.add_argument('--routes', type=int, default=1000, help='Pushed routes')
+    parser.add_argument('--changed', type=float, default=0.01, help='Fraction of routes replaced on reconnect')
+    parser.add_argument('--tun-name', default='bench0', help='Scratch TUN interface')
+    parser.add_argument('--address', default='10.0.0.10', help='Tunnel address')
+    parser.add_argument('--vpn-network', default='10.0.0.0/24', help='Tunnel network')
+    args = parser.parse_args()
+    
+    routes = make_routes(args.routes)
+    shift = int(args.routes * args.changed)
+    changed = make_routes(args.routes, shift)
+    
+    netlink_connect, netlink_sync = run_netlink(args, routes, changed)
+    subprocess_connect = run_subprocess(args, routes)
+    
+    print(f'{"method":<28} {"routes":>7} {"seconds":>9}')
+    print(f'{"ip subprocesses":<28} {args.routes:>7} {subprocess_connect:>9.3f}')
+    print(f'{"rtnetlink batch":<28} {args.routes:>7} {netlink_connect:>9.3f}')
+    print(f'{"rtnetlink reconnect diff":<28} {2 * shift:>7} {netlink_sync:>9.3f}')
+    print(f'Speedup: {subprocess_connect / netlink_connect:.0f}x')
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common.crypto import CryptoHandler
+
+
+def measure(func, packets: list, duration: float) -> float:
+    count = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        func(packets)
+        count += len(packets)
+    return count / duration
+
+
+def legacy_encrypt(handler: CryptoHandler):
+    def run(packets):
+        for packet in packets:
+            handler.encrypt(packet)
+    return run
+
+
+def seal(handler: CryptoHandler):
+    def run(packets):
+        for packet in packets:
+            handler.seal(packet)
+    return run
+
+
+def seal_into(handler: CryptoHandler, size: int):
+    out = bytearray(size + CryptoHandler.OVERHEAD)
+    def run(packets):
+        for packet in packets:
+            handler.seal_into(packet, out)
+    return run
+
+
+def seal_batch(handler: CryptoHandler):
+    return handler.seal_batch
+
+
+def open_batch(handler: CryptoHandler, sealed: list):
+    def run(packets):
+        handler.open_batch(sealed)
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-packet encryption throughput: legacy CryptoHandler.encrypt vs the AEAD fast path')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[64, 512, 1400], help='Payload sizes in bytes')
+    parser.add_argument('--batch', type=int, default=64, help='Packets per call')
+    parser.add_argument('--duration', type=float, default=1.0, help='Seconds per measurement')
+    args = parser.parse_args()
+    
+    key = os.urandom(32)
+    print(f'{"mode":<32} {"size":>6} {"packets/s":>12} {"MB/s":>9}')
+    for size in args.sizes:
+        packets = [os.urandom(size) for _ in range(args.batch)]
+        
+        cases = [('legacy encrypt (aes-gcm)', legacy_encrypt(CryptoHandler(key)))]
+        for aead in CryptoHandler.AEADS:
+            cases.append((f'{aead} seal', seal(CryptoHandler(key, aead))))
+            cases.append((f'{aead} seal_into', seal_into(CryptoHandler(key, aead), size)))
+            cases.append((f'{aead} seal_batch', seal_batch(CryptoHandler(key, aead))))
+            sealed = CryptoHandler(key, aead).seal_batch(packets)
+            cases.append((f'{aead} open_batch', open_batch(CryptoHandler(key, aead), sealed)))
+        
+        for name, func in cases:
+            rate = measure(func, packets, args.duration)
+            print(f'{name:<32} {size:>6} {rate:>12.0f} {rate * size / 1e6:>9.1f}')
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
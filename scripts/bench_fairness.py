@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+import argparse
+import random
+import select
+import sys
+from collections import deque
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common.protocol import MessageType, Protocol
+from server.vpn_connection import ClientConnection
+from server.vpn_server_core import VPNServerCore
+
+
+class Uplink:
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.budget = capacity
+
+
+class FakeSocket:
+    def __init__(self, uplink: Uplink, fd: int):
+        self.uplink = uplink
+        self.fd = fd
+        self.sent = 0
+    
+    def fileno(self) -> int:
+        return self.fd
+    
+    def send(self, data) -> int:
+        size = min(len(data), self.uplink.budget)
+        if not size:
+            raise BlockingIOError
+        self.uplink.budget -= size
+        self.sent += size
+        return size
+    
+    def close(self):
+        pass
+
+
+class FakeEpoll:
+    def modify(self, fd: int, events: int):
+        pass
+
+
+def simulate(args, quantum: int) -> tuple:
+    rng = random.Random(args.seed)
+    uplink = Uplink(int(args.capacity * 1e6 / 8 * args.tick))
+    server = VPNServerCore(drr_quantum=quantum, send_queue_limit=args.queue_limit)
+    server.epoll = FakeEpoll()
+    
+    clients = []
+    for index in range(args.bulk + args.interactive):
+        sock = FakeSocket(uplink, 1000 + index)
+        client = ClientConnection(sock, ('127.0.0.1', 0), f'10.0.0.{10 + index}', args.queue_limit)
+        server.clients[sock] = client
+        clients.append(client)
+    bulk, interactive = clients[:args.bulk], clients[args.bulk:]
+    
+    bulk_packet = bytes(args.bulk_size)
+    small_packet = bytes(args.interactive_size)
+    frame_size = Protocol.HEADER_SIZE + args.interactive_size
+    waiting = {client: deque() for client in interactive}
+    queued = {client: 0 for client in interactive}
+    latencies = []
+    
+    for tick in range(int(args.duration / args.tick)):
+        uplink.budget = uplink.capacity
+        writable = [client for client in clients if client.want_write]
+        rng.shuffle(writable)
+        for client in writable:
+            server._handle_client_events(client.sock, select.EPOLLOUT)
+        
+        for client in bulk:
+            for _ in range(args.bulk_burst):
+                server._send_to_client(client, MessageType.DATA, bulk_packet)
+        if tick % int(args.interval / args.tick) == 0:
+            for client in interactive:
+                server._send_to_client(client, MessageType.DATA, small_packet)
+                queued[client] += frame_size
+                waiting[client].append((tick, queued[client]))
+        
+        while server.active_clients and uplink.budget:
+            server._flush_active_clients()
+        
+        for client in interactive:
+            pending = waiting[client]
+            while pending and client.sock.sent >= pending[0][1]:
+                latencies.append((tick - pending.popleft()[0]) * args.tick)
+    
+    bulk_bytes = sum(client.sock.sent for client in bulk)
+    interactive_bytes = sum(client.sock.sent for client in interactive)
+    return sorted(latencies), bulk_bytes, interactive_bytes, sum(len(waiting[client]) for client in interactive)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Egress fairness between bulk and interactive clients: flush-until-blocked vs deficit round-robin')
+    parser.add_argument('--bulk', type=int, default=4, help='Clients with a saturating download')
+    parser.add_argument('--interactive', type=int, default=16, help='Clients sending one small packet per interval')
+    parser.add_argument('--capacity', type=float, default=1000.0, help='Uplink capacity in Mbit/s')
+    parser.add_argument('--duration', type=float, default=5.0, help='Simulated seconds')
+    parser.add_argument('--tick', type=float, default=0.001, help='Event loop iteration length in seconds')
+    parser.add_argument('--interval', type=float, default=0.02, help='Seconds between interactive packets')
+    parser.add_argument('--bulk-size', type=int, default=1400, help='Bulk packet size in bytes')
+    parser.add_argument('--bulk-burst', type=int, default=64, help='Bulk packets arriving per client per tick')
+    parser.add_argument('--interactive-size', type=int, default=120, help='Interactive packet size in bytes')
+    parser.add_argument('--queue-limit', type=int, default=1024 * 1024, help='Per-client send queue limit in bytes')
+    parser.add_argument('--quantum', type=int, default=16384, help='DRR quantum in bytes')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    
+    print(f'{"scheduler":<22} {"p50 ms":>8} {"p99 ms":>8} {"max ms":>8} {"stuck":>6} {"bulk Mbit/s":>12} {"interactive Mbit/s":>19}')
+    for name, quantum in (('flush until blocked', 1 << 40), (f'drr ({args.quantum}B)', args.quantum)):
+        latencies, bulk_bytes, interactive_bytes, stuck = simulate(args, quantum)
+        p50 = latencies[len(latencies) // 2] * 1000 if latencies else float('nan')
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else float('nan')
+        worst = latencies[-1] * 1000 if latencies else float('nan')
+        print(
+            f'{name:<22} {p50:>8.1f} {p99:>8.1f} {worst:>8.1f} {stuck:>6} '
+            f'{bulk_bytes * 8 / args.duration / 1e6:>12.1f} {interactive_bytes * 8 / args.duration / 1e6:>19.2f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from client.vpn_encryption import create_ssl_context
+from common.protocol import Protocol, MessageType, FrameReader
+from scripts.bench_server import build_udp_packet, open_tunnel
+
+
+async def receive(reader: asyncio.StreamReader, counters: dict, deadline: float, window: asyncio.Event):
+    frames = FrameReader()
+    while time.perf_counter() < deadline:
+        try:
+            data = await asyncio.wait_for(reader.read(65536), deadline - time.perf_counter())
+        except asyncio.TimeoutError:
+            return
+        if not data:
+            return
+        frames.feed(data)
+        for msg_type, payload in frames.read_frames():
+            if msg_type == MessageType.DATA:
+                counters['packets_received'] += 1
+                counters['inflight'] -= 1
+                counters['bytes_received'] += len(payload)
+        window.set()
+
+
+async def send(writer: asyncio.StreamWriter, frame: bytes, args, deadline: float, counters: dict, window: asyncio.Event):
+    burst = frame * args.batch
+    while time.perf_counter() < deadline:
+        if counters['inflight'] >= args.window:
+            window.clear()
+            try:
+                await asyncio.wait_for(window.wait(), 0.1)
+            except asyncio.TimeoutError:
+                counters['inflight'] = 0
+            continue
+        
+        writer.write(burst)
+        await writer.drain()
+        counters['packets_sent'] += args.batch
+        counters['inflight'] += args.batch
+
+
+async def run(args) -> dict:
+    ssl_context = create_ssl_context()
+    tunnels = [await open_tunnel(args.host, args.port, ssl_context) for _ in range(2 * args.pairs)]
+    counters = {'inflight': 0, 'packets_sent': 0, 'packets_received': 0, 'bytes_received': 0}
+    
+    deadline = time.perf_counter() + args.duration
+    tasks = []
+    window = asyncio.Event()
+    for index in range(args.pairs):
+        _, sender, source_ip, _ = tunnels[2 * index]
+        receiver, _, destination_ip, _ = tunnels[2 * index + 1]
+        frame = Protocol.pack_message(MessageType.DATA, build_udp_packet(source_ip, destination_ip, args.packet_size))
+        tasks.append(send(sender, frame, args, deadline, counters, window))
+        tasks.append(receive(receiver, counters, deadline + 0.5, window))
+    
+    await asyncio.gather(*tasks, return_exceptions=True)
+    for _, writer, _, _ in tunnels:
+        writer.close()
+    return counters
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Client-to-client throughput through a running server (compare with "hairpin" on and off)')
+    parser.add_argument('--host', default='127.0.0.1', help='Server host')
+    parser.add_argument('--port', type=int, default=8443, help='Server port')
+    parser.add_argument('--pairs', type=int, default=1, help='Sender/receiver tunnel pairs')
+    parser.add_argument('--duration', type=float, default=5.0, help='Traffic phase length in seconds')
+    parser.add_argument('--packet-size', type=int, default=1400, help='IP packet size in bytes')
+    parser.add_argument('--batch', type=int, default=16, help='Frames per write')
+    parser.add_argument('--window', type=int, default=256, help='Packets in flight before a sender waits for delivery')
+    args = parser.parse_args()
+    
+    counters = asyncio.run(run(args))
+    sent = counters['packets_sent']
+    received = counters['packets_received']
+    print(f'Sent {sent / args.duration:.0f} packets/s, delivered {received / args.duration:.0f} packets/s '
+          f'({counters["bytes_received"] * 8 / args.duration / 1e6:.1f} Mbit/s, '
+          f'{received / sent if sent else 0:.1%} of sent) across {args.pairs} client pairs')
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+import argparse
+import ssl
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from client.vpn_encryption import create_ssl_context as create_client_context
+from server.vpn_encryption import create_ssl_context as create_server_context
+
+
+class Timer:
+    def __init__(self):
+        self.elapsed = 0.0
+    
+    def call(self, func, *args):
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.elapsed += time.perf_counter() - started
+
+
+def step(obj: ssl.SSLObject, timer: Timer) -> bool:
+    try:
+        timer.call(obj.do_handshake)
+        return True
+    except (ssl.SSLWantReadError, ssl.SSLWantWriteError):
+        return False
+
+
+def handshake(server_context, client_context, session, server_timer: Timer, client_timer: Timer) -> ssl.SSLObject:
+    server_in, server_out = ssl.MemoryBIO(), ssl.MemoryBIO()
+    client_in, client_out = ssl.MemoryBIO(), ssl.MemoryBIO()
+    server = server_context.wrap_bio(server_in, server_out, server_side=True)
+    client = client_context.wrap_bio(client_in, client_out, server_side=False, server_hostname='localhost', session=session)
+    
+    client_done = server_done = False
+    while not (client_done and server_done):
+        if not client_done:
+            client_done = step(client, client_timer)
+        server_in.write(client_out.read())
+        if not server_done:
+            server_done = step(server, server_timer)
+        client_in.write(server_out.read())
+    
+    server_timer.call(server.write, b'\x00')
+    client_in.write(server_out.read())
+    client_timer.call(client.read, 1)
+    
+    if session is not None and not client.session_reused:
+        raise RuntimeError('Session was not resumed')
+    return client
+
+
+def run(args, resume: bool) -> tuple:
+    server_context = create_server_context()
+    client_context = create_client_context()
+    server_timer, client_timer = Timer(), Timer()
+    
+    session = None
+    if resume:
+        session = handshake(server_context, client_context, None, Timer(), Timer()).session
+    
+    count = 0
+    deadline = time.perf_counter() + args.duration
+    while time.perf_counter() < deadline:
+        client = handshake(server_context, client_context, session, server_timer, client_timer)
+        if resume:
+            session = client.session
+        count += 1
+    
+    return count / server_timer.elapsed, count / client_timer.elapsed, server_timer.elapsed / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Full vs resumed TLS 1.3 handshake cost per core, in memory')
+    parser.add_argument('--duration', type=float, default=3.0, help='Seconds per measurement')
+    args = parser.parse_args()
+    
+    full_server, full_client, full_cost = run(args, resume=False)
+    resumed_server, resumed_client, resumed_cost = run(args, resume=True)
+    
+    print(f'full:    {full_server:>8.0f} handshakes/s server CPU, {full_client:>8.0f} client CPU, {full_cost * 1000:.2f} ms/handshake server')
+    print(f'resumed: {resumed_server:>8.0f} handshakes/s server CPU, {resumed_client:>8.0f} client CPU, {resumed_cost * 1000:.2f} ms/handshake server')
+    print(f'server speedup: {resumed_server / full_server:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+import argparse
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common.protocol import FrameReader, MessageType
+from server.vpn_connection import ClientConnection
+from server.vpn_server_core import VPNServerCore
+from scripts.bench_fairness import FakeEpoll, FakeSocket, Uplink
+
+
+def build_packet(protocol: int, size: int, source_port: int = 0, destination_port: int = 0, sequence: int = 0) -> bytes:
+    header = struct.pack('!BBHHHBBH4s4s', 0x45, 0, size, 0, 0, 64, protocol, 0, bytes([10, 0, 0, 1]), bytes([10, 0, 0, 10]))
+    if protocol == 1:
+        body = struct.pack('!BBHHH', 8, 0, 0, 1, sequence)
+    else:
+        body = struct.pack('!HH', source_port, destination_port)
+    return header + body + bytes(size - len(header) - len(body))
+
+
+class Receiver(FakeSocket):
+    def __init__(self, uplink: Uplink, fd: int):
+        super().__init__(uplink, fd)
+        self.frames = FrameReader()
+        self.tick = 0
+        self.arrivals = {}
+        self.bulk_bytes = 0
+    
+    def send(self, data) -> int:
+        size = super().send(data)
+        self.frames.feed(data[:size])
+        for msg_type, payload in self.frames.read_frames():
+            if msg_type != MessageType.DATA:
+                continue
+            if payload[9] == 1:
+                self.arrivals[int.from_bytes(payload[26:28], 'big')] = self.tick
+            else:
+                self.bulk_bytes += len(payload)
+        return size
+
+
+def simulate(args, scheduler: str) -> tuple:
+    uplink = Uplink(int(args.capacity * 1e6 / 8 * args.tick))
+    server = VPNServerCore(send_queue_limit=args.queue_limit, qos={'scheduler': scheduler})
+    server.epoll = FakeEpoll()
+    sock = Receiver(uplink, 1000)
+    client = ClientConnection(sock, ('127.0.0.1', 0), '10.0.0.10', args.queue_limit, server.qos)
+    server.clients[sock] = client
+    
+    bulk_packet = build_packet(6, args.bulk_size, 443, 40000)
+    bulk_per_tick = args.overload * uplink.capacity / args.bulk_size
+    ping_every = int(args.interval / args.tick)
+    sent = {}
+    backlog = 0.0
+    
+    for tick in range(int(args.duration / args.tick)):
+        sock.tick = tick
+        uplink.budget = uplink.capacity
+        now = time.monotonic()
+        if client.want_write:
+            server._handle_client_events(sock, select.EPOLLOUT)
+        
+        backlog += bulk_per_tick
+        while backlog >= 1:
+            server._forward_to_client(client, bulk_packet, now)
+            backlog -= 1
+        if tick % ping_every == 0:
+            sequence = len(sent)
+            sent[sequence] = tick
+            server._forward_to_client(client, build_packet(1, args.ping_size, sequence=sequence), now)
+        
+        while server.active_clients and uplink.budget:
+            server._flush_active_clients()
+    
+    latencies = sorted((sock.arrivals[sequence] - tick) * args.tick for sequence, tick in sent.items() if sequence in sock.arrivals)
+    return latencies, len(sent) - len(latencies), sock.bulk_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Latency of small pings behind a bulk transfer on one congested tunnel, per send queue scheduler')
+    parser.add_argument('--capacity', type=float, default=50.0, help='Tunnel capacity in Mbit/s')
+    parser.add_argument('--overload', type=float, default=1.5, help='Bulk offered load as a multiple of capacity')
+    parser.add_argument('--duration', type=float, default=10.0, help='Simulated seconds')
+    parser.add_argument('--tick', type=float, default=0.001, help='Event loop iteration length in seconds')
+    parser.add_argument('--interval', type=float, default=0.01, help='Seconds between pings')
+    parser.add_argument('--bulk-size', type=int, default=1400, help='Bulk packet size in bytes')
+    parser.add_argument('--ping-size', type=int, default=84, help='Ping packet size in bytes')
+    parser.add_argument('--queue-limit', type=int, default=1024 * 1024, help='Send queue limit in bytes')
+    args = parser.parse_args()
+    
+    print(f'{"scheduler":<10} {"p50 ms":>8} {"p99 ms":>8} {"max ms":>8} {"lost":>6} {"bulk Mbit/s":>12}')
+    for scheduler in ('fifo', 'weighted', 'strict'):
+        latencies, lost, bulk_bytes = simulate(args, scheduler)
+        p50 = latencies[len(latencies) // 2] * 1000 if latencies else float('nan')
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else float('nan')
+        worst = latencies[-1] * 1000 if latencies else float('nan')
+        print(f'{scheduler:<10} {p50:>8.1f} {p99:>8.1f} {worst:>8.1f} {lost:>6} {bulk_bytes * 8 / args.duration / 1e6:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+import argparse
+import datetime
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.x509.oid import NameOID
+from common.cert_generation import generate_private_key
+from server.auth import AuthManager
+
+
+def write_crl(path: Path, serials: list):
+    key = generate_private_key('ecdsa-p256')
+    now = datetime.datetime.utcnow()
+    builder = x509.CertificateRevocationListBuilder().issuer_name(
+        x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'VPN CA')])
+    ).last_update(now).next_update(now + datetime.timedelta(days=7))
+    
+    for serial in serials:
+        builder = builder.add_revoked_certificate(
+            x509.RevokedCertificateBuilder().serial_number(serial).revocation_date(now).build()
+        )
+    
+    crl = builder.sign(key, hashes.SHA256())
+    path.write_bytes(crl.public_bytes(serialization.Encoding.PEM))
+
+
+def time_lookups(auth: AuthManager, peercerts: list, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for peercert in peercerts:
+            auth.is_revoked(auth.get_serial(peercert))
+    return (time.perf_counter() - started) / (rounds * len(peercerts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Revocation list load time and per-connect lookup cost')
+    parser.add_argument('--revoked', type=int, default=50000, help='Revoked serials in the list')
+    parser.add_argument('--rounds', type=int, default=100, help='Lookup rounds over 1000 serials')
+    args = parser.parse_args()
+    
+    serials = [x509.random_serial_number() for _ in range(args.revoked)]
+    hits = [{'serialNumber': format(serial, 'X')} for serial in serials[:1000]]
+    misses = [{'serialNumber': format(x509.random_serial_number(), 'X')} for _ in range(1000)]
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ('revoked.txt', 'revoked.crl'):
+            path = Path(tmp) / name
+            if name.endswith('.txt'):
+                path.write_text(''.join(f'{serial:x}\n' for serial in serials))
+            else:
+                write_crl(path, serials)
+            
+            started = time.perf_counter()
+            auth = AuthManager(str(path))
+            load = time.perf_counter() - started
+            
+            hit = time_lookups(auth, hits, args.rounds)
+            miss = time_lookups(auth, misses, args.rounds)
+            print(f'{name:<12} {len(auth.revoked_serials)} serials, load {load * 1000:.0f} ms, check {hit * 1e9:.0f} ns (revoked) / {miss * 1e9:.0f} ns (valid)')
+            
+            started = time.perf_counter()
+            changed = auth.check_revocations()
+            print(f'{"":<12} unchanged-file mtime check {(time.perf_counter() - started) * 1e6:.1f} us, reloaded={changed}')
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+import argparse
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from server.vpn_route_table import RouteTable
+
+
+def build_table(args, rng: random.Random) -> tuple:
+    table = RouteTable()
+    hosts = []
+    subnets = []
+    
+    for i in range(args.routes - args.subnets):
+        address = (10 << 24) | (i + 2)
+        table.add(address, 32, f'client-{i}')
+        hosts.append(address)
+    
+    for i in range(args.subnets):
+        length = rng.choice((16, 20, 24, 28))
+        address = ((172 << 24) | (rng.getrandbits(20) << 8)) & ~((1 << (32 - length)) - 1)
+        table.add(address, length, f'site-{i}')
+        subnets.append(address | rng.getrandbits(32 - length))
+    
+    return table, hosts, subnets
+
+
+def build_dict(args) -> dict:
+    return {f'10.{(i + 2) >> 16 & 255}.{(i + 2) >> 8 & 255}.{(i + 2) & 255}': f'client-{i}' for i in range(args.routes - args.subnets)}
+
+
+def run_lookups(lookup, addresses: list, duration: float) -> float:
+    count = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        for address in addresses:
+            lookup(address)
+        count += len(addresses)
+    return count / duration
+
+
+def churn(table: RouteTable, stop: threading.Event):
+    address = (192 << 24) | (168 << 16)
+    while not stop.is_set():
+        table.add(address, 24, 'churn')
+        table.remove(address, 24)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Longest-prefix-match routing table lookup benchmark')
+    parser.add_argument('--routes', type=int, default=10000, help='Total routes in the table')
+    parser.add_argument('--subnets', type=int, default=1000, help='Routes that are subnets rather than /32 hosts')
+    parser.add_argument('--duration', type=float, default=2.0, help='Seconds per measurement')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed')
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    table, hosts, subnets = build_table(args, rng)
+    misses = [(203 << 24) | rng.getrandbits(24) for _ in range(1000)]
+    hosts = rng.sample(hosts, min(len(hosts), 1000))
+    print(f'{len(table)} routes, {len(table.levels)} prefix lengths')
+    
+    legacy = build_dict(args)
+    legacy_keys = [f'10.{a >> 16 & 255}.{a >> 8 & 255}.{a & 255}' for a in hosts]
+    legacy_lock = threading.Lock()
+    
+    def legacy_lookup(key):
+        with legacy_lock:
+            return legacy.get(key)
+    
+    print(f'str dict + lock, host hit: {run_lookups(legacy_lookup, legacy_keys, args.duration):>12.0f} lookups/s')
+    print(f'route table, host hit:     {run_lookups(table.lookup, hosts, args.duration):>12.0f} lookups/s')
+    print(f'route table, subnet hit:   {run_lookups(table.lookup, subnets, args.duration):>12.0f} lookups/s')
+    print(f'route table, miss:         {run_lookups(table.lookup, misses, args.duration):>12.0f} lookups/s')
+    
+    stop = threading.Event()
+    writer = threading.Thread(target=churn, args=(table, stop), daemon=True)
+    writer.start()
+    try:
+        rate = run_lookups(table.lookup, subnets, args.duration)
+    finally:
+        stop.set()
+        writer.join()
+    print(f'route table, subnet hit under route churn: {rate:>12.0f} lookups/s')
+    
+    wrong = sum(1 for address in hosts if table.lookup(address) is None)
+    wrong += sum(1 for address in subnets if table.lookup(address) is None)
+    wrong += sum(1 for address in misses if table.lookup(address) is not None)
+    if wrong:
+        print(f'FAIL: {wrong} incorrect lookups')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
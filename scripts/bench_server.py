@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import socket
+import struct
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from client.vpn_encryption import create_ssl_context
+from common.protocol import Protocol, MessageType, FrameReader
+
+
+def ip_checksum(header: bytes) -> int:
+    total = sum(struct.unpack(f'!{len(header) // 2}H', header))
+    while total >> 16:
+        total = (total & 0xFFFF) + (total >> 16)
+    return ~total & 0xFFFF
+
+
+def build_udp_packet(src_ip: str, dst_ip: str, size: int) -> bytes:
+    size = max(size, 28)
+    header = struct.pack(
+        '!BBHHHBBH4s4s', 0x45, 0, size, 0, 0, 64, socket.IPPROTO_UDP, 0,
+        socket.inet_aton(src_ip), socket.inet_aton(dst_ip)
+    )
+    header = header[:10] + struct.pack('!H', ip_checksum(header)) + header[12:]
+    udp = struct.pack('!HHHH', 40000, 9, size - 20, 0)
+    return header + udp + bytes(size - 28)
+
+
+async def open_tunnel(host: str, port: int, ssl_context):
+    started = time.perf_counter()
+    reader, writer = await asyncio.open_connection(host, port, ssl=ssl_context, server_hostname=host)
+    
+    frames = FrameReader()
+    while True:
+        data = await reader.read(65536)
+        if not data:
+            raise ConnectionError('Server closed connection during assignment')
+        frames.feed(data)
+        for msg_type, payload in frames.read_frames():
+            if msg_type == MessageType.HANDSHAKE:
+                assignment = json.loads(bytes(payload))
+                return reader, writer, assignment['ip'], time.perf_counter() - started
+
+
+async def drain_reader(reader: asyncio.StreamReader, counters: dict):
+    while True:
+        data = await reader.read(65536)
+        if not data:
+            return
+        counters['bytes_received'] += len(data)
+
+
+async def blast(writer: asyncio.StreamWriter, frame: bytes, batch: int, deadline: float, counters: dict):
+    burst = frame * batch
+    while time.perf_counter() < deadline:
+        writer.write(burst)
+        await writer.drain()
+        counters['frames_sent'] += batch
+        counters['bytes_sent'] += len(burst)
+
+
+async def run(args) -> dict:
+    ssl_context = create_ssl_context()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    
+    async def connect_one():
+        async with semaphore:
+            return await open_tunnel(args.host, args.port, ssl_context)
+    
+    started = time.perf_counter()
+    results = await asyncio.gather(*(connect_one() for _ in range(args.clients)), return_exceptions=True)
+    connect_time = time.perf_counter() - started
+    
+    tunnels = [r for r in results if not isinstance(r, BaseException)]
+    result = {
+        'clients': len(tunnels),
+        'failures': len(results) - len(tunnels),
+        'connect_time': connect_time,
+        'latencies': [r[3] for r in tunnels],
+        'frames_sent': 0,
+        'bytes_sent': 0,
+        'bytes_received': 0,
+        'senders': 0,
+        'elapsed': 0.0,
+    }
+    
+    if not tunnels or args.duration <= 0:
+        return result
+    
+    deadline = time.perf_counter() + args.duration
+    active = tunnels[:args.senders] if args.senders else tunnels
+    
+    readers = [asyncio.ensure_future(drain_reader(reader, result)) for reader, _, _, _ in tunnels]
+    senders = []
+    for _, writer, ip, _ in active:
+        frame = Protocol.pack_message(MessageType.DATA, build_udp_packet(ip, args.target, args.packet_size))
+        senders.append(blast(writer, frame, args.batch, deadline, result))
+    
+    started = time.perf_counter()
+    await asyncio.gather(*senders, return_exceptions=True)
+    result['elapsed'] = time.perf_counter() - started
+    result['senders'] = len(active)
+    
+    for task in readers:
+        task.cancel()
+    for _, writer, _, _ in tunnels:
+        writer.close()
+    
+    return result
+
+
+def run_process(args) -> dict:
+    return asyncio.run(run(args))
+
+
+def report(args, results: list):
+    clients = sum(r['clients'] for r in results)
+    failures = sum(r['failures'] for r in results)
+    connect_time = max(r['connect_time'] for r in results)
+    latencies = sorted(l for r in results for l in r['latencies'])
+    
+    print(f'Connected {clients}/{args.clients * args.processes} clients in {connect_time:.2f}s '
+          f'({clients / connect_time:.1f} conn/s, {failures} failed, {args.processes} load processes)')
+    if latencies:
+        print(f'Connect latency p50={latencies[len(latencies) // 2] * 1000:.1f}ms '
+              f'p99={latencies[int(len(latencies) * 0.99)] * 1000:.1f}ms')
+    
+    measured = [r for r in results if r['elapsed'] > 0]
+    if not measured:
+        return
+    
+    packets_per_sec = sum(r['frames_sent'] / r['elapsed'] for r in measured)
+    upstream = sum(r['bytes_sent'] * 8 / r['elapsed'] for r in measured) / 1e6
+    downstream = sum(r['bytes_received'] * 8 / r['elapsed'] for r in measured) / 1e6
+    senders = sum(r['senders'] for r in measured)
+    
+    print(f'Upstream: {packets_per_sec:.0f} packets/s, {upstream:.1f} Mbit/s '
+          f'from {senders} senders ({args.packet_size}B packets)')
+    print(f'Downstream: {downstream:.1f} Mbit/s received')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load generator for VPNServerCore and VPNServer')
+    parser.add_argument('--host', default='127.0.0.1', help='Server host')
+    parser.add_argument('--port', type=int, default=8443, help='Server port')
+    parser.add_argument('--clients', type=int, default=100, help='Number of tunnels to open per process')
+    parser.add_argument('--processes', type=int, default=1, help='Load generator processes (use >= server workers)')
+    parser.add_argument('--concurrency', type=int, default=64, help='Concurrent handshakes per process')
+    parser.add_argument('--senders', type=int, default=0, help='Tunnels sending traffic per process (0 = all)')
+    parser.add_argument('--duration', type=float, default=10.0, help='Traffic phase length in seconds')
+    parser.add_argument('--packet-size', type=int, default=1400, help='IP packet size in bytes')
+    parser.add_argument('--batch', type=int, default=16, help='Frames per write')
+    parser.add_argument('--target', default='10.0.0.1', help='Destination address of generated packets')
+    args = parser.parse_args()
+    
+    if args.processes > 1:
+        with multiprocessing.Pool(args.processes) as pool:
+            results = pool.map(run_process, [args] * args.processes)
+    else:
+        results = [run_process(args)]
+    
+    report(args, results)
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
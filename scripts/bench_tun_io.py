@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+
+import argparse
+import multiprocessing
+import select
+import socket
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from server.vpn_tun import PacketBatch, read_packet, read_packets, write_packet, write_packets
+
+
+def produce(sock: socket.socket, packet_size: int, duration: float):
+    packet = bytes(packet_size)
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        for _ in range(256):
+            try:
+                sock.send(packet)
+            except (BlockingIOError, socket.timeout):
+                break
+
+
+def consume_single(fd: int, duration: float) -> int:
+    count = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        readable, _, _ = select.select([fd], [], [], 0.1)
+        if readable:
+            try:
+                read_packet(fd)
+                count += 1
+            except BlockingIOError:
+                pass
+    return count
+
+
+def consume_batched(fd: int, duration: float, max_batch: int) -> int:
+    batch = PacketBatch(max_batch)
+    count = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        readable, _, _ = select.select([fd], [], [], 0.1)
+        if readable:
+            count += len(read_packets(fd, batch))
+    return count
+
+
+def bench_read(mode: str, args) -> float:
+    tun_side, kernel_side = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+    tun_side.setblocking(False)
+    kernel_side.settimeout(0.05)
+    
+    producer = multiprocessing.Process(target=produce, args=(kernel_side, args.packet_size, args.duration + 1))
+    producer.start()
+    try:
+        if mode == 'single':
+            count = consume_single(tun_side.fileno(), args.duration)
+        else:
+            count = consume_batched(tun_side.fileno(), args.duration, args.batch)
+    finally:
+        producer.join()
+        tun_side.close()
+        kernel_side.close()
+    
+    return count / args.duration
+
+
+def bench_write(mode: str, args) -> float:
+    tun_side, kernel_side = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+    tun_side.setblocking(False)
+    kernel_side.setblocking(False)
+    
+    packets = [bytes(args.packet_size)] * args.batch
+    fd = tun_side.fileno()
+    count = 0
+    deadline = time.perf_counter() + args.duration
+    while time.perf_counter() < deadline:
+        select.select([], [fd], [], 0.1)
+        if mode == 'single':
+            try:
+                write_packet(fd, packets[0])
+                count += 1
+            except BlockingIOError:
+                pass
+        else:
+            count += write_packets(fd, packets)
+        
+        while True:
+            try:
+                kernel_side.recv(65536)
+            except BlockingIOError:
+                break
+    
+    tun_side.close()
+    kernel_side.close()
+    return count / args.duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description='TUN I/O batching benchmark over an AF_UNIX SOCK_SEQPACKET pair')
+    parser.add_argument('--duration', type=float, default=3.0, help='Seconds per measurement')
+    parser.add_argument('--packet-size', type=int, default=1400, help='Packet size in bytes')
+    parser.add_argument('--batch', type=int, default=64, help='Packets per readiness event')
+    args = parser.parse_args()
+    
+    single = bench_read('single', args)
+    batched = bench_read('batched', args)
+    print(f'read:  one packet per wakeup {single:>10.0f} packets/s')
+    print(f'read:  batch of {args.batch:<3d} per wakeup {batched:>10.0f} packets/s ({batched / single:.1f}x)')
+    
+    single = bench_write('single', args)
+    batched = bench_write('batched', args)
+    print(f'write: one packet per wakeup {single:>10.0f} packets/s')
+    print(f'write: batch of {args.batch:<3d} per wakeup {batched:>10.0f} packets/s ({batched / single:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
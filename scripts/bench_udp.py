@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+import argparse
+import random
+import ssl
+import struct
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from client.vpn_encryption import create_ssl_context as create_client_context
+from common.crypto import DatagramChannel
+from common.protocol import FrameReader, MessageType, Protocol
+from server.vpn_encryption import create_ssl_context as create_server_context
+from scripts.bench_handshake import Timer, step
+
+STAMP = struct.Struct('!Id')
+
+
+class Link:
+    def __init__(self, loss: float, delay: float, rto: float, ordered: bool, rng: random.Random):
+        self.loss = loss
+        self.delay = delay
+        self.rto = rto
+        self.ordered = ordered
+        self.rng = rng
+        self.last_delivery = 0.0
+        self.lost = 0
+    
+    def send(self, now: float):
+        arrival = now + self.delay
+        if self.rng.random() < self.loss:
+            self.lost += 1
+            if not self.ordered:
+                return None
+            arrival += self.rto
+        
+        if self.ordered:
+            arrival = max(arrival, self.last_delivery)
+            self.last_delivery = arrival
+        return arrival
+
+
+def run_udp(args, link: Link) -> list:
+    server, offer = DatagramChannel.create()
+    client = DatagramChannel.from_offer(offer)
+    payload = bytes(args.size - STAMP.size)
+    latencies = []
+    
+    for seq in range(args.packets):
+        now = seq * args.interval
+        datagram = client.seal(STAMP.pack(seq, now) + payload)
+        arrival = link.send(now)
+        if arrival is None:
+            continue
+        
+        packet = server.open(datagram)
+        _, sent = STAMP.unpack_from(packet)
+        latencies.append(arrival - sent)
+    return latencies
+
+
+def tls_pair() -> tuple:
+    server_in, server_out = ssl.MemoryBIO(), ssl.MemoryBIO()
+    client_in, client_out = ssl.MemoryBIO(), ssl.MemoryBIO()
+    server = create_server_context().wrap_bio(server_in, server_out, server_side=True)
+    client = create_client_context().wrap_bio(client_in, client_out, server_side=False, server_hostname='localhost')
+    
+    client_done = server_done = False
+    while not (client_done and server_done):
+        if not client_done:
+            client_done = step(client, Timer())
+        server_in.write(client_out.read())
+        if not server_done:
+            server_done = step(server, Timer())
+        client_in.write(server_out.read())
+    return client, client_out, server, server_in
+
+
+def run_tls(args, link: Link) -> list:
+    client, client_out, server, server_in = tls_pair()
+    payload = bytes(args.size - STAMP.size)
+    reader = FrameReader()
+    latencies = []
+    
+    for seq in range(args.packets):
+        now = seq * args.interval
+        client.write(Protocol.pack_message(MessageType.DATA, STAMP.pack(seq, now) + payload))
+        arrival = link.send(now)
+        
+        server_in.write(client_out.read())
+        try:
+            reader.feed(server.read(65536))
+        except ssl.SSLWantReadError:
+            continue
+        for _, packet in reader.read_frames():
+            _, sent = STAMP.unpack_from(packet)
+            latencies.append(arrival - sent)
+    return latencies
+
+
+def percentile(values: list, fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tunnel latency under packet loss: UDP data channel vs TLS over TCP')
+    parser.add_argument('--loss', type=float, nargs='+', default=[0.0, 0.01, 0.05], help='Link loss rates')
+    parser.add_argument('--packets', type=int, default=20000, help='Packets per run')
+    parser.add_argument('--size', type=int, default=1200, help='Packet size in bytes')
+    parser.add_argument('--interval', type=float, default=0.001, help='Seconds between packets')
+    parser.add_argument('--delay', type=float, default=0.02, help='One-way link delay in seconds')
+    parser.add_argument('--rto', type=float, default=0.2, help='TCP retransmission timeout in seconds')
+    parser.add_argument('--deadline', type=float, default=0.1, help='Latency budget for real-time traffic in seconds')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    
+    print(f'{"transport":<10} {"loss":>6} {"delivered":>10} {"on time":>8} {"p50 ms":>8} {"p99 ms":>8} {"max ms":>8}')
+    for loss in args.loss:
+        for name, run, ordered in (('udp', run_udp, False), ('tls/tcp', run_tls, True)):
+            link = Link(loss, args.delay, args.rto, ordered, random.Random(args.seed))
+            latencies = sorted(run(args, link))
+            on_time = sum(1 for latency in latencies if latency <= args.deadline)
+            print(
+                f'{name:<10} {loss:>6.1%} {len(latencies) / args.packets:>10.1%} {on_time / args.packets:>8.1%} '
+                f'{percentile(latencies, 0.5) * 1000:>8.1f} {percentile(latencies, 0.99) * 1000:>8.1f} {latencies[-1] * 1000:>8.1f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
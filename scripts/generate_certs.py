@@ -1,15 +1,22 @@
 #!/usr/bin/env python3
 
+import argparse
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from common.cert_generation import generate_certificates
+from common.cert_generation import generate_certificates, KEY_TYPES
 
 
 def main():
-    paths = generate_certificates()
+    parser = argparse.ArgumentParser(description='Generate CA, server and client certificates')
+    parser.add_argument('--key-type', choices=KEY_TYPES, default='rsa4096', help='Key algorithm for all three certificates')
+    parser.add_argument('--output-dir', default=None, help='Output directory (default: certificates/)')
+    parser.add_argument('--reuse-ca', action='store_true', help='Keep an existing ca.crt/ca.key instead of creating a new CA')
+    args = parser.parse_args()
+    
+    paths = generate_certificates(args.output_dir, key_type=args.key_type, reuse_ca=args.reuse_ca)
     print('Generated certificates:')
     for name, path in paths.items():
         print(f'  {name}: {path}')
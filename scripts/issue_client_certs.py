@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common.cert_generation import issue_client_certificates, KEY_TYPES
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Issue client certificates in bulk from an existing CA')
+    parser.add_argument('--count', type=int, default=0, help='Number of certificates named PREFIX0001, PREFIX0002, ...')
+    parser.add_argument('--prefix', default='device-', help='Common name prefix used with --count')
+    parser.add_argument('--names-file', default=None, help='File with one common name per line')
+    parser.add_argument('--ca-dir', default=None, help='Directory holding ca.crt and ca.key (default: certificates/)')
+    parser.add_argument('--output-dir', default=None, help='Output directory (default: certificates/clients/)')
+    parser.add_argument('--key-type', choices=KEY_TYPES, default='rsa4096', help='Client key algorithm')
+    parser.add_argument('--validity-days', type=int, default=825, help='Certificate lifetime')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    args = parser.parse_args()
+    
+    common_names = [f'{args.prefix}{i:04d}' for i in range(1, args.count + 1)]
+    if args.names_file:
+        with open(args.names_file, 'r') as f:
+            common_names += [line.strip() for line in f if line.strip()]
+    
+    if not common_names:
+        parser.error('nothing to issue, pass --count or --names-file')
+    
+    started = time.perf_counter()
+    manifest = issue_client_certificates(
+        common_names,
+        output_dir=args.output_dir,
+        ca_dir=args.ca_dir,
+        key_type=args.key_type,
+        validity_days=args.validity_days,
+        workers=args.workers
+    )
+    elapsed = time.perf_counter() - started
+    
+    print(f'Issued {len(manifest)} certificates in {elapsed:.2f}s ({len(manifest) / elapsed:.1f} certs/s)')
+    if manifest:
+        print(f'Manifest: {Path(manifest[0]["cert"]).parent / "manifest.json"}')
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -2,14 +2,17 @@ from .core import VPNServer
 from .auth import AuthManager
 from .tunnel import TunnelManager
 from .vpn_encryption import create_ssl_context, wrap_socket
-from .vpn_tun import create_tun, read_packet, write_packet, close_tun
-from .vpn_routing import enable_nat, disable_nat
+from .vpn_tun import create_tun, read_packet, write_packet, close_tun, PacketBatch, read_packets, write_packets
+from .vpn_routing import NATManager, enable_nat, disable_nat
+from .vpn_route_table import RouteTable
+from .vpn_ip_pool import IPPool
 from .vpn_server_core import VPNServerCore
 
 __all__ = [
     'VPNServer', 'AuthManager', 'TunnelManager', 
     'create_ssl_context', 'wrap_socket',
     'create_tun', 'read_packet', 'write_packet', 'close_tun',
-    'enable_nat', 'disable_nat',
-    'VPNServerCore'
+    'PacketBatch', 'read_packets', 'write_packets',
+    'NATManager', 'enable_nat', 'disable_nat',
+    'RouteTable', 'IPPool', 'VPNServerCore'
 ]
\ No newline at end of file
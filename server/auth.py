@@ -1,15 +1,97 @@
-from typing import Optional
+import os
+from pathlib import Path
+from typing import Optional, Set
+from cryptography import x509
+from cryptography.hazmat.backends import default_backend
 
 
 class AuthManager:
-    def __init__(self):
+    def __init__(self, revocation_file: Optional[str] = None):
         self.authenticated_clients = set()
+        self.revocation_file = Path(revocation_file) if revocation_file else None
+        self.revocation_mtime = None
+        self.revoked_serials: Set[int] = set()
+        self.check_revocations(strict=True)
     
     async def authenticate(self, client_id: str, credentials: dict) -> bool:
-        return False
+        if not client_id or not credentials or not credentials.get('subject'):
+            return False
+        
+        self.check_revocations()
+        if self.is_revoked(self.get_serial(credentials)):
+            return False
+        
+        self.authenticated_clients.add(client_id)
+        return True
     
     async def revoke(self, client_id: str) -> bool:
-        return False
+        if client_id not in self.authenticated_clients:
+            return False
+        
+        self.authenticated_clients.discard(client_id)
+        return True
     
     def is_authenticated(self, client_id: str) -> bool:
-        return client_id in self.authenticated_clients
\ No newline at end of file
+        return client_id in self.authenticated_clients
+    
+    def is_revoked(self, serial: Optional[int]) -> bool:
+        return serial in self.revoked_serials
+    
+    def check_revocations(self, strict: bool = False) -> bool:
+        if self.revocation_file is None:
+            return False
+        
+        try:
+            mtime = os.stat(self.revocation_file).st_mtime_ns
+            if mtime == self.revocation_mtime:
+                return False
+            revoked = self.load_revocations(self.revocation_file)
+        except (OSError, ValueError) as e:
+            print(f'Error loading revocations from {self.revocation_file}: {e}')
+            if strict:
+                raise
+            return False
+        
+        self.revoked_serials = revoked
+        self.revocation_mtime = mtime
+        print(f'Loaded {len(self.revoked_serials)} revoked serials from {self.revocation_file}')
+        return True
+    
+    @staticmethod
+    def load_revocations(path: Path) -> Set[int]:
+        with open(path, 'rb') as f:
+            data = f.read()
+        
+        if b'-----BEGIN X509 CRL-----' in data:
+            crl = x509.load_pem_x509_crl(data, default_backend())
+            return {revoked.serial_number for revoked in crl}
+        if data[:1] == b'\x30':
+            try:
+                crl = x509.load_der_x509_crl(data, default_backend())
+                return {revoked.serial_number for revoked in crl}
+            except ValueError:
+                pass
+        
+        serials = set()
+        for line in data.decode('ascii').splitlines():
+            line = line.split('#', 1)[0].strip().replace(':', '')
+            if line:
+                serials.add(int(line, 16))
+        return serials
+    
+    @staticmethod
+    def get_serial(peercert: Optional[dict]) -> Optional[int]:
+        if not peercert or 'serialNumber' not in peercert:
+            return None
+        return int(peercert['serialNumber'], 16)
+    
+    @staticmethod
+    def get_common_name(peercert: Optional[dict]) -> Optional[str]:
+        if not peercert:
+            return None
+        
+        for rdn in peercert.get('subject', ()):
+            for key, value in rdn:
+                if key == 'commonName':
+                    return value
+        return None
\ No newline at end of file
@@ -1,20 +1,150 @@
 import asyncio
+import json
+import os
+import socket
 import ssl
-from typing import Optional
+import subprocess
+from typing import List, Optional
+from common.protocol import Protocol, MessageType
+from .auth import AuthManager
+from .tunnel import TunnelManager
+from .vpn_encryption import create_ssl_context
+from .vpn_ip_pool import IPPool
+from .vpn_tun import create_tun, close_tun
+from .vpn_routing import NATManager
 
 
 class VPNServer:
-    def __init__(self, host: str = '0.0.0.0', port: int = 8443):
+    def __init__(
+        self,
+        host: str = '0.0.0.0',
+        port: int = 8443,
+        nat_interface: str = 'eth0',
+        handshake_timeout: float = 10.0,
+        queue_size: int = 256,
+        vpn_network: str = '10.0.0.0/24',
+        lease_file: Optional[str] = None,
+        revocation_file: Optional[str] = None,
+        push_routes: Optional[List[str]] = None,
+        nat_backend: str = 'iptables',
+        keepalive_interval: float = 10.0,
+        idle_timeout: float = 60.0
+    ):
         self.host = host
         self.port = port
+        self.nat_interface = nat_interface
+        self.handshake_timeout = handshake_timeout
         self.server: Optional[asyncio.Server] = None
         self.ssl_context: Optional[ssl.SSLContext] = None
+        self.tun_fd = None
+        self.tun_name = None
+        self.tunnel_manager = TunnelManager(queue_size=queue_size, keepalive_interval=keepalive_interval, idle_timeout=idle_timeout)
+        self.auth_manager = AuthManager(revocation_file)
+        self.ip_pool = IPPool(vpn_network, 10, lease_file)
+        self.push_routes = push_routes or []
+        self.nat = NATManager(nat_interface, 'tun0', [vpn_network], backend=nat_backend)
+    
+    def _setup_tun(self):
+        self.tun_fd, self.tun_name = create_tun('tun0')
+        address = f'{self.ip_pool.gateway}/{self.ip_pool.prefixlen}'
+        subprocess.run(['ip', 'addr', 'add', address, 'dev', self.tun_name], check=True)
+        subprocess.run(['ip', 'link', 'set', 'dev', self.tun_name, 'up'], check=True)
     
     async def start(self):
-        pass
+        self._setup_tun()
+        os.set_blocking(self.tun_fd, False)
+        self.tunnel_manager.tun_fd = self.tun_fd
+        self.nat.apply()
+        
+        self.ssl_context = create_ssl_context()
+        self.server = await asyncio.start_server(
+            self.handle_client,
+            self.host,
+            self.port,
+            ssl=self.ssl_context,
+            ssl_handshake_timeout=self.handshake_timeout,
+            backlog=socket.SOMAXCONN,
+            reuse_address=True
+        )
+        
+        asyncio.get_running_loop().add_reader(self.tun_fd, self._handle_tun_data)
+        
+        print(f'VPN Server started on {self.host}:{self.port}')
+        print(f'TUN interface: {self.tun_name}')
+    
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self.server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            await self.stop()
     
     async def stop(self):
-        pass
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+        
+        for client_id in list(self.tunnel_manager.tunnels):
+            await self.tunnel_manager.destroy_tunnel(client_id)
+        
+        if self.tun_fd is not None:
+            asyncio.get_running_loop().remove_reader(self.tun_fd)
+            close_tun(self.tun_fd)
+            self.tun_fd = None
+            self.nat.remove()
+        
+        print('VPN Server stopped')
+    
+    def _handle_tun_data(self):
+        for _ in range(64):
+            try:
+                packet = os.read(self.tun_fd, 2048)
+            except BlockingIOError:
+                return
+            
+            if len(packet) < 20:
+                continue
+            
+            dst_ip = '.'.join(map(str, packet[16:20]))
+            self.tunnel_manager.enqueue_packet(dst_ip, packet)
     
     async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
-        pass
\ No newline at end of file
+        addr = writer.get_extra_info('peername')
+        client_id = f'{addr[0]}:{addr[1]}'
+        
+        peercert = writer.get_extra_info('peercert')
+        if not await self.auth_manager.authenticate(client_id, peercert):
+            writer.close()
+            return
+        
+        try:
+            client_ip = self.ip_pool.allocate(self.auth_manager.get_common_name(peercert))
+        except RuntimeError as e:
+            print(f'Error accepting client: {e}')
+            await self.auth_manager.revoke(client_id)
+            writer.close()
+            return
+        
+        try:
+            assignment = {'ip': client_ip, 'network': str(self.ip_pool.network)}
+            if self.push_routes:
+                assignment['routes'] = self.push_routes
+            writer.write(Protocol.pack_message(MessageType.HANDSHAKE, json.dumps(assignment).encode('utf-8')))
+            await writer.drain()
+            
+            print(f'Client connected from {addr}, assigned IP: {client_ip}')
+            tunnel = await self.tunnel_manager.create_tunnel(client_ip, reader, writer)
+            await tunnel
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            await self.auth_manager.revoke(client_id)
+            self.ip_pool.release(client_ip)
+            print(f'Client {client_ip} disconnected')
+    
+    def get_stats(self) -> dict:
+        stats = dict(self.tunnel_manager.stats)
+        stats['clients'] = len(self.tunnel_manager.tunnels)
+        return stats
\ No newline at end of file
@@ -9,6 +9,10 @@ from server.vpn_server_core import VPNServerCore
 from common.config import Config
 
 
+def deny_peer_traffic(source, destination) -> bool:
+    return False
+
+
 def main():
     config = Config('server/config.json')
     
@@ -16,7 +20,32 @@ def main():
     port = config.get('server_port', 8443)
     nat_interface = config.get('nat_interface', 'eth0')
     
-    server = VPNServerCore(host=host, port=port, nat_interface=nat_interface)
+    server = VPNServerCore(
+        host=host,
+        port=port,
+        nat_interface=nat_interface,
+        handshake_timeout=config.get('handshake_timeout', 10.0),
+        max_pending_handshakes=config.get('max_pending_handshakes', 256),
+        send_queue_limit=config.get('send_queue_limit', 1024 * 1024),
+        workers=config.get('workers', 1),
+        client_routes=config.get('client_routes', {}),
+        push_routes=config.get('push_routes', []),
+        vpn_network=config.get('vpn_network', '10.0.0.0/24'),
+        lease_file=config.get('lease_file', 'server/leases.json'),
+        ticket_rotation=config.get('ticket_rotation', 3600.0),
+        revocation_file=config.get('revocation_file'),
+        keepalive_interval=config.get('keepalive_interval', 10.0),
+        idle_timeout=config.get('idle_timeout', 60.0),
+        udp_port=config.get('udp_port'),
+        udp_timeout=config.get('udp_timeout', 6.0),
+        hairpin=config.get('hairpin', True),
+        peer_acl=None if config.get('peer_to_peer', True) else deny_peer_traffic,
+        nat_backend=config.get('nat_backend', 'iptables'),
+        client_rules=config.get('client_rules'),
+        rate_limits=config.get('rate_limits'),
+        drr_quantum=config.get('drr_quantum', 16384),
+        qos=config.get('qos')
+    )
     server.start()
 
 
@@ -1,16 +1,148 @@
 import asyncio
-from typing import Dict
+import os
+import time
+from typing import Dict, Optional
+from common.protocol import Protocol, MessageType, FrameReader
 
 
 class TunnelManager:
-    def __init__(self):
+    def __init__(self, tun_fd: Optional[int] = None, queue_size: int = 256, keepalive_interval: float = 10.0, idle_timeout: float = 60.0):
+        self.tun_fd = tun_fd
+        self.queue_size = queue_size
+        self.keepalive_interval = keepalive_interval
+        self.idle_timeout = idle_timeout
         self.tunnels: Dict[str, asyncio.Task] = {}
+        self.queues: Dict[str, asyncio.Queue] = {}
+        self.stats = {
+            'packets_in': 0,
+            'packets_out': 0,
+            'bytes_in': 0,
+            'bytes_out': 0,
+            'queue_drops': 0,
+            'tun_drops': 0,
+            'keepalives_sent': 0,
+            'idle_evictions': 0,
+        }
     
-    async def create_tunnel(self, client_id: str, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
-        pass
+    async def create_tunnel(self, client_id: str, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> asyncio.Task:
+        await self.destroy_tunnel(client_id)
+        
+        queue = asyncio.Queue(self.queue_size)
+        self.queues[client_id] = queue
+        task = asyncio.ensure_future(self._run_tunnel(client_id, reader, writer, queue))
+        self.tunnels[client_id] = task
+        return task
     
     async def destroy_tunnel(self, client_id: str):
-        pass
+        task = self.tunnels.get(client_id)
+        if task is None:
+            return
+        
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        
+        if self.tunnels.get(client_id) is task:
+            del self.tunnels[client_id]
+            del self.queues[client_id]
     
     async def forward_packet(self, client_id: str, data: bytes):
-        pass
\ No newline at end of file
+        self.enqueue_packet(client_id, data)
+    
+    def enqueue_packet(self, client_id: str, data: bytes) -> bool:
+        queue = self.queues.get(client_id)
+        if queue is None:
+            return False
+        
+        try:
+            queue.put_nowait(data)
+        except asyncio.QueueFull:
+            self.stats['queue_drops'] += 1
+            return False
+        return True
+    
+    async def _run_tunnel(self, client_id: str, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, queue: asyncio.Queue):
+        activity = {'rx': time.monotonic(), 'tx': time.monotonic()}
+        tasks = [
+            asyncio.ensure_future(self._receive_loop(reader, activity)),
+            asyncio.ensure_future(self._send_loop(writer, queue, activity)),
+            asyncio.ensure_future(self._keepalive_loop(client_id, writer, activity)),
+        ]
+        
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            
+            if self.tunnels.get(client_id) is asyncio.current_task():
+                del self.tunnels[client_id]
+                del self.queues[client_id]
+            
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+    
+    async def _receive_loop(self, reader: asyncio.StreamReader, activity: dict):
+        frames = FrameReader()
+        
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                return
+            
+            activity['rx'] = time.monotonic()
+            frames.feed(data)
+            for msg_type, payload in frames.read_frames():
+                if msg_type == MessageType.DATA:
+                    self._write_tun(payload)
+                elif msg_type == MessageType.DISCONNECT:
+                    return
+    
+    def _write_tun(self, packet):
+        try:
+            os.write(self.tun_fd, packet)
+        except BlockingIOError:
+            self.stats['tun_drops'] += 1
+            return
+        
+        self.stats['packets_in'] += 1
+        self.stats['bytes_in'] += len(packet)
+    
+    async def _keepalive_loop(self, client_id: str, writer: asyncio.StreamWriter, activity: dict):
+        while True:
+            now = time.monotonic()
+            if now - activity['rx'] >= self.idle_timeout:
+                print(f'Client {client_id} silent for {now - activity["rx"]:.0f}s, disconnecting')
+                self.stats['idle_evictions'] += 1
+                return
+            
+            if now - activity['tx'] >= self.keepalive_interval:
+                writer.write(Protocol.pack_message(MessageType.KEEPALIVE, b''))
+                self.stats['keepalives_sent'] += 1
+                activity['tx'] = now
+            
+            wake = min(activity['tx'] + self.keepalive_interval, activity['rx'] + self.idle_timeout)
+            await asyncio.sleep(max(0.0, wake - now))
+    
+    async def _send_loop(self, writer: asyncio.StreamWriter, queue: asyncio.Queue, activity: dict):
+        while True:
+            packet = await queue.get()
+            
+            while True:
+                writer.write(Protocol.pack_message(MessageType.DATA, packet))
+                self.stats['packets_out'] += 1
+                self.stats['bytes_out'] += len(packet)
+                
+                try:
+                    packet = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+            
+            activity['tx'] = time.monotonic()
+            await writer.drain()
\ No newline at end of file
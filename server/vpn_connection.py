@@ -0,0 +1,26 @@
+import socket
+import time
+from typing import Optional
+from common.packet import PacketHandler
+from common.protocol import FrameReader, FrameWriter
+from common.qos import QoSPolicy
+
+
+class ClientConnection:
+    def __init__(self, sock: socket.socket, addr, ip: str, send_queue_limit: int = 1024 * 1024, qos: Optional[QoSPolicy] = None):
+        self.sock = sock
+        self.fd = sock.fileno()
+        self.addr = addr
+        self.ip = ip
+        self.address = PacketHandler.ip_to_int(ip)
+        self.common_name = None
+        self.serial = None
+        self.udp = None
+        self.reader = FrameReader()
+        self.writer = qos.writer(send_queue_limit) if qos is not None else FrameWriter(send_queue_limit)
+        self.want_write = False
+        self.scheduled = False
+        self.deficit = 0
+        self.rx_limits = ()
+        self.tx_limits = ()
+        self.last_rx = self.last_tx = time.monotonic()
\ No newline at end of file
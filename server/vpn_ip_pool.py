@@ -0,0 +1,143 @@
+import ipaddress
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class IPPool:
+    def __init__(
+        self,
+        network: str = '10.0.0.0/24',
+        first_host: int = 10,
+        lease_file: Optional[str] = None,
+        stride: int = 1,
+        phase: int = 0
+    ):
+        self.network = ipaddress.IPv4Network(network, strict=False)
+        self.base = int(self.network.network_address)
+        self.gateway = str(self.network.network_address + 1)
+        self.prefixlen = self.network.prefixlen
+        self.first_host = first_host + phase
+        self.stride = stride
+        self.size = max(0, (self.network.num_addresses - 1 - self.first_host + stride - 1) // stride)
+        if self.size == 0:
+            raise ValueError(f'Network {self.network} has no addresses from host {self.first_host} up')
+        self.bitmap = bytearray((self.size + 7) // 8)
+        self.cursor = 0
+        self.in_use = 0
+        self.lease_file = Path(lease_file) if lease_file else None
+        self.leases: Dict[str, int] = {}
+        self.owners: Dict[int, str] = {}
+        self.idle: OrderedDict = OrderedDict()
+        self.load()
+    
+    def __len__(self) -> int:
+        return self.in_use
+    
+    def _to_address(self, index: int) -> str:
+        return str(ipaddress.IPv4Address(self.base + self.first_host + index * self.stride))
+    
+    def _to_index(self, address: str) -> Optional[int]:
+        offset = int(ipaddress.IPv4Address(address)) - self.base - self.first_host
+        if offset < 0 or offset % self.stride:
+            return None
+        index = offset // self.stride
+        return index if index < self.size else None
+    
+    def _set(self, index: int):
+        self.bitmap[index >> 3] |= 1 << (index & 7)
+    
+    def _clear(self, index: int):
+        self.bitmap[index >> 3] &= ~(1 << (index & 7))
+    
+    def _find_free(self) -> Optional[int]:
+        bitmap = self.bitmap
+        count = len(bitmap)
+        for i in range(count):
+            byte_index = (self.cursor + i) % count
+            value = bitmap[byte_index]
+            if value == 0xff:
+                continue
+            
+            index = (byte_index << 3) | ((~value & (value + 1)).bit_length() - 1)
+            if index >= self.size:
+                continue
+            self.cursor = byte_index
+            return index
+        return None
+    
+    def allocate(self, common_name: Optional[str] = None) -> str:
+        if common_name is not None:
+            index = self.leases.get(common_name)
+            if index is not None and index in self.idle:
+                del self.idle[index]
+                self.in_use += 1
+                return self._to_address(index)
+        
+        index = self._find_free()
+        reclaimed = index is None
+        if reclaimed:
+            if not self.idle:
+                raise RuntimeError(f'IP pool {self.network} exhausted')
+            index, _ = self.idle.popitem(last=False)
+            del self.leases[self.owners.pop(index)]
+        
+        self._set(index)
+        self.in_use += 1
+        if common_name is not None and common_name not in self.leases:
+            self.leases[common_name] = index
+            self.owners[index] = common_name
+            self.save()
+        elif reclaimed:
+            self.save()
+        return self._to_address(index)
+    
+    def release(self, address: str):
+        index = self._to_index(address)
+        if index is None or not self.bitmap[index >> 3] & (1 << (index & 7)) or index in self.idle:
+            return
+        
+        self.in_use -= 1
+        if index in self.owners:
+            self.idle[index] = None
+        else:
+            self._clear(index)
+    
+    def load(self):
+        if self.lease_file is None or not self.lease_file.exists():
+            return
+        
+        try:
+            with open(self.lease_file, 'r') as f:
+                leases = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f'Error loading leases from {self.lease_file}: {e}')
+            return
+        
+        for common_name, address in leases.items():
+            try:
+                index = self._to_index(address)
+            except ValueError:
+                continue
+            if index is None or index in self.owners:
+                continue
+            
+            self._set(index)
+            self.leases[common_name] = index
+            self.owners[index] = common_name
+            self.idle[index] = None
+    
+    def save(self):
+        if self.lease_file is None:
+            return
+        
+        leases = {common_name: self._to_address(index) for common_name, index in self.leases.items()}
+        tmp_path = self.lease_file.with_name(self.lease_file.name + '.tmp')
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(leases, f, indent=2)
+            os.replace(tmp_path, self.lease_file)
+        except OSError as e:
+            print(f'Error saving leases to {self.lease_file}: {e}')
\ No newline at end of file
@@ -0,0 +1,110 @@
+import ipaddress
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+class RouteTable:
+    def __init__(self):
+        self.write_lock = threading.Lock()
+        self.hosts: Dict[int, Any] = {}
+        self.prefixes: Dict[int, Dict[int, Any]] = {}
+        self.levels: Tuple[Tuple[int, Dict[int, Any]], ...] = ()
+        self.owned: Dict[Any, Set[Tuple[int, int]]] = {}
+        self.shadowed: Dict[Tuple[int, int], List[Any]] = {}
+    
+    def __len__(self) -> int:
+        return len(self.hosts) + sum(len(table) for table in self.prefixes.values())
+    
+    @staticmethod
+    def parse(network: str) -> Tuple[int, int]:
+        net = ipaddress.IPv4Network(network, strict=False)
+        return int(net.network_address), net.prefixlen
+    
+    def _rebuild_levels(self):
+        self.levels = tuple((32 - length, self.prefixes[length]) for length in sorted(self.prefixes, reverse=True))
+    
+    def add(self, address: int, length: int, value: Any):
+        with self.write_lock:
+            if length == 32:
+                table, key = self.hosts, address
+            else:
+                table = self.prefixes.get(length)
+                if table is None:
+                    table = self.prefixes[length] = {}
+                    self._rebuild_levels()
+                key = address >> (32 - length)
+            
+            current = table.get(key)
+            if current is not None and current is not value:
+                shadowed = self.shadowed.setdefault((address, length), [])
+                if value in shadowed:
+                    shadowed.remove(value)
+                shadowed.append(current)
+            table[key] = value
+            self.owned.setdefault(value, set()).add((address, length))
+    
+    def add_network(self, network: str, value: Any):
+        address, length = self.parse(network)
+        self.add(address, length, value)
+    
+    def remove(self, address: int, length: int, value: Any = None) -> bool:
+        with self.write_lock:
+            if length == 32:
+                table, key = self.hosts, address
+            else:
+                table, key = self.prefixes.get(length, {}), address >> (32 - length)
+            
+            current = table.get(key)
+            if current is None:
+                return False
+            
+            shadowed = self.shadowed.get((address, length))
+            if value is not None and current is not value:
+                if not shadowed or value not in shadowed:
+                    return False
+                shadowed.remove(value)
+                current = value
+            elif shadowed:
+                table[key] = shadowed.pop()
+            else:
+                del table[key]
+                if length != 32 and not table:
+                    del self.prefixes[length]
+                    self._rebuild_levels()
+            if shadowed is not None and not shadowed:
+                del self.shadowed[(address, length)]
+            
+            routes = self.owned.get(current)
+            if routes is not None:
+                routes.discard((address, length))
+                if not routes:
+                    del self.owned[current]
+            return True
+    
+    def remove_value(self, value: Any) -> int:
+        routes = list(self.owned.get(value, ()))
+        for address, length in routes:
+            self.remove(address, length, value)
+        return len(routes)
+    
+    def lookup(self, address: int) -> Optional[Any]:
+        value = self.hosts.get(address)
+        if value is not None:
+            return value
+        
+        for shift, table in self.levels:
+            value = table.get(address >> shift)
+            if value is not None:
+                return value
+        return None
+    
+    def routes(self, value: Any) -> List[str]:
+        return [f'{ipaddress.IPv4Address(address)}/{length}' for address, length in self.owned.get(value, ())]
+    
+    def clear(self):
+        with self.write_lock:
+            self.hosts.clear()
+            self.prefixes = {}
+            self.levels = ()
+            self.owned.clear()
+            self.shadowed.clear()
\ No newline at end of file
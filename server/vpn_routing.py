@@ -1,45 +1,163 @@
+import ipaddress
 import subprocess
+from typing import Dict, List, Optional, Sequence
 
 
-def enable_nat(interface: str = 'eth0'):
-    subprocess.run([
-        'iptables', '-t', 'nat', '-A', 'POSTROUTING', 
-        '-o', interface, '-j', 'MASQUERADE'
-    ], check=True)
-    
-    subprocess.run([
-        'iptables', '-A', 'FORWARD', '-i', 'tun0', 
-        '-o', interface, '-j', 'ACCEPT'
-    ], check=True)
-    
-    subprocess.run([
-        'iptables', '-A', 'FORWARD', '-i', interface, 
-        '-o', 'tun0', '-m', 'state', '--state', 'RELATED,ESTABLISHED', 
-        '-j', 'ACCEPT'
-    ], check=True)
-    
-    subprocess.run([
-        'sysctl', '-w', 'net.ipv4.ip_forward=1'
-    ], check=True, stdout=subprocess.DEVNULL)
+class NATManager:
+    FORWARD_CHAIN = 'NODEGUARD-FORWARD'
+    NAT_CHAIN = 'NODEGUARD-POSTROUTING'
+    NFT_TABLE = 'nodeguard'
+    IP_FORWARD = '/proc/sys/net/ipv4/ip_forward'
+    
+    def __init__(
+        self,
+        interface: str = 'eth0',
+        tun_name: str = 'tun0',
+        networks: Sequence[str] = ('10.0.0.0/24',),
+        client_rules: Optional[Dict[str, List[str]]] = None,
+        backend: str = 'iptables',
+        dry_run: bool = False
+    ):
+        if backend not in ('iptables', 'nft'):
+            raise ValueError(f'Unknown NAT backend {backend}')
+        
+        self.interface = interface
+        self.tun_name = tun_name
+        self.networks = [str(ipaddress.IPv4Network(network, strict=False)) for network in networks]
+        self.client_rules = {
+            str(ipaddress.IPv4Network(source, strict=False)): [str(ipaddress.IPv4Network(d, strict=False)) for d in destinations]
+            for source, destinations in (client_rules or {}).items()
+        }
+        self.backend = backend
+        self.dry_run = dry_run
+        self.previous_ip_forward = None
+    
+    def iptables_ruleset(self, installed: str = '') -> str:
+        lines = ['*nat', f':{self.NAT_CHAIN} - [0:0]']
+        for network in self.networks:
+            lines.append(f'-A {self.NAT_CHAIN} -s {network} -o {self.interface} -j MASQUERADE')
+        jump = f'-A POSTROUTING -j {self.NAT_CHAIN}'
+        if jump not in installed:
+            lines.append(jump)
+        lines.append('COMMIT')
+        
+        lines += ['*filter', f':{self.FORWARD_CHAIN} - [0:0]']
+        for source, destinations in self.client_rules.items():
+            for destination in destinations:
+                lines.append(f'-A {self.FORWARD_CHAIN} -s {source} -d {destination} -i {self.tun_name} -j ACCEPT')
+            lines.append(f'-A {self.FORWARD_CHAIN} -s {source} -i {self.tun_name} -j DROP')
+        lines.append(f'-A {self.FORWARD_CHAIN} -i {self.tun_name} -o {self.interface} -j ACCEPT')
+        lines.append(f'-A {self.FORWARD_CHAIN} -i {self.interface} -o {self.tun_name} -m state --state RELATED,ESTABLISHED -j ACCEPT')
+        jump = f'-A FORWARD -j {self.FORWARD_CHAIN}'
+        if jump not in installed:
+            lines.append(jump)
+        lines.append('COMMIT')
+        return '\n'.join(lines) + '\n'
+    
+    def iptables_teardown(self, installed: str) -> str:
+        lines = []
+        for table, parent, chain in (('nat', 'POSTROUTING', self.NAT_CHAIN), ('filter', 'FORWARD', self.FORWARD_CHAIN)):
+            if f':{chain} ' not in installed:
+                continue
+            lines.append(f'*{table}')
+            if f'-A {parent} -j {chain}' in installed:
+                lines.append(f'-D {parent} -j {chain}')
+            lines += [f'-F {chain}', f'-X {chain}', 'COMMIT']
+        return '\n'.join(lines) + '\n' if lines else ''
+    
+    def nft_ruleset(self) -> str:
+        lines = [
+            f'table ip {self.NFT_TABLE}',
+            f'delete table ip {self.NFT_TABLE}',
+            f'table ip {self.NFT_TABLE} {{',
+            '    chain postrouting {',
+            '        type nat hook postrouting priority srcnat; policy accept;',
+        ]
+        for network in self.networks:
+            lines.append(f'        ip saddr {network} oifname "{self.interface}" masquerade')
+        lines += [
+            '    }',
+            '    chain forward {',
+            '        type filter hook forward priority filter; policy accept;',
+        ]
+        for source, destinations in self.client_rules.items():
+            if destinations:
+                lines.append(f'        iifname "{self.tun_name}" ip saddr {source} ip daddr {{ {", ".join(destinations)} }} accept')
+            lines.append(f'        iifname "{self.tun_name}" ip saddr {source} drop')
+        lines += [
+            f'        iifname "{self.tun_name}" oifname "{self.interface}" accept',
+            f'        iifname "{self.interface}" oifname "{self.tun_name}" ct state related,established accept',
+            '    }',
+            '}',
+        ]
+        return '\n'.join(lines) + '\n'
+    
+    def nft_teardown(self) -> str:
+        return f'table ip {self.NFT_TABLE}\ndelete table ip {self.NFT_TABLE}\n'
+    
+    def _installed_iptables(self) -> str:
+        if self.dry_run:
+            return ''
+        return subprocess.run(['iptables-save'], check=True, capture_output=True, text=True).stdout
+    
+    def _load(self, ruleset: str, check: bool = True) -> str:
+        if self.dry_run:
+            print(ruleset, end='')
+            return ruleset
+        
+        if self.backend == 'nft':
+            command = ['nft', '-f', '-']
+        else:
+            command = ['iptables-restore', '--noflush']
+        subprocess.run(command, input=ruleset, text=True, check=check)
+        return ruleset
+    
+    def _set_ip_forward(self, value: str):
+        if self.dry_run:
+            return
+        with open(self.IP_FORWARD) as f:
+            previous = f.read().strip()
+        with open(self.IP_FORWARD, 'w') as f:
+            f.write(value)
+        return previous
+    
+    def apply(self) -> str:
+        if self.backend == 'nft':
+            ruleset = self._load(self.nft_ruleset())
+        else:
+            ruleset = self._load(self.iptables_ruleset(self._installed_iptables()))
+        
+        previous = self._set_ip_forward('1')
+        if self.previous_ip_forward is None:
+            self.previous_ip_forward = previous
+        return ruleset
+    
+    def remove(self) -> str:
+        ruleset = ''
+        try:
+            if self.backend == 'nft':
+                ruleset = self.nft_teardown()
+            else:
+                ruleset = self.iptables_teardown(self._installed_iptables())
+            if ruleset:
+                self._load(ruleset, check=False)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f'Error removing NAT rules: {e}')
+        
+        if self.previous_ip_forward is not None:
+            try:
+                self._set_ip_forward(self.previous_ip_forward)
+            except OSError as e:
+                print(f'Error restoring {self.IP_FORWARD}: {e}')
+            self.previous_ip_forward = None
+        return ruleset
+
+
+def enable_nat(interface: str = 'eth0', tun_name: str = 'tun0'):
+    NATManager(interface, tun_name).apply()
 
 
-def disable_nat(interface: str = 'eth0'):
-    subprocess.run([
-        'iptables', '-t', 'nat', '-D', 'POSTROUTING', 
-        '-o', interface, '-j', 'MASQUERADE'
-    ], check=False)
-    
-    subprocess.run([
-        'iptables', '-D', 'FORWARD', '-i', 'tun0', 
-        '-o', interface, '-j', 'ACCEPT'
-    ], check=False)
-    
-    subprocess.run([
-        'iptables', '-D', 'FORWARD', '-i', interface, 
-        '-o', 'tun0', '-m', 'state', '--state', 'RELATED,ESTABLISHED', 
-        '-j', 'ACCEPT'
-    ], check=False)
-    
-    subprocess.run([
-        'sysctl', '-w', 'net.ipv4.ip_forward=0'
-    ], check=False, stdout=subprocess.DEVNULL)
\ No newline at end of file
+def disable_nat(interface: str = 'eth0', tun_name: str = 'tun0'):
+    manager = NATManager(interface, tun_name)
+    manager.remove()
+    manager._set_ip_forward('0')
\ No newline at end of file
@@ -1,81 +1,530 @@
+import ctypes
+import json
+import os
+import signal
 import socket
 import ssl
 import select
-import struct
+import subprocess
 import threading
-from typing import Dict, Set, Optional
+import time
+import traceback
+import heapq
+import itertools
+from collections import deque
+from functools import partial
+from typing import Callable, Deque, Dict, List, Optional
+from common.packet import PacketHandler
+from common.crypto import DatagramChannel
+from common.protocol import MessageType
+from common.qos import QoSPolicy
+from common.timer_wheel import TimerWheel
+from .auth import AuthManager
+from .vpn_connection import ClientConnection
+from .vpn_ip_pool import IPPool
+from .vpn_route_table import RouteTable
 from .vpn_encryption import create_ssl_context
-from .vpn_tun import create_tun, read_packet, write_packet, close_tun
-from .vpn_routing import enable_nat, disable_nat
+from .vpn_tun import create_tun, close_tun, PacketBatch, read_packets, write_packets
+from .vpn_routing import NATManager
+from .vpn_shaping import RateLimits, admit, consume
+
+
+CLIENT_EVENTS = select.EPOLLIN | select.EPOLLRDHUP | select.EPOLLET
+PR_SET_PDEATHSIG = 1
 
 
 class VPNServerCore:
-    def __init__(self, host: str = '0.0.0.0', port: int = 8443, nat_interface: str = 'eth0'):
+    def __init__(
+        self,
+        host: str = '0.0.0.0',
+        port: int = 8443,
+        nat_interface: str = 'eth0',
+        handshake_timeout: float = 10.0,
+        max_pending_handshakes: int = 256,
+        send_queue_limit: int = 1024 * 1024,
+        workers: int = 1,
+        client_routes: Optional[Dict[str, List[str]]] = None,
+        push_routes: Optional[List[str]] = None,
+        vpn_network: str = '10.0.0.0/24',
+        lease_file: Optional[str] = None,
+        ticket_rotation: float = 3600.0,
+        revocation_file: Optional[str] = None,
+        keepalive_interval: float = 10.0,
+        idle_timeout: float = 60.0,
+        udp_port: Optional[int] = None,
+        udp_timeout: float = 6.0,
+        hairpin: bool = True,
+        peer_acl: Optional[Callable[[ClientConnection, ClientConnection], bool]] = None,
+        nat_backend: str = 'iptables',
+        client_rules: Optional[Dict[str, List[str]]] = None,
+        rate_limits: Optional[dict] = None,
+        drr_quantum: int = 16384,
+        qos: Optional[dict] = None
+    ):
         self.host = host
         self.port = port
         self.nat_interface = nat_interface
+        self.handshake_timeout = handshake_timeout
+        self.max_pending_handshakes = max_pending_handshakes
+        self.send_queue_limit = send_queue_limit
+        self.ticket_rotation = ticket_rotation
+        self.keepalive_interval = keepalive_interval
+        self.idle_timeout = idle_timeout
+        self.timers = TimerWheel(time.monotonic(), 0.25)
+        self.udp_port = udp_port
+        self.udp_timeout = udp_timeout
+        self.udp_socket = None
+        self.udp_sessions: Dict[bytes, ClientConnection] = {}
+        self.udp_buffer = bytearray(65535)
+        self.udp_view = memoryview(self.udp_buffer)
+        self.hairpin = hairpin
+        self.rate_limits = RateLimits(rate_limits)
+        self.drr_quantum = drr_quantum
+        self.qos = QoSPolicy(qos)
+        self.peer_acl = peer_acl
+        self.next_ticket_rotation = 0.0
+        self.auth_manager = AuthManager(revocation_file)
+        self.workers = max(1, workers)
+        self.client_routes = client_routes or {}
+        self.push_routes = push_routes or []
+        self.worker_id = 0
+        self.handoff_inbox = None
+        self.handoff_batch = PacketBatch(16)
+        self.handoff_peers: List[Optional[socket.socket]] = []
+        self.manage_nat = True
         self.tun_fd = None
         self.tun_name = None
+        self.tun_batch = PacketBatch()
         self.server_socket = None
         self.ssl_context = None
-        self.clients: Dict[socket.socket, str] = {}
-        self.ip_to_socket: Dict[str, socket.socket] = {}
+        self.epoll = None
+        self.handlers: Dict[int, Callable[[int], None]] = {}
+        self.clients: Dict[socket.socket, ClientConnection] = {}
+        self.routes = RouteTable()
+        self.pending_handshakes: Dict[ssl.SSLSocket, tuple] = {}
+        self.active_clients: Deque[ClientConnection] = deque()
+        self.shaped_clients: List[tuple] = []
+        self.shaped_order = itertools.count()
+        self.accepting = False
+        self.next_revocation_check = 0.0
+        self.stats = {
+            'handshakes': 0,
+            'handshakes_resumed': 0,
+            'handshake_failures': 0,
+            'handshake_timeouts': 0,
+            'handshake_revoked': 0,
+            'revocation_evictions': 0,
+            'keepalives_sent': 0,
+            'idle_evictions': 0,
+            'handshake_time_total': 0.0,
+            'handshake_time_max': 0.0,
+            'send_queue_drops': 0,
+            'send_queue_drop_bytes': 0,
+            'handoff_sent': 0,
+            'handoff_received': 0,
+            'handoff_drops': 0,
+            'tun_write_drops': 0,
+            'ingress_drops': 0,
+            'egress_drops': 0,
+            'egress_throttled': 0,
+            'hairpin_packets': 0,
+            'hairpin_denied': 0,
+            'udp_rx': 0,
+            'udp_tx': 0,
+            'udp_rejected': 0,
+            'udp_rx_drops': 0,
+            'udp_tx_drops': 0,
+            'tx_records': 0,
+            'tx_frames': 0,
+        }
         self.ip_pool_start = 10
-        self.ip_pool_current = self.ip_pool_start
+        self.lease_file = lease_file
+        self.ip_pool = IPPool(vpn_network, self.ip_pool_start, lease_file)
+        nat_networks = [vpn_network] + [network for networks in self.client_routes.values() for network in networks]
+        self.nat = NATManager(nat_interface, 'tun0', nat_networks, client_rules, nat_backend)
         self.running = False
         self.lock = threading.Lock()
     
-    def _allocate_ip(self) -> str:
+    def _allocate_ip(self, common_name: Optional[str] = None) -> str:
         with self.lock:
-            ip = f'10.0.0.{self.ip_pool_current}'
-            self.ip_pool_current += 1
-            return ip
+            return self.ip_pool.allocate(common_name)
+    
+    def _ip_owner(self, packet) -> Optional[int]:
+        offset = PacketHandler.dst_addr(packet) - self.ip_pool.base - self.ip_pool_start
+        if offset < 0 or offset >= self.ip_pool.network.num_addresses - self.ip_pool_start:
+            return None
+        return offset % self.workers
     
     def _setup_tun(self):
         self.tun_fd, self.tun_name = create_tun('tun0')
-        import subprocess
-        subprocess.run(['ip', 'addr', 'add', '10.0.0.1/24', 'dev', self.tun_name], check=True)
+        os.set_blocking(self.tun_fd, False)
+        self._configure_tun()
+    
+    def _setup_tun_queues(self) -> List[int]:
+        tun_fds = []
+        for _ in range(self.workers):
+            tun_fd, self.tun_name = create_tun('tun0', multi_queue=True)
+            os.set_blocking(tun_fd, False)
+            tun_fds.append(tun_fd)
+        self._configure_tun()
+        return tun_fds
+    
+    def _configure_tun(self):
+        address = f'{self.ip_pool.gateway}/{self.ip_pool.prefixlen}'
+        subprocess.run(['ip', 'addr', 'add', address, 'dev', self.tun_name], check=True)
         subprocess.run(['ip', 'link', 'set', 'dev', self.tun_name, 'up'], check=True)
+        for networks in self.client_routes.values():
+            for network in networks:
+                subprocess.run(['ip', 'route', 'replace', network, 'dev', self.tun_name], check=True)
     
     def _setup_server_socket(self):
-        self.ssl_context = create_ssl_context()
+        self._rotate_tickets()
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if self.workers > 1:
+            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         self.server_socket.bind((self.host, self.port))
-        self.server_socket.listen(5)
+        self.server_socket.listen(socket.SOMAXCONN)
         self.server_socket.setblocking(False)
     
+    def _setup_udp_socket(self):
+        if self.udp_port is None:
+            return
+        if self.workers > 1:
+            print('UDP data channel disabled: not supported with multiple workers')
+            return
+        
+        self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        self.udp_socket.bind((self.host, self.udp_port))
+        self.udp_socket.setblocking(False)
+    
+    def _rotate_tickets(self):
+        self.ssl_context = create_ssl_context()
+        self.next_ticket_rotation = time.monotonic() + self.ticket_rotation
+    
+    def _register(self, fd: int, events: int, handler: Callable[[int], None]):
+        self.handlers[fd] = handler
+        self.epoll.register(fd, events)
+    
+    def _unregister(self, fd: int):
+        if self.handlers.pop(fd, None) is None:
+            return
+        try:
+            self.epoll.unregister(fd)
+        except (OSError, ValueError):
+            pass
+    
+    def _set_accepting(self, accepting: bool):
+        if accepting != self.accepting:
+            self.accepting = accepting
+            self.epoll.modify(self.server_socket.fileno(), select.EPOLLIN if accepting else 0)
+    
     def _accept_client(self):
+        while len(self.pending_handshakes) < self.max_pending_handshakes:
+            try:
+                client_socket, addr = self.server_socket.accept()
+            except BlockingIOError:
+                return
+            except OSError as e:
+                print(f'Error accepting client: {e}')
+                return
+            
+            try:
+                client_socket.setblocking(False)
+                ssl_socket = self.ssl_context.wrap_socket(
+                    client_socket,
+                    server_side=True,
+                    do_handshake_on_connect=False
+                )
+            except Exception as e:
+                print(f'Error accepting client: {e}')
+                client_socket.close()
+                continue
+            
+            started = time.monotonic()
+            self.pending_handshakes[ssl_socket] = (addr, started)
+            self.timers.schedule(ssl_socket, started + self.handshake_timeout)
+            self._register(ssl_socket.fileno(), select.EPOLLIN, partial(self._continue_handshake, ssl_socket))
+            self._continue_handshake(ssl_socket, 0)
+        
+        self._set_accepting(False)
+    
+    def _continue_handshake(self, ssl_socket, events: int):
+        try:
+            ssl_socket.do_handshake()
+        except ssl.SSLWantReadError:
+            self.epoll.modify(ssl_socket.fileno(), select.EPOLLIN)
+            return
+        except ssl.SSLWantWriteError:
+            self.epoll.modify(ssl_socket.fileno(), select.EPOLLOUT)
+            return
+        except (ssl.SSLError, OSError):
+            self._abort_handshake(ssl_socket)
+            return
+        
+        self._complete_handshake(ssl_socket)
+    
+    def _finish_pending(self, ssl_socket) -> tuple:
+        pending = self.pending_handshakes.pop(ssl_socket)
+        self.timers.cancel(ssl_socket)
+        if self.running and len(self.pending_handshakes) < self.max_pending_handshakes:
+            self._set_accepting(True)
+        return pending
+    
+    def _abort_handshake(self, ssl_socket, timed_out: bool = False):
+        self._finish_pending(ssl_socket)
+        self.stats['handshake_timeouts' if timed_out else 'handshake_failures'] += 1
+        
+        try:
+            self._unregister(ssl_socket.fileno())
+        except OSError:
+            pass
+        try:
+            ssl_socket.close()
+        except:
+            pass
+    
+    def _run_timers(self):
+        now = time.monotonic()
+        for key in self.timers.advance(now):
+            if isinstance(key, ClientConnection):
+                self._client_timer(key, now)
+            elif key in self.pending_handshakes:
+                self._abort_handshake(key, timed_out=True)
+        
+        if now >= self.next_revocation_check:
+            self.next_revocation_check = now + 1.0
+            if self.auth_manager.check_revocations():
+                self._evict_revoked()
+    
+    def _schedule_client_timer(self, client: ClientConnection):
+        self.timers.schedule(client, min(client.last_rx + self.idle_timeout, client.last_tx + self.keepalive_interval))
+    
+    def _client_timer(self, client: ClientConnection, now: float):
+        if client.sock not in self.clients:
+            return
+        
+        if now - client.last_rx >= self.idle_timeout:
+            print(f'Client {client.ip} silent for {now - client.last_rx:.0f}s, disconnecting')
+            self.stats['idle_evictions'] += 1
+            self._remove_client(client.sock)
+            return
+        
+        if now - client.last_tx >= self.keepalive_interval:
+            self._send_to_client(client, MessageType.KEEPALIVE, b'')
+            client.last_tx = now
+            self.stats['keepalives_sent'] += 1
+        
+        self._schedule_client_timer(client)
+    
+    def _evict_revoked(self):
+        revoked = [c for c in self.clients.values() if self.auth_manager.is_revoked(c.serial)]
+        for client in revoked:
+            print(f'Evicting client {client.ip} ({client.common_name}): certificate revoked')
+            self.stats['revocation_evictions'] += 1
+            self._remove_client(client.sock)
+    
+    def _complete_handshake(self, ssl_socket):
+        addr, started = self._finish_pending(ssl_socket)
+        
+        elapsed = time.monotonic() - started
+        self.stats['handshakes'] += 1
+        if ssl_socket.session_reused:
+            self.stats['handshakes_resumed'] += 1
+        self.stats['handshake_time_total'] += elapsed
+        self.stats['handshake_time_max'] = max(self.stats['handshake_time_max'], elapsed)
+        
         try:
-            client_socket, addr = self.server_socket.accept()
-            ssl_socket = self.ssl_context.wrap_socket(client_socket, server_side=True)
-            ssl_socket.setblocking(False)
+            peercert = ssl_socket.getpeercert()
+            serial = self.auth_manager.get_serial(peercert)
+            if self.auth_manager.is_revoked(serial):
+                print(f'Rejected client from {addr}: certificate {serial:x} revoked')
+                self.stats['handshake_revoked'] += 1
+                self._unregister(ssl_socket.fileno())
+                ssl_socket.close()
+                return
             
-            client_ip = self._allocate_ip()
+            common_name = self.auth_manager.get_common_name(peercert)
+            client_ip = self._allocate_ip(common_name)
+            client = ClientConnection(ssl_socket, addr, client_ip, self.send_queue_limit, self.qos)
+            client.common_name = common_name
+            client.serial = serial
+            if self.rate_limits:
+                client.rx_limits, client.tx_limits = self.rate_limits.for_client(common_name)
+            assignment = {'ip': client_ip, 'network': str(self.ip_pool.network)}
+            if self.push_routes:
+                assignment['routes'] = self.push_routes
+            if self.udp_socket is not None:
+                client.udp, offer = DatagramChannel.create()
+                offer['port'] = self.udp_socket.getsockname()[1]
+                assignment['udp'] = offer
             
             with self.lock:
-                self.clients[ssl_socket] = client_ip
-                self.ip_to_socket[client_ip] = ssl_socket
+                self.clients[ssl_socket] = client
+                if client.udp is not None:
+                    self.udp_sessions[client.udp.session_id] = client
+            self._add_routes(client)
+            self._schedule_client_timer(client)
+            
+            fd = ssl_socket.fileno()
+            self.handlers[fd] = partial(self._handle_client_events, ssl_socket)
+            self.epoll.modify(fd, CLIENT_EVENTS)
             
-            ip_data = client_ip.encode('utf-8')
-            header = struct.pack('!I', len(ip_data))
-            ssl_socket.sendall(header + ip_data)
+            self._send_to_client(client, MessageType.HANDSHAKE, json.dumps(assignment).encode('utf-8'), force=True)
             
             print(f'Client connected from {addr}, assigned IP: {client_ip}')
-        except ssl.SSLError:
-            pass
         except Exception as e:
             print(f'Error accepting client: {e}')
+            self._remove_client(ssl_socket)
+            return
+        
+        self._handle_client_data(ssl_socket)
     
-    def _handle_client_data(self, client_socket):
+    def _add_routes(self, client: ClientConnection):
+        self.routes.add(client.address, 32, client)
+        for network in self.client_routes.get(client.common_name, ()):
+            self.routes.add_network(network, client)
+            print(f'Routing {network} via {client.ip}')
+    
+    def get_stats(self) -> dict:
+        stats = dict(self.stats)
+        stats['pending_handshakes'] = len(self.pending_handshakes)
+        stats['clients'] = len(self.clients)
+        stats['routes'] = len(self.routes)
+        if stats['handshakes']:
+            stats['handshake_time_avg'] = stats['handshake_time_total'] / stats['handshakes']
+        else:
+            stats['handshake_time_avg'] = 0.0
+        if stats['tx_records']:
+            stats['frames_per_record'] = stats['tx_frames'] / stats['tx_records']
+        else:
+            stats['frames_per_record'] = 0.0
+        return stats
+    
+    def _handle_client_events(self, client_socket, events: int):
+        if events & select.EPOLLIN:
+            self._handle_client_data(client_socket)
+        elif events & (select.EPOLLERR | select.EPOLLHUP | select.EPOLLRDHUP):
+            self._remove_client(client_socket)
+            return
+        
+        if events & select.EPOLLOUT:
+            client = self.clients.get(client_socket)
+            if client is not None:
+                self._set_want_write(client, False)
+                self._schedule_flush(client)
+    
+    def _set_want_write(self, client: ClientConnection, want_write: bool):
+        if client.want_write != want_write:
+            client.want_write = want_write
+            self.epoll.modify(client.fd, CLIENT_EVENTS | select.EPOLLOUT if want_write else CLIENT_EVENTS)
+    
+    def _flush_client(self, client: ClientConnection, budget: Optional[int] = None):
+        writer = client.writer
+        records, frames = writer.records, writer.frames_sent
+        
         try:
-            data = client_socket.recv(2048)
-            if not data:
-                self._remove_client(client_socket)
-                return
+            drained = writer.flush(client.sock, budget)
+        except OSError as e:
+            print(f'Error sending to client {client.ip}: {e}')
+            self._remove_client(client.sock)
+            return
+        finally:
+            if writer.records != records:
+                client.last_tx = time.monotonic()
+            self.stats['tx_records'] += writer.records - records
+            self.stats['tx_frames'] += writer.frames_sent - frames
+        
+        self._set_want_write(client, not drained and writer.inflight is not None)
+    
+    def _send_to_client(self, client: ClientConnection, msg_type: MessageType, payload, force: bool = False):
+        writer = client.writer
+        dropped, dropped_bytes = writer.dropped_packets, writer.dropped_bytes
+        queued = writer.push(msg_type, payload, force)
+        if writer.dropped_packets != dropped:
+            self.stats['send_queue_drops'] += writer.dropped_packets - dropped
+            self.stats['send_queue_drop_bytes'] += writer.dropped_bytes - dropped_bytes
+        if not queued:
+            return
+        
+        if not client.want_write:
+            self._schedule_flush(client)
+    
+    def _schedule_flush(self, client: ClientConnection):
+        if not client.scheduled:
+            client.scheduled = True
+            self.active_clients.append(client)
+    
+    def _flush_active_clients(self):
+        active = self.active_clients
+        now = time.monotonic()
+        while active:
+            client = active.popleft()
+            if client.want_write or client.sock not in self.clients:
+                client.scheduled = False
+                client.deficit = 0
+                continue
             
-            write_packet(self.tun_fd, data)
-        except ssl.SSLWantReadError:
+            if client.tx_limits and not admit(client.tx_limits, now):
+                self.stats['egress_throttled'] += 1
+                wake = now + max(bucket.delay(now) for bucket in client.tx_limits)
+                heapq.heappush(self.shaped_clients, (wake, next(self.shaped_order), client))
+                continue
+            
+            writer = client.writer
+            sent = writer.bytes_sent
+            client.deficit += self.drr_quantum
+            self._flush_client(client, client.deficit)
+            sent = writer.bytes_sent - sent
+            client.deficit -= sent
+            if client.tx_limits:
+                consume(client.tx_limits, sent, now)
+            
+            if writer.pending() and not client.want_write and client.sock in self.clients:
+                active.append(client)
+            else:
+                client.scheduled = False
+                client.deficit = 0
+    
+    def _resume_shaped(self, now: float):
+        shaped = self.shaped_clients
+        while shaped and shaped[0][0] <= now:
+            client = heapq.heappop(shaped)[2]
+            if client.sock in self.clients:
+                self.active_clients.append(client)
+            else:
+                client.scheduled = False
+    
+    def _poll_timeout(self) -> float:
+        timeout = self.timers.resolution if self.timers else 1.0
+        if self.shaped_clients:
+            timeout = max(0.0, min(timeout, self.shaped_clients[0][0] - time.monotonic()))
+        return timeout
+    
+    def _handle_client_data(self, client_socket):
+        client = self.clients.get(client_socket)
+        if client is None:
+            return
+        
+        try:
+            while True:
+                if not client.reader.recv_into(client_socket):
+                    self._remove_client(client_socket)
+                    return
+                client.last_rx = time.monotonic()
+                
+                packets = []
+                for msg_type, payload in client.reader.read_frames():
+                    if msg_type == MessageType.DATA:
+                        packets.append(payload)
+                    elif msg_type == MessageType.DISCONNECT:
+                        self._remove_client(client_socket)
+                        return
+                
+                if packets:
+                    self._route_from_client(client, packets, client.last_rx)
+        except (ssl.SSLWantReadError, BlockingIOError):
             pass
         except ssl.SSLWantWriteError:
             pass
@@ -83,34 +532,161 @@ class VPNServerCore:
             print(f'Error handling client data: {e}')
             self._remove_client(client_socket)
     
+    def _route_from_client(self, client: ClientConnection, packets: list, now: float):
+        if client.rx_limits:
+            packets = self._police_ingress(client, packets, now)
+        
+        if self.hairpin:
+            lookup = self.routes.lookup
+            acl = self.peer_acl
+            upstream = []
+            for packet in packets:
+                peer = lookup(int.from_bytes(packet[16:20], 'big')) if len(packet) >= 20 else None
+                if peer is None or peer is client:
+                    upstream.append(packet)
+                elif acl is None or acl(client, peer):
+                    self._forward_to_client(peer, packet, now)
+                    self.stats['hairpin_packets'] += 1
+                else:
+                    self.stats['hairpin_denied'] += 1
+            packets = upstream
+        
+        if packets:
+            written = write_packets(self.tun_fd, packets)
+            self.stats['tun_write_drops'] += len(packets) - written
+    
+    def _police_ingress(self, client: ClientConnection, packets: list, now: float) -> list:
+        admitted = []
+        for packet in packets:
+            if admit(client.rx_limits, now):
+                consume(client.rx_limits, len(packet), now)
+                admitted.append(packet)
+            else:
+                self.stats['ingress_drops'] += 1
+        return admitted
+    
     def _handle_tun_data(self):
         try:
-            packet = read_packet(self.tun_fd)
+            packets = read_packets(self.tun_fd, self.tun_batch)
+        except OSError as e:
+            print(f'Error handling tun data: {e}')
+            return
+        
+        lookup = self.routes.lookup
+        now = time.monotonic()
+        for packet in packets:
             if len(packet) < 20:
-                return
+                continue
+            
+            client = lookup(int.from_bytes(packet[16:20], 'big'))
+            if client:
+                self._forward_to_client(client, packet, now)
+            elif self.workers > 1:
+                self._handoff_packet(packet)
+    
+    def _forward_to_client(self, client: ClientConnection, packet, now: float):
+        udp = client.udp
+        if udp is not None and udp.peer is not None and now - udp.last_rx < self.udp_timeout:
+            if client.tx_limits:
+                if not admit(client.tx_limits, now):
+                    self.stats['egress_drops'] += 1
+                    return
+                consume(client.tx_limits, len(packet), now)
+            self._send_udp(client, packet)
+        else:
+            self._send_to_client(client, MessageType.DATA, packet)
+    
+    def _send_udp(self, client: ClientConnection, packet):
+        try:
+            self.udp_socket.sendto(client.udp.seal(packet), client.udp.peer)
+            self.stats['udp_tx'] += 1
+        except OSError:
+            self.stats['udp_tx_drops'] += 1
+    
+    def _handle_udp(self):
+        now = time.monotonic()
+        packets = []
+        sender = None
+        
+        for _ in range(64):
+            try:
+                size, addr = self.udp_socket.recvfrom_into(self.udp_buffer)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                print(f'Error handling udp data: {e}')
+                break
             
-            dst_ip = '.'.join(map(str, packet[16:20]))
+            datagram = self.udp_view[:size]
+            client = self.udp_sessions.get(bytes(datagram[:DatagramChannel.SESSION_ID_SIZE]))
+            payload = client.udp.open(datagram) if client is not None else None
+            if payload is None:
+                self.stats['udp_rejected'] += 1
+                continue
             
-            with self.lock:
-                client_socket = self.ip_to_socket.get(dst_ip)
+            self.stats['udp_rx'] += 1
+            client.udp.peer = addr
+            client.udp.last_rx = client.last_rx = now
+            if not payload:
+                self._send_udp(client, b'')
+                continue
             
-            if client_socket:
-                try:
-                    client_socket.sendall(packet)
-                except Exception as e:
-                    print(f'Error sending to client {dst_ip}: {e}')
-                    self._remove_client(client_socket)
+            if client is not sender and packets:
+                self._route_datagrams(sender, packets, now)
+                packets = []
+            sender = client
+            packets.append(payload)
+        
+        if packets:
+            self._route_datagrams(sender, packets, now)
+    
+    def _route_datagrams(self, client: ClientConnection, packets: list, now: float):
+        try:
+            self._route_from_client(client, packets, now)
         except Exception as e:
-            print(f'Error handling tun data: {e}')
+            print(f'Error routing udp data from {client.ip}: {e}')
+            self.stats['udp_rx_drops'] += len(packets)
+    
+    def _handoff_packet(self, packet):
+        owner = self._ip_owner(packet)
+        if owner is None or owner == self.worker_id:
+            return
+        
+        try:
+            self.handoff_peers[owner].send(packet)
+            self.stats['handoff_sent'] += 1
+        except (BlockingIOError, OSError):
+            self.stats['handoff_drops'] += 1
+    
+    def _handle_handoff(self):
+        try:
+            packets = read_packets(self.handoff_inbox.fileno(), self.handoff_batch)
+        except OSError as e:
+            print(f'Error handling handoff data: {e}')
+            return
+        
+        self.stats['handoff_received'] += len(packets)
+        now = time.monotonic()
+        for packet in packets:
+            client = self.routes.lookup(PacketHandler.dst_addr(packet))
+            if client:
+                self._forward_to_client(client, packet, now)
     
     def _remove_client(self, client_socket):
+        try:
+            self._unregister(client_socket.fileno())
+        except OSError:
+            pass
+        
         with self.lock:
             if client_socket in self.clients:
-                client_ip = self.clients[client_socket]
-                del self.clients[client_socket]
-                if client_ip in self.ip_to_socket:
-                    del self.ip_to_socket[client_ip]
-                print(f'Client {client_ip} disconnected')
+                client = self.clients.pop(client_socket)
+                self.timers.cancel(client)
+                self.routes.remove_value(client)
+                if client.udp is not None:
+                    self.udp_sessions.pop(client.udp.session_id, None)
+                self.ip_pool.release(client.ip)
+                print(f'Client {client.ip} disconnected')
         
         try:
             client_socket.close()
@@ -118,40 +694,147 @@ class VPNServerCore:
             pass
     
     def start(self):
+        if self.workers > 1:
+            self._start_workers()
+            return
+        
         self._setup_tun()
         self._setup_server_socket()
-        enable_nat(self.nat_interface)
+        self._setup_udp_socket()
+        self.nat.tun_name = self.tun_name
+        self.nat.apply()
+        self._run()
+    
+    def _start_workers(self):
+        tun_fds = self._setup_tun_queues()
+        inboxes = [socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM) for _ in range(self.workers)]
+        self.nat.tun_name = self.tun_name
+        
+        pids = []
+        parent = os.getpid()
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        try:
+            self.nat.apply()
+            for worker_id in range(self.workers):
+                pid = os.fork()
+                if pid == 0:
+                    self._run_worker(worker_id, tun_fds, inboxes, parent)
+                pids.append(pid)
+            
+            for tun_fd in tun_fds:
+                close_tun(tun_fd)
+            for rx, tx in inboxes:
+                rx.close()
+                tx.close()
+            
+            print(f'Started {self.workers} workers on {self.host}:{self.port}')
+            pid, status = os.wait()
+            pids.remove(pid)
+            print(f'Worker pid {pid} exited with status {status}, stopping the remaining workers')
+        except KeyboardInterrupt:
+            print('\nShutting down...')
+        finally:
+            self._stop_workers(pids)
+            self.nat.remove()
+            print('VPN Server stopped')
+    
+    def _stop_workers(self, pids: List[int], timeout: float = 5.0):
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        
+        deadline = time.monotonic() + timeout
+        remaining = list(pids)
+        while True:
+            remaining = [pid for pid in remaining if os.waitpid(pid, os.WNOHANG)[0] == 0]
+            if not remaining:
+                return
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(0.05)
+        
+        for pid in remaining:
+            print(f'Worker pid {pid} did not stop, killing it')
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+    
+    def _run_worker(self, worker_id: int, tun_fds: List[int], inboxes: list, parent: int):
+        code = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.default_int_handler)
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            ctypes.CDLL(None, use_errno=True).prctl(PR_SET_PDEATHSIG, signal.SIGTERM)
+            if os.getppid() != parent:
+                return
+            
+            self.worker_id = worker_id
+            self.manage_nat = False
+            lease_file = f'{self.lease_file}.{worker_id}' if self.lease_file else None
+            self.ip_pool = IPPool(str(self.ip_pool.network), self.ip_pool_start, lease_file, self.workers, worker_id)
+            
+            self.tun_fd = tun_fds[worker_id]
+            for i, tun_fd in enumerate(tun_fds):
+                if i != worker_id:
+                    close_tun(tun_fd)
+            
+            self.handoff_inbox = inboxes[worker_id][0]
+            self.handoff_inbox.setblocking(False)
+            self.handoff_peers = []
+            for i, (rx, tx) in enumerate(inboxes):
+                if i != worker_id:
+                    rx.close()
+                    tx.setblocking(False)
+                    self.handoff_peers.append(tx)
+                else:
+                    tx.close()
+                    self.handoff_peers.append(None)
+            
+            self._setup_server_socket()
+            self._run()
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            os._exit(code)
+    
+    def _run(self):
+        self.epoll = select.epoll()
+        self._register(self.server_socket.fileno(), select.EPOLLIN, lambda events: self._accept_client())
+        self.accepting = True
+        self._register(self.tun_fd, select.EPOLLIN, lambda events: self._handle_tun_data())
+        if self.handoff_inbox is not None:
+            self._register(self.handoff_inbox.fileno(), select.EPOLLIN, lambda events: self._handle_handoff())
+        if self.udp_socket is not None:
+            self._register(self.udp_socket.fileno(), select.EPOLLIN, lambda events: self._handle_udp())
         
         self.running = True
-        print(f'VPN Server started on {self.host}:{self.port}')
+        if self.workers > 1:
+            print(f'Worker {self.worker_id} (pid {os.getpid()}) serving on {self.host}:{self.port}')
+        else:
+            print(f'VPN Server started on {self.host}:{self.port}')
         print(f'TUN interface: {self.tun_name}')
         
         try:
             while self.running:
-                with self.lock:
-                    client_sockets = list(self.clients.keys())
-                
-                read_list = [self.server_socket, self.tun_fd] + client_sockets
-                
-                try:
-                    readable, _, exceptional = select.select(read_list, [], read_list, 1.0)
-                except Exception as e:
-                    continue
-                
-                for s in readable:
-                    if s is self.server_socket:
-                        self._accept_client()
-                    elif s == self.tun_fd:
-                        self._handle_tun_data()
-                    else:
-                        self._handle_client_data(s)
+                for fd, events in self.epoll.poll(self._poll_timeout()):
+                    handler = self.handlers.get(fd)
+                    if handler is not None:
+                        handler(events)
                 
-                for s in exceptional:
-                    if s != self.server_socket and s != self.tun_fd:
-                        self._remove_client(s)
+                if self.shaped_clients:
+                    self._resume_shaped(time.monotonic())
+                self._flush_active_clients()
+                self._run_timers()
+                if time.monotonic() >= self.next_ticket_rotation:
+                    self._rotate_tickets()
         
         except KeyboardInterrupt:
-            print('\nShutting down...')
+            if self.workers == 1:
+                print('\nShutting down...')
         finally:
             self.stop()
     
@@ -165,7 +848,17 @@ class VPNServerCore:
                 except:
                     pass
             self.clients.clear()
-            self.ip_to_socket.clear()
+            self.routes.clear()
+            self.udp_sessions.clear()
+        self.active_clients.clear()
+        self.shaped_clients = []
+        
+        for ssl_socket in list(self.pending_handshakes):
+            try:
+                ssl_socket.close()
+            except:
+                pass
+        self.pending_handshakes.clear()
         
         if self.server_socket:
             try:
@@ -173,8 +866,27 @@ class VPNServerCore:
             except:
                 pass
         
+        if self.udp_socket is not None:
+            self.udp_socket.close()
+            self.udp_socket = None
+        
+        if self.epoll is not None:
+            self.epoll.close()
+            self.epoll = None
+        self.handlers.clear()
+        
+        if self.handoff_inbox is not None:
+            self.handoff_inbox.close()
+            self.handoff_inbox = None
+        for peer in self.handoff_peers:
+            if peer is not None:
+                peer.close()
+        self.handoff_peers = []
+        
         if self.tun_fd is not None:
             close_tun(self.tun_fd)
+            self.tun_fd = None
         
-        disable_nat(self.nat_interface)
-        print('VPN Server stopped')
\ No newline at end of file
+        if self.manage_nat:
+            self.nat.remove()
+            print('VPN Server stopped')
\ No newline at end of file
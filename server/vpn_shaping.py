@@ -0,0 +1,74 @@
+import time
+from typing import Dict, Optional, Tuple
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst if burst else max(rate * 0.5, 64 * 1024)
+        self.tokens = self.burst
+        self.stamp = time.monotonic()
+    
+    def _refill(self, now: float):
+        elapsed = now - self.stamp
+        if elapsed > 0:
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self.stamp = now
+    
+    def ready(self, now: float) -> bool:
+        if self.tokens > 0:
+            return True
+        self._refill(now)
+        return self.tokens > 0
+    
+    def consume(self, size: int, now: float):
+        self._refill(now)
+        self.tokens -= size
+    
+    def delay(self, now: float) -> float:
+        self._refill(now)
+        return 0.0 if self.tokens > 0 else -self.tokens / self.rate
+
+
+class RateLimits:
+    def __init__(self, config: Optional[dict] = None):
+        config = config or {}
+        self.ingress = config.get('ingress')
+        self.egress = config.get('egress')
+        self.burst = config.get('burst')
+        self.groups: Dict[str, Tuple[Optional[TokenBucket], Optional[TokenBucket]]] = {}
+        self.members: Dict[str, str] = {}
+        
+        for name, group in config.get('groups', {}).items():
+            self.groups[name] = (self._bucket(group.get('ingress'), group.get('burst')), self._bucket(group.get('egress'), group.get('burst')))
+            for common_name in group.get('members', ()):
+                self.members[common_name] = name
+    
+    def __bool__(self) -> bool:
+        return bool(self.ingress or self.egress or self.groups)
+    
+    def _bucket(self, bits_per_second: Optional[float], burst: Optional[float] = None) -> Optional[TokenBucket]:
+        if not bits_per_second:
+            return None
+        return TokenBucket(bits_per_second / 8, burst or self.burst)
+    
+    def for_client(self, common_name: Optional[str]) -> Tuple[tuple, tuple]:
+        ingress = [self._bucket(self.ingress)]
+        egress = [self._bucket(self.egress)]
+        group = self.groups.get(self.members.get(common_name))
+        if group is not None:
+            ingress.append(group[0])
+            egress.append(group[1])
+        return tuple(b for b in ingress if b is not None), tuple(b for b in egress if b is not None)
+
+
+def admit(buckets: tuple, now: float) -> bool:
+    for bucket in buckets:
+        if not bucket.ready(now):
+            return False
+    return True
+
+
+def consume(buckets: tuple, size: int, now: float):
+    for bucket in buckets:
+        bucket.consume(size, now)
\ No newline at end of file
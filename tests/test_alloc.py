@@ -0,0 +1,32 @@
+import tracemalloc
+from common.protocol import MessageType, Protocol
+from scripts.bench_alloc import build_server, drain_tun
+
+
+def test_client_to_tun_path_does_not_allocate_per_packet():
+    server, server_side, peer_side, kernel_side, tun_side = build_server()
+    burst = Protocol.pack_message(MessageType.DATA, bytes([0x45]) + bytes(1399)) * 32
+    drain_buffer = memoryview(bytearray(65536))
+    
+    def iteration() -> int:
+        peer_side.sendall(burst)
+        server._handle_client_data(server_side)
+        return drain_tun(kernel_side, drain_buffer)
+    
+    try:
+        for _ in range(200):
+            iteration()
+        
+        tracemalloc.start()
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        packets = sum(iteration() for _ in range(1000))
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        for sock in (server_side, peer_side, kernel_side, tun_side):
+            sock.close()
+    
+    assert packets == 32 * 1000
+    assert (current - baseline) / packets < 1.0
+    assert peak - baseline < 16384
\ No newline at end of file
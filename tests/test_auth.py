@@ -0,0 +1,88 @@
+import datetime
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+from server.auth import AuthManager
+
+
+def build_crl(serials) -> x509.CertificateRevocationList:
+    key = ec.generate_private_key(ec.SECP256R1())
+    now = datetime.datetime.now(datetime.timezone.utc)
+    builder = x509.CertificateRevocationListBuilder()
+    builder = builder.issuer_name(x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'Test CA')]))
+    builder = builder.last_update(now).next_update(now + datetime.timedelta(days=1))
+    for serial in serials:
+        builder = builder.add_revoked_certificate(x509.RevokedCertificateBuilder().serial_number(serial).revocation_date(now).build())
+    return builder.sign(key, hashes.SHA256())
+
+
+def test_text_list_starting_with_zero(tmp_path):
+    path = tmp_path / 'revoked.txt'
+    path.write_text('0A1B2C3D\nDEADBEEF\n')
+    
+    auth = AuthManager(str(path))
+    assert auth.revoked_serials == {0x0A1B2C3D, 0xDEADBEEF}
+    assert auth.is_revoked(0xDEADBEEF)
+
+
+def test_text_list_with_comments(tmp_path):
+    path = tmp_path / 'revoked.txt'
+    path.write_text('# revoked\n0a:1b:2c:3d  # laptop\n\n')
+    assert AuthManager.load_revocations(path) == {0x0A1B2C3D}
+
+
+@pytest.mark.parametrize('encoding', [serialization.Encoding.DER, serialization.Encoding.PEM])
+def test_crl(tmp_path, encoding):
+    path = tmp_path / 'revoked.crl'
+    path.write_bytes(build_crl([0x1234, 0xDEADBEEF]).public_bytes(encoding))
+    assert AuthManager.load_revocations(path) == {0x1234, 0xDEADBEEF}
+
+
+def test_unreadable_list_refuses_to_start(tmp_path):
+    path = tmp_path / 'revoked.txt'
+    path.write_text('not a serial\n')
+    with pytest.raises(ValueError):
+        AuthManager(str(path))
+
+
+def test_missing_list_refuses_to_start(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        AuthManager(str(tmp_path / 'missing.txt'))
+
+
+def test_reload_keeps_previous_set_on_error(tmp_path):
+    path = tmp_path / 'revoked.txt'
+    path.write_text('DEADBEEF\n')
+    auth = AuthManager(str(path))
+    
+    path.write_text('garbage\n')
+    path.touch()
+    assert not auth.check_revocations()
+    assert auth.is_revoked(0xDEADBEEF)
+
+def test_deleted_list_keeps_previous_set(tmp_path):
+    path = tmp_path / 'revoked.txt'
+    path.write_text('DEADBEEF\n')
+    auth = AuthManager(str(path))
+    
+    path.unlink()
+    assert not auth.check_revocations()
+    assert auth.is_revoked(0xDEADBEEF)
+    
+    path.write_text('')
+    assert auth.check_revocations()
+    assert not auth.is_revoked(0xDEADBEEF)
+
+
+def test_stat_error_keeps_previous_set(tmp_path, monkeypatch):
+    path = tmp_path / 'revoked.txt'
+    path.write_text('DEADBEEF\n')
+    auth = AuthManager(str(path))
+    
+    def denied(*args, **kwargs):
+        raise PermissionError('denied')
+    monkeypatch.setattr('server.auth.os.stat', denied)
+    assert not auth.check_revocations()
+    assert auth.is_revoked(0xDEADBEEF)
\ No newline at end of file
@@ -0,0 +1,9 @@
+import pytest
+from common.cert_generation import issue_client_certificates
+
+
+@pytest.mark.parametrize('common_names', [['dev1', 'dev1'], ['dev/1', 'dev_1'], ['a b', 'a?b']])
+def test_batch_rejects_names_sharing_a_file(tmp_path, common_names):
+    with pytest.raises(ValueError):
+        issue_client_certificates(common_names, output_dir=str(tmp_path), ca_dir=str(tmp_path))
+    assert not list(tmp_path.iterdir())
\ No newline at end of file
@@ -0,0 +1,77 @@
+import json
+import pytest
+from server.vpn_ip_pool import IPPool
+
+
+def test_empty_pool_is_rejected():
+    with pytest.raises(ValueError):
+        IPPool('10.0.0.0/29')
+
+
+def test_allocate_release_and_reuse():
+    pool = IPPool('10.0.0.0/24')
+    first = pool.allocate()
+    second = pool.allocate()
+    assert (first, second) == ('10.0.0.10', '10.0.0.11')
+    assert len(pool) == 2
+    
+    pool.release(first)
+    pool.release(first)
+    assert len(pool) == 1
+    assert pool.allocate() == first
+
+
+def test_common_name_keeps_its_address():
+    pool = IPPool('10.0.0.0/24')
+    address = pool.allocate('alice')
+    pool.allocate()
+    pool.release(address)
+    
+    assert pool.allocate() != address
+    assert pool.allocate('alice') == address
+
+
+def test_exhausted_pool_raises():
+    pool = IPPool('10.0.0.0/28')
+    addresses = [pool.allocate() for _ in range(pool.size)]
+    assert addresses[-1] == '10.0.0.14'
+    with pytest.raises(RuntimeError):
+        pool.allocate()
+
+
+def test_reclaimed_lease_is_persisted(tmp_path):
+    lease_file = tmp_path / 'leases.json'
+    pool = IPPool('10.0.0.0/28', lease_file=str(lease_file))
+    names = [f'client{i}' for i in range(pool.size)]
+    for name in names:
+        pool.allocate(name)
+    pool.release(pool._to_address(pool.leases['client0']))
+    
+    assert pool.allocate('newcomer') == '10.0.0.10'
+    saved = json.loads(lease_file.read_text())
+    assert 'client0' not in saved
+    assert saved['newcomer'] == '10.0.0.10'
+    
+    reloaded = IPPool('10.0.0.0/28', lease_file=str(lease_file))
+    assert 'client0' not in reloaded.leases
+    assert reloaded.allocate('newcomer') == '10.0.0.10'
+    assert reloaded.allocate('client1') == '10.0.0.11'
+
+
+def test_unreadable_lease_file_starts_empty(tmp_path):
+    lease_file = tmp_path / 'leases.json'
+    lease_file.write_text('{not json')
+    pool = IPPool('10.0.0.0/24', lease_file=str(lease_file))
+    assert not pool.leases
+    assert pool.allocate('alice') == '10.0.0.10'
+
+
+def test_worker_pools_do_not_overlap():
+    pools = [IPPool('10.0.0.0/24', stride=3, phase=phase) for phase in range(3)]
+    seen = set()
+    for pool in pools:
+        addresses = {pool.allocate() for _ in range(pool.size)}
+        assert len(addresses) == pool.size
+        assert not addresses & seen
+        seen |= addresses
+    assert len(seen) == 255 - 10
\ No newline at end of file
@@ -0,0 +1,91 @@
+import subprocess
+from server.vpn_routing import NATManager
+
+
+def build_manager(**kwargs) -> NATManager:
+    return NATManager(
+        'eth0',
+        'tun0',
+        ['10.0.0.0/24', '192.168.50.0/24'],
+        {'10.0.0.0/24': ['172.16.0.0/12', '10.8.0.1']},
+        **kwargs
+    )
+
+
+def test_iptables_ruleset_adds_jumps_once():
+    manager = build_manager()
+    ruleset = manager.iptables_ruleset()
+    lines = ruleset.splitlines()
+    
+    assert lines[:2] == ['*nat', ':NODEGUARD-POSTROUTING - [0:0]']
+    assert '-A NODEGUARD-POSTROUTING -s 10.0.0.0/24 -o eth0 -j MASQUERADE' in lines
+    assert '-A NODEGUARD-POSTROUTING -s 192.168.50.0/24 -o eth0 -j MASQUERADE' in lines
+    assert '-A POSTROUTING -j NODEGUARD-POSTROUTING' in lines
+    assert '-A FORWARD -j NODEGUARD-FORWARD' in lines
+    assert lines.count('COMMIT') == 2
+    
+    accept = lines.index('-A NODEGUARD-FORWARD -s 10.0.0.0/24 -d 172.16.0.0/12 -i tun0 -j ACCEPT')
+    host = lines.index('-A NODEGUARD-FORWARD -s 10.0.0.0/24 -d 10.8.0.1/32 -i tun0 -j ACCEPT')
+    drop = lines.index('-A NODEGUARD-FORWARD -s 10.0.0.0/24 -i tun0 -j DROP')
+    assert accept < drop and host < drop
+    
+    installed = ruleset
+    again = manager.iptables_ruleset(installed).splitlines()
+    assert '-A POSTROUTING -j NODEGUARD-POSTROUTING' not in again
+    assert '-A FORWARD -j NODEGUARD-FORWARD' not in again
+    assert ':NODEGUARD-FORWARD - [0:0]' in again
+
+
+def test_iptables_teardown():
+    manager = build_manager()
+    installed = manager.iptables_ruleset()
+    lines = manager.iptables_teardown(installed).splitlines()
+    assert lines == [
+        '*nat', '-D POSTROUTING -j NODEGUARD-POSTROUTING', '-F NODEGUARD-POSTROUTING', '-X NODEGUARD-POSTROUTING', 'COMMIT',
+        '*filter', '-D FORWARD -j NODEGUARD-FORWARD', '-F NODEGUARD-FORWARD', '-X NODEGUARD-FORWARD', 'COMMIT',
+    ]
+    
+    without_jumps = '\n'.join(line for line in installed.splitlines() if not line.startswith(('-A POSTROUTING', '-A FORWARD')))
+    lines = manager.iptables_teardown(without_jumps).splitlines()
+    assert not any(line.startswith('-D ') for line in lines)
+    assert '-X NODEGUARD-FORWARD' in lines
+    
+    assert manager.iptables_teardown('*nat\n:POSTROUTING ACCEPT [0:0]\nCOMMIT\n') == ''
+
+
+def test_nft_ruleset():
+    manager = build_manager(backend='nft')
+    lines = manager.nft_ruleset().splitlines()
+    assert lines[:3] == ['table ip nodeguard', 'delete table ip nodeguard', 'table ip nodeguard {']
+    assert '        ip saddr 10.0.0.0/24 oifname "eth0" masquerade' in lines
+    assert '        iifname "tun0" ip saddr 10.0.0.0/24 ip daddr { 172.16.0.0/12, 10.8.0.1/32 } accept' in lines
+    assert lines.index('        iifname "tun0" ip saddr 10.0.0.0/24 drop') > lines.index('        ip saddr 10.0.0.0/24 oifname "eth0" masquerade')
+    assert manager.nft_teardown() == 'table ip nodeguard\ndelete table ip nodeguard\n'
+
+
+def test_dry_run_does_not_touch_the_system(capsys, monkeypatch):
+    def forbidden(*args, **kwargs):
+        raise AssertionError('subprocess called in dry run')
+    monkeypatch.setattr(subprocess, 'run', forbidden)
+    
+    manager = build_manager(dry_run=True)
+    assert manager.apply() == manager.iptables_ruleset()
+    assert '-A NODEGUARD-POSTROUTING' in capsys.readouterr().out
+    assert manager.remove() == ''
+
+
+def test_remove_is_best_effort(tmp_path, monkeypatch):
+    ip_forward = tmp_path / 'ip_forward'
+    ip_forward.write_text('0\n')
+    manager = build_manager()
+    manager.IP_FORWARD = str(ip_forward)
+    manager.previous_ip_forward = '0'
+    ip_forward.write_text('1\n')
+    
+    def failing(*args, **kwargs):
+        raise subprocess.CalledProcessError(1, args[0])
+    monkeypatch.setattr(subprocess, 'run', failing)
+    
+    assert manager.remove() == ''
+    assert ip_forward.read_text() == '0'
+    assert manager.previous_ip_forward is None
\ No newline at end of file
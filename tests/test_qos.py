@@ -0,0 +1,81 @@
+import struct
+from common.packet import PacketClassifier
+from common.protocol import FrameReader, MessageType, Protocol
+from common.qos import QoSPolicy
+
+
+def build_packet(protocol: int, source_port: int = 0, destination_port: int = 0, dscp: int = 0, size: int = 60) -> bytes:
+    header = struct.pack('!BBHHHBBH4s4s', 0x45, dscp << 2, size, 0, 0, 64, protocol, 0, bytes([10, 0, 0, 1]), bytes([10, 0, 0, 2]))
+    return header + struct.pack('!HH', source_port, destination_port) + bytes(size - 24)
+
+
+class Sink:
+    def __init__(self):
+        self.data = bytearray()
+    
+    def send(self, data) -> int:
+        self.data += data
+        return len(data)
+
+
+def sent_protocols(writer) -> list:
+    sink = Sink()
+    writer.flush(sink)
+    frames = FrameReader()
+    frames.feed(sink.data)
+    return [payload[9] for msg_type, payload in frames.read_frames() if msg_type == MessageType.DATA]
+
+
+def test_ephemeral_port_flows():
+    classifier = PacketClassifier(bulk_ports=[873])
+    assert classifier.classify(build_packet(6, 51234, 873)) == PacketClassifier.BULK
+    assert classifier.classify(build_packet(6, 873, 51234)) == PacketClassifier.BULK
+    assert classifier.classify(build_packet(6, 51234, 22)) == PacketClassifier.INTERACTIVE
+    assert classifier.classify(build_packet(17, 53, 51234)) == PacketClassifier.INTERACTIVE
+    assert classifier.classify(build_packet(6, 51234, 443)) == PacketClassifier.DEFAULT
+
+
+def test_interactive_port_wins_over_bulk_port():
+    classifier = PacketClassifier(bulk_ports=[873])
+    assert classifier.classify(build_packet(6, 873, 22)) == PacketClassifier.INTERACTIVE
+
+
+def test_dscp_and_protocol():
+    classifier = PacketClassifier()
+    assert classifier.classify(build_packet(6, 51234, 443, dscp=46)) == PacketClassifier.INTERACTIVE
+    assert classifier.classify(build_packet(6, 51234, 22, dscp=8)) == PacketClassifier.BULK
+    assert classifier.classify(build_packet(1)) == PacketClassifier.INTERACTIVE
+    assert classifier.classify(memoryview(build_packet(47))) == PacketClassifier.DEFAULT
+    assert classifier.classify(b'\x60' + bytes(39)) == PacketClassifier.DEFAULT
+
+
+def test_interactive_sent_first():
+    for scheduler in ('strict', 'weighted'):
+        writer = QoSPolicy({'scheduler': scheduler}).writer(1024 * 1024)
+        for _ in range(20):
+            writer.push(MessageType.DATA, build_packet(6, 51234, 443, size=1400))
+        writer.push(MessageType.DATA, build_packet(1))
+        assert sent_protocols(writer)[0] == 1
+
+
+def test_push_out_evicts_lower_classes():
+    frame = Protocol.HEADER_SIZE + 1400
+    writer = QoSPolicy().writer(10 * frame)
+    for _ in range(10):
+        assert writer.push(MessageType.DATA, build_packet(6, 51234, 443, size=1400))
+    
+    assert writer.push(MessageType.DATA, build_packet(1))
+    assert writer.pushed_out == 1
+    assert writer.dropped_packets == 1
+    assert len(writer) == 9 * frame + Protocol.HEADER_SIZE + 60
+
+
+def test_push_out_keeps_queue_when_it_cannot_make_room():
+    writer = QoSPolicy({'bulk_ports': [873]}).writer(4000)
+    assert writer.push(MessageType.DATA, build_packet(6, 51234, 873, size=1400))
+    assert writer.push(MessageType.DATA, build_packet(6, 51234, 443, size=2000))
+    
+    assert not writer.push(MessageType.DATA, build_packet(6, 51234, 443, size=2000))
+    assert writer.pushed_out == 0
+    assert writer.dropped_packets == 1
+    assert sent_protocols(writer) == [6, 6]
\ No newline at end of file
@@ -0,0 +1,114 @@
+import ipaddress
+import random
+from server.vpn_route_table import RouteTable
+
+
+def address(text: str) -> int:
+    return int(ipaddress.IPv4Address(text))
+
+
+def test_longest_prefix_match():
+    table = RouteTable()
+    table.add_network('10.0.0.0/8', 'wide')
+    table.add_network('10.1.0.0/16', 'narrow')
+    table.add(address('10.1.2.3'), 32, 'host')
+    
+    assert table.lookup(address('10.1.2.3')) == 'host'
+    assert table.lookup(address('10.1.2.4')) == 'narrow'
+    assert table.lookup(address('10.2.0.1')) == 'wide'
+    assert table.lookup(address('11.0.0.1')) is None
+    assert len(table) == 3
+
+
+def test_remove_value_clears_everything_it_owns():
+    table = RouteTable()
+    table.add(address('10.0.0.10'), 32, 'a')
+    table.add_network('192.168.1.0/24', 'a')
+    table.add_network('172.16.0.0/12', 'b')
+    
+    assert sorted(table.routes('a')) == ['10.0.0.10/32', '192.168.1.0/24']
+    assert table.remove_value('a') == 2
+    assert table.lookup(address('192.168.1.1')) is None
+    assert 'a' not in table.owned
+    assert [shift for shift, _ in table.levels] == [20]
+    assert len(table) == 1
+
+
+def test_remove_checks_owner():
+    table = RouteTable()
+    table.add_network('192.168.1.0/24', 'a')
+    assert not table.remove(*RouteTable.parse('192.168.1.0/24'), 'b')
+    assert table.lookup(address('192.168.1.1')) == 'a'
+    assert table.remove(*RouteTable.parse('192.168.1.0/24'))
+    assert not table.remove(*RouteTable.parse('192.168.1.0/24'))
+
+
+def test_overlapping_owner_survives_the_other_leaving():
+    network = RouteTable.parse('192.168.5.0/24')
+    target = address('192.168.5.7')
+    
+    table = RouteTable()
+    table.add(*network, 'first')
+    table.add(*network, 'second')
+    assert table.lookup(target) == 'second'
+    
+    table.remove_value('first')
+    assert table.lookup(target) == 'second'
+    assert 'first' not in table.owned
+    assert not table.shadowed
+    
+    table.remove_value('second')
+    assert table.lookup(target) is None
+    assert not table.owned and not table.shadowed and not table.prefixes
+
+
+def test_newest_owner_leaving_restores_previous():
+    network = RouteTable.parse('192.168.5.0/24')
+    target = address('192.168.5.7')
+    
+    table = RouteTable()
+    table.add(*network, 'first')
+    table.add(*network, 'second')
+    table.remove_value('second')
+    assert table.lookup(target) == 'first'
+    assert table.routes('first') == ['192.168.5.0/24']
+    
+    table.remove_value('first')
+    assert table.lookup(target) is None
+    assert not table.owned and not table.shadowed
+
+
+def test_random_operations_match_reference_model():
+    rng = random.Random(7)
+    networks = [RouteTable.parse(n) for n in ('10.0.0.0/8', '10.1.0.0/16', '10.1.2.0/24', '10.1.2.3/32', '0.0.0.0/0', '10.1.2.0/25')]
+    owners = ['a', 'b', 'c', 'd']
+    probes = [address(a) for a in ('10.1.2.3', '10.1.2.200', '10.1.2.5', '10.1.9.9', '10.9.9.9', '8.8.8.8')]
+    
+    table = RouteTable()
+    reference = {network: [] for network in networks}
+    for _ in range(2000):
+        operation = rng.random()
+        owner = rng.choice(owners)
+        if operation < 0.5:
+            network = rng.choice(networks)
+            table.add(*network, owner)
+            if owner in reference[network]:
+                reference[network].remove(owner)
+            reference[network].append(owner)
+        else:
+            table.remove_value(owner)
+            for stack in reference.values():
+                if owner in stack:
+                    stack.remove(owner)
+        
+        for probe in probes:
+            expected = None
+            for (base, length), stack in sorted(reference.items(), key=lambda item: -item[0][1]):
+                if stack and probe >> (32 - length) << (32 - length) == base:
+                    expected = stack[-1]
+                    break
+            assert table.lookup(probe) == expected
+        
+        for owner in owners:
+            expected = {network for network, stack in reference.items() if owner in stack}
+            assert table.owned.get(owner, set()) == expected
\ No newline at end of file
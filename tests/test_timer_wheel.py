@@ -0,0 +1,85 @@
+import random
+from common.timer_wheel import TimerWheel
+
+
+def test_timer_fires_on_the_tick_after_its_deadline():
+    wheel = TimerWheel(100.0, resolution=1.0)
+    wheel.schedule('a', 105.0)
+    wheel.schedule('b', 105.5)
+    assert len(wheel) == 2 and 'a' in wheel
+    
+    assert wheel.advance(105.9) == []
+    assert sorted(wheel.advance(106.0)) == ['a', 'b']
+    assert len(wheel) == 0 and 'a' not in wheel
+
+
+def test_cancel_and_reschedule():
+    wheel = TimerWheel(0.0, resolution=1.0)
+    wheel.schedule('a', 5.0)
+    wheel.schedule('b', 5.0)
+    assert wheel.cancel('a')
+    assert not wheel.cancel('a')
+    
+    wheel.schedule('b', 20.0)
+    assert wheel.advance(10.0) == []
+    assert wheel.advance(21.0) == ['b']
+
+
+def test_past_deadline_fires_on_next_tick():
+    wheel = TimerWheel(0.0, resolution=1.0)
+    wheel.advance(50.0)
+    wheel.schedule('late', 10.0)
+    assert wheel.advance(51.0) == ['late']
+
+
+def test_long_timeouts_cascade_through_levels():
+    wheel = TimerWheel(0.0, resolution=1.0, slot_bits=2, levels=3)
+    deadlines = {'level0': 2.0, 'level1': 9.0, 'level2': 40.0}
+    for key, when in deadlines.items():
+        wheel.schedule(key, when)
+    
+    fired = {}
+    for now in range(1, 64):
+        for key in wheel.advance(float(now)):
+            fired[key] = now
+    assert fired == {key: int(when) + 1 for key, when in deadlines.items()}
+
+
+def test_far_future_is_clamped_to_the_wheel_span():
+    wheel = TimerWheel(0.0, resolution=1.0, slot_bits=2, levels=2)
+    wheel.schedule('far', 1000.0)
+    assert wheel.advance(14.0) == []
+    assert wheel.advance(15.0) == ['far']
+
+
+def test_idle_wheel_skips_ahead():
+    wheel = TimerWheel(0.0, resolution=0.5)
+    assert wheel.advance(1e6) == []
+    wheel.schedule('a', 1e6 + 1.0)
+    assert wheel.advance(1e6 + 1.0) == []
+    assert wheel.advance(1e6 + 1.5) == ['a']
+
+
+def test_random_schedule_matches_reference_model():
+    rng = random.Random(11)
+    wheel = TimerWheel(0.0, resolution=1.0, slot_bits=2, levels=3)
+    reference = {}
+    tick = 0
+    for _ in range(3000):
+        key = rng.randrange(40)
+        if rng.random() < 0.2:
+            assert wheel.cancel(key) == (key in reference)
+            reference.pop(key, None)
+        else:
+            when = tick + rng.uniform(-5, 80)
+            wheel.schedule(key, when)
+            reference[key] = min(max(int(when) + 1, tick + 1), tick + wheel.max_ticks)
+        
+        if rng.random() < 0.3:
+            target = tick + rng.randrange(20)
+            due = {key for key, expires in reference.items() if expires <= target}
+            assert set(wheel.advance(float(target))) == due
+            for key in due:
+                del reference[key]
+            tick = max(tick, target)
+        assert len(wheel) == len(reference)
\ No newline at end of file
@@ -0,0 +1,33 @@
+import os
+import socket
+from common.crypto import DatagramChannel
+from server.vpn_connection import ClientConnection
+from server.vpn_server_core import VPNServerCore
+
+
+def test_tun_write_error_does_not_escape_udp_handler(tmp_path):
+    server = VPNServerCore(udp_port=0, host='127.0.0.1', lease_file=None)
+    server._setup_udp_socket()
+    peer = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    tls_side, _ = socket.socketpair()
+    read_only = os.open(os.devnull, os.O_RDONLY)
+    try:
+        client = ClientConnection(tls_side, ('127.0.0.1', 0), '10.0.0.10')
+        client.udp, offer = DatagramChannel.create()
+        server.clients[tls_side] = client
+        server.udp_sessions[client.udp.session_id] = client
+        server.tun_fd = read_only
+        
+        channel = DatagramChannel.from_offer(offer)
+        peer.sendto(channel.seal(b'\x00garbage'), server.udp_socket.getsockname())
+        peer.sendto(channel.seal(b'\x00garbage'), server.udp_socket.getsockname())
+        
+        server._handle_udp()
+        assert server.stats['udp_rx'] == 2
+        assert server.stats['udp_rx_drops'] == 2
+        assert tls_side in server.clients
+    finally:
+        os.close(read_only)
+        peer.close()
+        tls_side.close()
+        server.udp_socket.close()
\ No newline at end of file